@@ -0,0 +1,134 @@
+"""Authentication API routes (OAuth2 password flow with JWT bearer tokens)."""
+
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+
+from ...core.config import settings
+from ...core.schemas import (
+    APIResponse,
+    RefreshTokenRequest,
+    TokenResponse,
+    UserResponse,
+)
+from ...core.security import (
+    PasswordHashingBusyError,
+    create_access_token,
+    token_cache,
+    verify_token,
+)
+from .users import (
+    AnyUserService,
+    call_service,
+    service_unavailable,
+    success_response,
+    user_service_dependency,
+)
+
+router = APIRouter(prefix="/auth", tags=["Authentication"])
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+
+
+def credentials_error(detail: str = "Could not validate credentials") -> HTTPException:
+    """401 response asking for a bearer token."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue_tokens(user_id: int, username: str) -> TokenResponse:
+    """Create an access/refresh token pair for a user."""
+    claims = {"sub": str(user_id), "username": username}
+    access_token = create_access_token(
+        {**claims, "type": "access"},
+        settings.secret_key,
+        settings.algorithm,
+        timedelta(minutes=settings.access_token_expire_minutes),
+    )
+    refresh_token = create_access_token(
+        {**claims, "type": "refresh"},
+        settings.secret_key,
+        settings.algorithm,
+        timedelta(minutes=settings.refresh_token_expire_minutes),
+    )
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        expires_in=settings.access_token_expire_minutes * 60,
+    )
+
+
+def subject_id(claims: dict) -> int:
+    """User ID from the ``sub`` claim."""
+    try:
+        return int(claims["sub"])
+    except (KeyError, TypeError, ValueError):
+        raise credentials_error()
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    user_service: AnyUserService = Depends(user_service_dependency),
+) -> UserResponse:
+    """Authentication dependency for protected routes.
+
+    A token seen before is answered from :data:`token_cache` without decoding
+    it or checking its signature, and its user is reused for
+    ``TOKEN_PRINCIPAL_TTL`` seconds, so repeated requests add no DB query.
+    """
+    claims = token_cache.verify(token, settings.secret_key, settings.algorithm)
+    if claims is None or claims.get("type") != "access":
+        raise credentials_error()
+
+    user = token_cache.get_principal(token)
+    if user is None:
+        user = await call_service(user_service.get_user_by_id, subject_id(claims))
+        if user is None or not user.is_active:
+            raise credentials_error()
+        token_cache.set_principal(token, user)
+    return user
+
+
+@router.post("/token", response_model=TokenResponse)
+async def login(
+    form: OAuth2PasswordRequestForm = Depends(),
+    user_service: AnyUserService = Depends(user_service_dependency),
+):
+    """Exchange username and password for an access/refresh token pair."""
+    try:
+        user = await call_service(
+            user_service.authenticate_user, form.username, form.password
+        )
+    except PasswordHashingBusyError as e:
+        raise service_unavailable(str(e))
+    if user is None:
+        raise credentials_error("Incorrect username or password")
+    return issue_tokens(user.id, user.username)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    request: RefreshTokenRequest,
+    user_service: AnyUserService = Depends(user_service_dependency),
+):
+    """Exchange a refresh token for a new token pair."""
+    claims = verify_token(
+        request.refresh_token, settings.secret_key, settings.algorithm
+    )
+    if claims is None or claims.get("type") != "refresh":
+        raise credentials_error("Invalid refresh token")
+
+    user = await call_service(user_service.get_user_by_id, subject_id(claims))
+    if user is None or not user.is_active:
+        raise credentials_error("Invalid refresh token")
+    return issue_tokens(user.id, user.username)
+
+
+@router.get("/me", response_model=APIResponse)
+async def read_current_user(current_user: UserResponse = Depends(get_current_user)):
+    """Get the authenticated user."""
+    return success_response("User retrieved successfully", current_user)
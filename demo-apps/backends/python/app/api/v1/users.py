@@ -1,176 +1,538 @@
 """User management API routes."""
 
-from typing import Optional
+import inspect
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from ...core.schemas import APIResponse, UserCreate, UserUpdate
-from ...core.services.user_service import UserService
-from ...db.database import get_db
+from ...core.config import settings
+from ...core.schemas import (
+    APIResponse,
+    BatchGetRequest,
+    BulkImportResponse,
+    BulkUserResult,
+    DataResponse,
+    UserCreate,
+    UserUpdate,
+)
+from ...core.security import PasswordHashingBusyError
+from ...core.services.user_service import AsyncUserService, UserService
+from ...db.database import get_async_db, get_db
 
 router = APIRouter(prefix="/users", tags=["User Management"])
 
+AnyUserService = Union[UserService, AsyncUserService]
+
 
 def get_user_service(db: Session = Depends(get_db)) -> UserService:
     """Dependency injection function to get user service."""
     return UserService(db)
 
 
+async def get_async_user_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncUserService:
+    """Dependency injection function to get async user service."""
+    return AsyncUserService(db)
+
+
+# Service dependency used by the routes, selected by DB_ASYNC
+user_service_dependency: Callable[..., Any]
+if settings.db_async:
+    user_service_dependency = get_async_user_service
+else:
+    user_service_dependency = get_user_service
+
+
+async def call_service(func: Callable[..., Any], *args: Any) -> Any:
+    """Call a service method without blocking the event loop.
+
+    Async service methods are awaited directly; sync ones run in the
+    threadpool so a slow query only ties up a worker thread.
+    """
+    if inspect.iscoroutinefunction(func):
+        return await func(*args)
+    return await run_in_threadpool(func, *args)
+
+
+# Errors meaning "try again shortly": a full hashing queue, a connection pool
+# checkout timeout, a database that is down or refusing connections
+OVERLOAD_ERRORS = (PasswordHashingBusyError, PoolTimeoutError, OperationalError)
+
+
+def service_unavailable(detail: str) -> HTTPException:
+    """503 asking the client to retry after a short pause."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": str(settings.admission_retry_after)},
+    )
+
+
+def service_error(e: Exception, action: str) -> HTTPException:
+    """HTTP error for an unexpected exception from a service call.
+
+    HTTP errors pass through and overload becomes a 503, so that a pool
+    timeout is not reported as a 500; anything else is a 500.
+    """
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, OVERLOAD_ERRORS):
+        return service_unavailable(f"{action}: {e}")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{action}: {e}"
+    )
+
+
+# DataResponse parametrized per payload type, built on first use
+_envelopes: Dict[Any, Any] = {}
+
+
+def success_response(
+    message: str,
+    data: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None,
+) -> Any:
+    """Build the unified success response.
+
+    With ``FAST_SERIALIZATION`` the payload (a model or dict the service just
+    built, so already valid) goes straight to JSON bytes in one pass,
+    skipping ``model_dump``, ``response_model`` re-validation and
+    ``jsonable_encoder``. The bytes are identical to the validated path.
+    """
+    if not settings.fast_serialization:
+        if isinstance(data, BaseModel):
+            data = data.model_dump()
+        response = APIResponse(success=True, message=message, data=data)
+        if headers:
+            return JSONResponse(
+                jsonable_encoder(response), status_code=status_code, headers=headers
+            )
+        return response
+
+    data_type = type(data)
+    envelope = _envelopes.get(data_type)
+    if envelope is None:
+        envelope = _envelopes[data_type] = DataResponse[data_type]  # type: ignore
+    # Fields passed in declaration order, which is the serialization order
+    body = envelope.model_construct(
+        success=True,
+        message=message,
+        data=data,
+        error=None,
+        timestamp=datetime.utcnow(),
+    ).model_dump_json()
+    return Response(
+        body, status_code=status_code, headers=headers, media_type="application/json"
+    )
+
+
+def user_etag(user_id: int, version: int) -> str:
+    """Strong ETag of a user; changes exactly when its version does."""
+    return f'"user-{user_id}-v{version}"'
+
+
+def list_etag(changes: int) -> str:
+    """Weak ETag of list pages from the users change counter.
+
+    Weak because with the cached/estimated count strategies the total in the
+    body may differ between two responses for unchanged data.
+    """
+    return f'W/"users-{changes}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """304 for a conditional GET whose representation has not changed."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
 @router.post("/", response_model=APIResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
-    user_create: UserCreate, user_service: UserService = Depends(get_user_service)
+    user_create: UserCreate,
+    user_service: AnyUserService = Depends(user_service_dependency),
 ):
     """Create user."""
     try:
-        user = user_service.create_user(user_create)
-        return APIResponse(
-            success=True, message="User created successfully", data=user.model_dump()
+        user = await call_service(user_service.create_user, user_create)
+        return success_response(
+            "User created successfully", user, status.HTTP_201_CREATED
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
+        raise service_error(e, "Failed to create user")
+
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+async def iter_bulk_items(request: Request) -> AsyncIterator[Any]:
+    """Yield raw rows from a JSON array/``{"users": [...]}`` or NDJSON body.
+
+    NDJSON bodies are parsed line by line as they stream in; a line that is
+    not valid JSON is yielded as the ``ValueError`` it raised.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_CONTENT_TYPES:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield parse_json_line(line)
+        if buffer.strip():
+            yield parse_json_line(buffer)
+        return
+
+    try:
+        body = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body"
+        )
+    items = body.get("users") if isinstance(body, dict) else body
+    if not isinstance(items, list):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create user: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a JSON array or an object with a 'users' array",
         )
+    for item in items:
+        yield item
+
+
+def parse_json_line(line: bytes) -> Any:
+    """Parse one NDJSON line, returning the error instead of raising."""
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+@router.post(":bulk", response_model=APIResponse)
+async def bulk_create_users(
+    request: Request,
+    chunk_size: int = Query(
+        settings.bulk_import_chunk_size,
+        ge=1,
+        le=5000,
+        description="Rows per multi-row INSERT",
+    ),
+    user_service: AnyUserService = Depends(user_service_dependency),
+):
+    """Bulk create users from a JSON array or an NDJSON stream.
+
+    Rows are validated individually, checked for uniqueness per chunk, hashed
+    in parallel and inserted with one multi-row INSERT per chunk. Every row
+    gets its own result; committed chunks stay committed if a later one fails.
+    """
+    results: List[BulkUserResult] = []
+    chunk: List[Any] = []
+
+    async def flush() -> None:
+        results.extend(await call_service(user_service.bulk_create_users, chunk))
+        chunk.clear()
+
+    try:
+        index = 0
+        async for item in iter_bulk_items(request):
+            if isinstance(item, ValueError):
+                results.append(
+                    BulkUserResult(index=index, success=False, error="Invalid JSON")
+                )
+            else:
+                try:
+                    chunk.append((index, UserCreate.model_validate(item)))
+                except ValidationError as e:
+                    error = e.errors()[0]
+                    field = ".".join(str(part) for part in error["loc"])
+                    results.append(
+                        BulkUserResult(
+                            index=index,
+                            success=False,
+                            username=item.get("username")
+                            if isinstance(item, dict)
+                            else None,
+                            error=f"{field}: {error['msg']}" if field else error["msg"],
+                        )
+                    )
+            index += 1
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+    except OVERLOAD_ERRORS as e:
+        raise service_unavailable(
+            f"{e}; {sum(r.success for r in results)} rows were created"
+        )
+
+    results.sort(key=lambda result: result.index)
+    created = sum(result.success for result in results)
+    summary = BulkImportResponse(
+        total=len(results),
+        created=created,
+        failed=len(results) - created,
+        results=results,
+    )
+    return success_response("Bulk import completed", summary)
+
+
+@router.post(":batchGet", response_model=APIResponse)
+async def batch_get_users(
+    batch_request: BatchGetRequest,
+    user_service: AnyUserService = Depends(user_service_dependency),
+):
+    """Get up to 1000 users by ID in one call.
+
+    Results follow the request order; IDs without a live user come back as
+    ``{"id": ..., "found": false, "user": null}``.
+    """
+    batch = await call_service(user_service.get_users_by_ids, batch_request.ids)
+    return success_response("Users retrieved successfully", batch)
+
+
+@router.get(":batchGet", response_model=APIResponse)
+async def batch_get_users_by_query(
+    ids: str = Query(
+        ..., pattern=r"^\d+(,\d+)*$", description="Comma separated user IDs"
+    ),
+    user_service: AnyUserService = Depends(user_service_dependency),
+):
+    """Get users by ID from a comma separated ``ids`` query parameter."""
+    try:
+        batch_request = BatchGetRequest(ids=[int(part) for part in ids.split(",")])
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=e.errors()[0]["msg"]
+        )
+    return await batch_get_users(batch_request, user_service)
 
 
 @router.get("/", response_model=APIResponse)
 async def list_users(
+    request: Request,
     page: int = Query(0, ge=0, description="Page number"),
     size: int = Query(10, ge=1, le=100, description="Page size"),
     is_active: Optional[bool] = Query(None, description="Is active"),
     username: Optional[str] = Query(None, description="Username filter"),
     email: Optional[str] = Query(None, description="Email filter"),
-    user_service: UserService = Depends(get_user_service),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination cursor (empty for the first page)",
+    ),
+    sort: str = Query("id", description="Keyset sort key (id or created_at)"),
+    search: Optional[str] = Query(
+        None, description="Indexed substring search on username or email"
+    ),
+    match: str = Query(
+        "contains",
+        pattern="^(contains|prefix)$",
+        description="Username/email filter mode (prefix can use the indexes)",
+    ),
+    user_service: AnyUserService = Depends(user_service_dependency),
 ):
-    """Paginated user list query."""
+    """Paginated user list query.
+
+    Carries a weak ETag that changes with every committed write to users;
+    ``If-None-Match`` with it is answered 304 after one counter query.
+    """
     try:
-        user_list = user_service.list_users(page, size, is_active, username, email)
-        return APIResponse(
-            success=True,
-            message="User list retrieved successfully",
-            data=user_list.model_dump(),
+        etag = list_etag(await call_service(user_service.count_changes))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        user_list = await call_service(
+            user_service.list_users,
+            page,
+            size,
+            is_active,
+            username,
+            email,
+            cursor,
+            sort,
+            search,
+            match,
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve user list: {str(e)}",
+        return success_response(
+            "User list retrieved successfully", user_list, headers={"ETag": etag}
         )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise service_error(e, "Failed to retrieve user list")
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    fmt: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="Format"
+    ),
+    is_active: Optional[bool] = Query(None, description="Is active"),
+    username: Optional[str] = Query(None, description="Username filter"),
+    email: Optional[str] = Query(None, description="Email filter"),
+    search: Optional[str] = Query(
+        None, description="Indexed substring search on username or email"
+    ),
+    match: str = Query(
+        "contains",
+        pattern="^(contains|prefix)$",
+        description="Username/email filter mode (prefix can use the indexes)",
+    ),
+    user_service: AnyUserService = Depends(user_service_dependency),
+):
+    """Stream every matching user as NDJSON or CSV."""
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        user_service.export_users(fmt, is_active, username, email, search, match),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{fmt}"'},
+    )
 
 
 @router.put("/{user_id}", response_model=APIResponse)
 async def update_user(
     user_update: UserUpdate,
     user_id: int = Path(..., description="User ID"),
-    user_service: UserService = Depends(get_user_service),
+    user_service: AnyUserService = Depends(user_service_dependency),
 ):
     """Update user."""
     try:
-        user = user_service.update_user(user_id, user_update)
+        user = await call_service(user_service.update_user, user_id, user_update)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"User ID {user_id} does not exist",
             )
 
-        return APIResponse(
-            success=True, message="User updated successfully", data=user.model_dump()
-        )
+        return success_response("User updated successfully", user)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update user: {str(e)}",
-        )
+        raise service_error(e, "Failed to update user")
 
 
 @router.delete("/{user_id}", response_model=APIResponse)
 async def delete_user(
     user_id: int = Path(..., description="User ID"),
     version: int = Query(..., description="Current version number (optimistic lock)"),
-    user_service: UserService = Depends(get_user_service),
+    user_service: AnyUserService = Depends(user_service_dependency),
 ):
     """Delete user (soft delete)."""
     try:
-        success = user_service.delete_user(user_id, version)
+        success = await call_service(user_service.delete_user, user_id, version)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"User ID {user_id} does not exist",
             )
 
-        return APIResponse(
-            success=True, message="User deleted successfully", data={"user_id": user_id}
-        )
+        return success_response("User deleted successfully", {"user_id": user_id})
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete user: {str(e)}",
-        )
+        raise service_error(e, "Failed to delete user")
 
 
 @router.get("/check-username/{username}", response_model=APIResponse)
 async def check_username_exists(
     username: str = Path(..., description="Username"),
-    user_service: UserService = Depends(get_user_service),
+    user_service: AnyUserService = Depends(user_service_dependency),
 ):
     """Check if username exists."""
-    exists = user_service.check_username_exists(username)
-    return APIResponse(
-        success=True,
-        message="Check completed",
-        data={"username": username, "exists": exists},
-    )
+    exists = await call_service(user_service.check_username_exists, username)
+    return success_response("Check completed", {"username": username, "exists": exists})
 
 
 @router.get("/check-email", response_model=APIResponse)
 async def check_email_exists(
     email: str = Query(..., description="Email address"),
-    user_service: UserService = Depends(get_user_service),
+    user_service: AnyUserService = Depends(user_service_dependency),
 ):
     """Check if email exists."""
-    exists = user_service.check_email_exists(email)
-    return APIResponse(
-        success=True, message="Check completed", data={"email": email, "exists": exists}
-    )
+    exists = await call_service(user_service.check_email_exists, email)
+    return success_response("Check completed", {"email": email, "exists": exists})
 
 
 @router.get("/username/{username}", response_model=APIResponse)
 async def get_user_by_username(
+    request: Request,
     username: str = Path(..., description="Username"),
-    user_service: UserService = Depends(get_user_service),
+    user_service: AnyUserService = Depends(user_service_dependency),
 ):
-    """Get user by username."""
-    user = user_service.get_user_by_username(username)
+    """Get user by username (conditional GET as for ``/users/{user_id}``)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        current = await call_service(
+            user_service.get_user_version_by_username, username
+        )
+        if current is not None and etag_matches(if_none_match, user_etag(*current)):
+            return not_modified(user_etag(*current))
+
+    user = await call_service(user_service.get_user_by_username, username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Username '{username}' does not exist",
         )
 
-    return APIResponse(
-        success=True, message="User retrieved successfully", data=user.model_dump()
+    return success_response(
+        "User retrieved successfully",
+        user,
+        headers={"ETag": user_etag(user.id, user.version)},
     )
 
 
 @router.get("/{user_id}", response_model=APIResponse)
 async def get_user_by_id(
+    request: Request,
     user_id: int = Path(..., description="User ID"),
-    user_service: UserService = Depends(get_user_service),
+    user_service: AnyUserService = Depends(user_service_dependency),
 ):
-    """Get user by ID."""
-    user = user_service.get_user_by_id(user_id)
+    """Get user by ID.
+
+    The response carries a strong ETag built from the ID and version. With a
+    matching ``If-None-Match`` the answer is a 304 decided from the cached or
+    queried version alone, without loading or serializing the user.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        version = await call_service(user_service.get_user_version, user_id)
+        if version is not None and etag_matches(
+            if_none_match, user_etag(user_id, version)
+        ):
+            return not_modified(user_etag(user_id, version))
+
+    user = await call_service(user_service.get_user_by_id, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User ID {user_id} does not exist",
         )
 
-    return APIResponse(
-        success=True, message="User retrieved successfully", data=user.model_dump()
+    return success_response(
+        "User retrieved successfully",
+        user,
+        headers={"ETag": user_etag(user.id, user.version)},
     )
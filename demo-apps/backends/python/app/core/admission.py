@@ -0,0 +1,242 @@
+"""Admission control: per-route-group concurrency limits with load shedding.
+
+Requests are sorted into groups with separate budgets so that one kind of
+load cannot starve the others:
+
+* ``write``: bcrypt-heavy and row-writing requests (create, bulk import,
+  update, delete, login)
+* ``read``: point reads (by ID/username, existence checks, batch get, token
+  refresh, ``/auth/me``)
+* ``list``: list pages and exports
+
+Each group admits up to its current limit, parks the next ``queue_size``
+requests for at most ``queue_timeout`` seconds and rejects the rest at once
+with 503 and ``Retry-After``. The limit adapts AIMD-style: it grows by about
+one per limit's worth of fast responses and is cut by ``backoff`` (at most
+once per observed latency) when a response is slow compared to the group's
+baseline or is itself a 503, staying between 1 and the configured budget.
+So when the database slows down, admitted requests keep their latency and
+the excess is shed early instead of queueing in the server.
+
+Limits are per worker process and all state lives on the event loop.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .metrics import admission_decisions
+
+# GET paths served by the list group (everything else under /api is a read)
+LIST_PATHS = ("/users", "/users/", "/users/export")
+# POST endpoints that only read
+READ_POSTS = (":batchGet", "/auth/refresh")
+
+
+class AdmissionRejectedError(RuntimeError):
+    """Raised when a group's limit and wait queue are both full."""
+
+
+def route_group(method: str, path: str) -> Optional[str]:
+    """Admission group of an API request (None for health, docs, metrics)."""
+    if not path.startswith("/api/"):
+        return None
+    if method == "GET":
+        return "list" if path.endswith(LIST_PATHS) else "read"
+    if method == "POST" and path.endswith(READ_POSTS):
+        return "read"
+    return "write"
+
+
+class AdaptiveLimiter:
+    """Concurrency limit with a bounded wait queue and AIMD adaptation."""
+
+    def __init__(
+        self,
+        max_limit: int,
+        queue_size: int,
+        queue_timeout: float,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+    ):
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a slot."""
+        return len(self._waiters)
+
+    def _has_room(self) -> bool:
+        return self.in_flight < max(int(self.limit), 1)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; returns whether it waited.
+
+        Raises :class:`AdmissionRejectedError` when the queue is full or the
+        wait exceeds ``queue_timeout``.
+        """
+        if self._has_room() and not self._waiters:
+            self.in_flight += 1
+            return False
+        if len(self._waiters) >= self.queue_size:
+            raise AdmissionRejectedError("too many requests queued")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # A slot granted right at the timeout still counts (wait_for
+            # returns the result of a future completed before cancelling it)
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejectedError("timed out waiting for a slot")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot as the request was cancelled: pass it on
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return True
+
+    def release(self, latency: float, overloaded: bool = False) -> None:
+        """Return a slot and adapt the limit to the observed latency."""
+        self.in_flight -= 1
+        self._adapt(latency, overloaded)
+        self._wake()
+
+    def _adapt(self, latency: float, overloaded: bool) -> None:
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            # Let the baseline drift up slowly so a faster past does not pin it
+            self.baseline += (latency - self.baseline) * 0.01
+
+        now = time.monotonic()
+        if overloaded or latency > self.baseline * self.tolerance:
+            # One cut per round trip, so a burst of slow responses to
+            # requests admitted together counts once
+            if now - self._last_decrease >= latency:
+                self.limit = max(self.limit * self.backoff, 1.0)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow while the limit is actually being used
+            self.limit = min(self.limit + 1 / self.limit, float(self.max_limit))
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, float]:
+        """Current limit, in-flight and queued requests."""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+
+def build_limiters() -> Dict[str, AdaptiveLimiter]:
+    """One limiter per route group from the settings."""
+    budgets = {
+        "write": settings.admission_write_concurrency,
+        "read": settings.admission_read_concurrency,
+        "list": settings.admission_list_concurrency,
+    }
+    return {
+        group: AdaptiveLimiter(
+            budget,
+            settings.admission_queue_size,
+            settings.admission_queue_timeout,
+            settings.admission_latency_tolerance,
+        )
+        for group, budget in budgets.items()
+    }
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware applying :class:`AdaptiveLimiter` per route group.
+
+    Latency is measured to the start of the response, so streamed exports
+    hold their slot until they finish without skewing the latency signal.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: Optional[Dict[str, AdaptiveLimiter]] = None,
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.limiters = limiters if limiters is not None else build_limiters()
+        self.retry_after = retry_after
+
+    async def _reject(self, send: Send, detail: str) -> None:
+        body = json.dumps({"detail": f"Service overloaded: {detail}"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        group = (
+            route_group(scope["method"], scope["path"])
+            if scope["type"] == "http"
+            else None
+        )
+        limiter = self.limiters.get(group) if group else None
+        if group is None or limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            queued = await limiter.acquire()
+        except AdmissionRejectedError as e:
+            admission_decisions.labels(group, "rejected").inc()
+            await self._reject(send, str(e))
+            return
+        admission_decisions.labels(group, "queued" if queued else "admitted").inc()
+
+        started = time.perf_counter()
+        latency: Optional[float] = None
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal latency, status_code
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - started
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if latency is None:
+                latency = time.perf_counter() - started
+            limiter.release(latency, overloaded=status_code == 503)
@@ -0,0 +1,347 @@
+"""Read-through cache for user lookups.
+
+Entries are keyed by ``(user_id, version)`` and therefore immutable: a row
+version always serializes to the same ``UserResponse``. A small pointer key
+maps each user ID to its current version. Writers move the pointer forward
+after every update or delete, while readers only create a missing pointer
+(``SET NX``), so a slow reader can never put an older version back in front
+of a newer one.
+
+The ``memory`` backend lives inside one process: a write moves the pointer
+only in the worker that made it, so other workers keep serving the old
+version until the TTL expires. It is therefore only valid with a single
+worker; :func:`check_worker_count` refuses anything else at startup, and
+multi-worker deployments use ``redis`` (or ``none``).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.util import await_only
+
+from .config import settings
+from .schemas import UserResponse
+
+TOMBSTONE = "null"
+
+
+class CacheBackend:
+    """Minimal key/value interface implemented by cache backends."""
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value stored under ``key``."""
+        raise NotImplementedError
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[str]]:
+        """Return the values stored under ``keys``, in order."""
+        return [self.get(key) for key in keys]
+
+    def set(
+        self, key: str, value: str, ttl: float, only_if_absent: bool = False
+    ) -> bool:
+        """Store ``value``; returns False if ``only_if_absent`` and key exists."""
+        raise NotImplementedError
+
+    def set_many(self, entries: Sequence[Tuple[str, str, bool]], ttl: float) -> None:
+        """Store ``(key, value, only_if_absent)`` entries, all with ``ttl``."""
+        for key, value, only_if_absent in entries:
+            self.set(key, value, ttl, only_if_absent)
+
+    def delete(self, key: str) -> None:
+        """Remove ``key``."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove every key."""
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._live(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(
+        self, key: str, value: str, ttl: float, only_if_absent: bool = False
+    ) -> bool:
+        with self._lock:
+            if only_if_absent and self._live(key) is not None:
+                return False
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache(CacheBackend):
+    """Cache backend on a redis-py compatible client."""
+
+    def __init__(self, client: Any, prefix: str = "users:"):
+        self.client = client
+        self.prefix = prefix
+
+    def _wait(self, result: Any) -> Any:
+        """Result of a client command (awaited by the async subclass)."""
+        return result
+
+    def _scan(self, match: str) -> List[Any]:
+        return list(self.client.scan_iter(match=match))
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._wait(self.client.get(self.prefix + key))
+        if isinstance(value, bytes):
+            return value.decode()
+        return value
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        values = self._wait(self.client.mget([self.prefix + key for key in keys]))
+        return [
+            value.decode() if isinstance(value, bytes) else value for value in values
+        ]
+
+    def set(
+        self, key: str, value: str, ttl: float, only_if_absent: bool = False
+    ) -> bool:
+        return bool(
+            self._wait(
+                self.client.set(
+                    self.prefix + key, value, px=int(ttl * 1000), nx=only_if_absent
+                )
+            )
+        )
+
+    def set_many(self, entries: Sequence[Tuple[str, str, bool]], ttl: float) -> None:
+        """Store every entry in one pipelined round trip."""
+        if not entries:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, value, only_if_absent in entries:
+            pipe.set(self.prefix + key, value, px=int(ttl * 1000), nx=only_if_absent)
+        self._wait(pipe.execute())
+
+    def delete(self, key: str) -> None:
+        self._wait(self.client.delete(self.prefix + key))
+
+    def clear(self) -> None:
+        keys = self._scan(self.prefix + "*")
+        if keys:
+            self._wait(self.client.delete(*keys))
+
+
+class AsyncRedisCache(RedisCache):
+    """Redis backend on a ``redis.asyncio`` client, for ``DB_ASYNC`` mode.
+
+    The async service runs its cache calls inside ``AsyncSession.run_sync``.
+    Each command is awaited through SQLAlchemy's greenlet bridge, the same
+    way the async driver's queries are, so a Redis round trip suspends the
+    request instead of blocking the event loop. Only usable from code running
+    under ``run_sync``.
+    """
+
+    def _wait(self, result: Any) -> Any:
+        return await_only(result)
+
+    def _scan(self, match: str) -> List[Any]:
+        async def collect() -> List[Any]:
+            return [key async for key in self.client.scan_iter(match=match)]
+
+        return await_only(collect())
+
+
+class UserCache:
+    """Version-aware cache of serialized ``UserResponse`` objects."""
+
+    def __init__(self, backend: CacheBackend, ttl: float = 60.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _data_key(user_id: int, version: int) -> str:
+        return f"data:{user_id}:{version}"
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return f"id:{user_id}"
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        return f"username:{username}"
+
+    def _get_current(self, user_id: int) -> Optional[Tuple[int, str]]:
+        """Return ``(version, data)`` of a cached live user, counting the lookup."""
+        version = self.backend.get(self._version_key(user_id))
+        if version is not None:
+            data = self.backend.get(self._data_key(user_id, int(version)))
+            if data is not None and data != TOMBSTONE:
+                self.hits += 1
+                return int(version), data
+        self.misses += 1
+        return None
+
+    def get_by_id(self, user_id: int) -> Optional[UserResponse]:
+        """Return the cached current version of a user, or None on a miss."""
+        current = self._get_current(user_id)
+        if current is None:
+            return None
+        return UserResponse.model_validate_json(current[1])
+
+    def get_version(self, user_id: int) -> Optional[int]:
+        """Return the cached current version of a live user without parsing it.
+
+        None on a miss or if that version is a deletion.
+        """
+        current = self._get_current(user_id)
+        return current[0] if current is not None else None
+
+    def get_version_by_username(self, username: str) -> Optional[Tuple[int, int]]:
+        """Return ``(id, version)`` of a cached live user, or None on a miss."""
+        user_id = self.backend.get(self._username_key(username))
+        if user_id is None:
+            self.misses += 1
+            return None
+        version = self.get_version(int(user_id))
+        return (int(user_id), version) if version is not None else None
+
+    def get_many(self, user_ids: Sequence[int]) -> Dict[int, UserResponse]:
+        """Return cached current versions for ``user_ids`` (misses are absent).
+
+        Costs two backend round trips (pointers, then data) on Redis.
+        """
+        versions = self.backend.get_many([self._version_key(i) for i in user_ids])
+        data_keys = {
+            user_id: self._data_key(user_id, int(version))
+            for user_id, version in zip(user_ids, versions)
+            if version is not None
+        }
+        values = self.backend.get_many(list(data_keys.values()))
+        found = {
+            user_id: UserResponse.model_validate_json(data)
+            for user_id, data in zip(data_keys, values)
+            if data is not None and data != TOMBSTONE
+        }
+        self.hits += len(found)
+        self.misses += len(user_ids) - len(found)
+        return found
+
+    def get_by_username(self, username: str) -> Optional[UserResponse]:
+        """Return the cached user for a username, or None on a miss."""
+        user_id = self.backend.get(self._username_key(username))
+        if user_id is None:
+            self.misses += 1
+            return None
+        return self.get_by_id(int(user_id))
+
+    def _fill_entries(self, user: UserResponse) -> List[Tuple[str, str, bool]]:
+        return [
+            (self._data_key(user.id, user.version), user.model_dump_json(), False),
+            # Readers only create a missing pointer, never move one back
+            (self._version_key(user.id), str(user.version), True),
+            (self._username_key(user.username), str(user.id), False),
+        ]
+
+    def fill(self, user: UserResponse) -> None:
+        """Cache a user read from the database (never moves a pointer back)."""
+        for key, value, only_if_absent in self._fill_entries(user):
+            self.backend.set(key, value, self.ttl, only_if_absent)
+
+    def fill_many(self, users: Sequence[UserResponse]) -> None:
+        """Cache many users read from the database in one backend call.
+
+        One pipelined round trip on Redis, instead of three per user.
+        """
+        self.backend.set_many(
+            [entry for user in users for entry in self._fill_entries(user)], self.ttl
+        )
+
+    def store(self, user: UserResponse) -> None:
+        """Cache a freshly written user version and make it current."""
+        self.backend.set(
+            self._data_key(user.id, user.version), user.model_dump_json(), self.ttl
+        )
+        self.backend.set(self._version_key(user.id), str(user.version), self.ttl)
+
+    def store_deleted(self, user_id: int, version: int) -> None:
+        """Record that ``version`` of a user is a deletion."""
+        self.backend.set(self._data_key(user_id, version), TOMBSTONE, self.ttl)
+        self.backend.set(self._version_key(user_id), str(version), self.ttl)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self.backend.clear()
+
+
+def check_worker_count(workers: int) -> None:
+    """Refuse to run ``workers`` processes on a per-process user cache."""
+    if workers > 1 and settings.user_cache_backend.lower() == "memory":
+        raise RuntimeError(
+            "USER_CACHE_BACKEND=memory is per process and would serve stale "
+            f"users with {workers} workers; use redis or none"
+        )
+
+
+def build_user_cache() -> Optional[UserCache]:
+    """Create the user cache configured by ``USER_CACHE_BACKEND``."""
+    backend_name = settings.user_cache_backend.lower()
+    if backend_name == "none":
+        return None
+    if backend_name == "memory":
+        return UserCache(
+            MemoryCache(settings.user_cache_max_entries), settings.user_cache_ttl
+        )
+    if backend_name == "redis":
+        try:
+            # pylint: disable=import-outside-toplevel
+            import redis
+            import redis.asyncio
+        except ImportError as e:
+            raise RuntimeError(
+                "USER_CACHE_BACKEND=redis requires the 'redis' package"
+            ) from e
+        if not settings.redis_url:
+            raise RuntimeError("USER_CACHE_BACKEND=redis requires REDIS_URL")
+        if settings.db_async:
+            # The async service calls the cache from the event loop thread
+            client = redis.asyncio.Redis.from_url(settings.redis_url)
+            return UserCache(AsyncRedisCache(client), settings.user_cache_ttl)
+        client = redis.Redis.from_url(settings.redis_url)
+        return UserCache(RedisCache(client), settings.user_cache_ttl)
+    raise ValueError(f"Unknown user cache backend: {settings.user_cache_backend}")
+
+
+# Global user cache (None when caching is disabled)
+user_cache = build_user_cache()
@@ -0,0 +1,268 @@
+"""Probabilistic membership index for username/email availability checks.
+
+Each worker process holds its own filters, so a user created by another
+worker is missing until this one notices. Freshness is tracked against the
+``user_changes`` write counter: the filter records the counter value it was
+built from and counts the writes this process applied to it since. A
+periodic :meth:`MembershipIndex.sync` compares that with the database; any
+write the filter has not seen (made elsewhere) leaves it stale until the next
+rebuild, and while it is stale, or not verified for ``max_staleness``
+seconds, a miss in the filter is no longer taken as "available".
+"""
+
+import hashlib
+import math
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import User, UserChange
+
+# A filter not verified for this many sync intervals stops answering "available"
+SYNC_GRACE_INTERVALS = 3
+
+
+def count_changes(db: Session) -> int:
+    """Current value of the ``users`` write counter (sum of its shards)."""
+    return db.scalar(select(func.coalesce(func.sum(UserChange.changes), 0))) or 0
+
+
+def normalize_key(value: str) -> str:
+    """Fold a username/email the way a case/accent-insensitive collation does.
+
+    Filter lookups must never miss a value the database would consider
+    equal, otherwise a taken name would be reported as available.
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.casefold().rstrip(" ")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str) -> Iterable[int]:
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, value: str) -> None:
+        """Add ``value`` to the filter."""
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value)
+        )
+
+
+class MembershipIndex:
+    """Bloom filters over live usernames and emails.
+
+    ``might_contain`` returning False means the value is definitely not taken
+    and the database can be skipped; True means it may be taken and the caller
+    must confirm with a query. Until the first :meth:`rebuild`, and whenever
+    the filter is not known to be fresh, every value is reported as possibly
+    taken. Deleted users stay in the filter (they only cost a confirming
+    query) until the next rebuild.
+    """
+
+    KINDS = ("username", "email")
+
+    def __init__(
+        self, capacity: int, error_rate: float, max_staleness: float = math.inf
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_staleness = max_staleness
+        self._filters: Optional[Dict[str, BloomFilter]] = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.last_rebuild_seconds = 0.0
+        self.last_rebuild_at: Optional[float] = None
+        self.negatives = 0
+        self.positives = 0
+        self.false_positives = 0
+        self.removed_since_rebuild = 0
+        self.stale_lookups = 0
+        # Users created while a rebuild is streaming, replayed into new filters
+        self._added_during_rebuild: Optional[list] = None
+        # Write counter the filters were built from, writes applied since then
+        # (``_writes - _writes_at_build``) and when that last matched the DB
+        self._built_changes: Optional[int] = None
+        self._writes = 0
+        self._writes_at_build = 0
+        self._verified_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the filters have been built."""
+        return self._filters is not None
+
+    @property
+    def fresh(self) -> bool:
+        """Whether a miss can be trusted: the filters saw every write recently."""
+        verified_at = self._verified_at
+        return (
+            verified_at is not None
+            and time.monotonic() - verified_at <= self.max_staleness
+        )
+
+    def rebuild(self, db: Session) -> int:
+        """Build fresh filters from the live users table; returns row count.
+
+        ``db`` must read from the primary: rows a replica has not applied yet
+        would be missing while the write counter already includes them.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            self._added_during_rebuild = []
+            writes_at_build = self._writes
+        # Read before the rows: a write landing in between only makes the
+        # filter look stale, never fresh without it
+        changes = count_changes(db)
+        live = User.deleted_at.is_(None)
+        total = db.scalar(select(func.count()).select_from(User).where(live)) or 0
+        capacity = max(self.capacity, 2 * total)
+        filters = {kind: BloomFilter(capacity, self.error_rate) for kind in self.KINDS}
+
+        # Stream rows so rebuilding a large table keeps memory flat
+        rows = db.execute(
+            select(User.username, User.email)
+            .where(live)
+            .execution_options(yield_per=10000)
+        )
+        count = 0
+        for username, email in rows:
+            filters["username"].add(normalize_key(username))
+            filters["email"].add(normalize_key(email))
+            count += 1
+
+        with self._lock:
+            for username, email in self._added_during_rebuild or []:
+                filters["username"].add(username)
+                filters["email"].add(email)
+            self._added_during_rebuild = None
+            self._filters = filters
+            self._built_changes = changes
+            self._writes_at_build = writes_at_build
+            self._verified_at = time.monotonic()
+            self.rebuilds += 1
+            self.removed_since_rebuild = 0
+            self.last_rebuild_seconds = time.perf_counter() - started
+            self.last_rebuild_at = time.time()
+        return count
+
+    def add(self, username: str, email: str) -> None:
+        """Record a newly created user."""
+        username, email = normalize_key(username), normalize_key(email)
+        with self._lock:
+            if self._added_during_rebuild is not None:
+                self._added_during_rebuild.append((username, email))
+            if self._filters is None:
+                return
+            self._filters["username"].add(username)
+            self._filters["email"].add(email)
+
+    def note_removed(self) -> None:
+        """Record a deleted user (Bloom filters cannot forget it)."""
+        self.removed_since_rebuild += 1
+
+    def note_write(self) -> None:
+        """Record a committed, counted write whose effect the filters reflect."""
+        with self._lock:
+            self._writes += 1
+
+    def sync(self, db: Session) -> bool:
+        """Check the filters against the write counter; returns :attr:`fresh`.
+
+        They are verified when the counter moved by exactly the writes this
+        process applied; otherwise another process wrote and the filters
+        stay stale until the next :meth:`rebuild`. ``db`` must read from the
+        primary.
+        """
+        changes = count_changes(db)
+        with self._lock:
+            if self._built_changes is None:
+                return False
+            expected = self._built_changes + self._writes - self._writes_at_build
+            if changes == expected:
+                self._verified_at = time.monotonic()
+            else:
+                self._verified_at = None
+        return self.fresh
+
+    def might_contain(self, kind: str, value: str) -> bool:
+        """Return False only if ``value`` is definitely not taken."""
+        filters = self._filters
+        if filters is None:
+            return True
+        if normalize_key(value) in filters[kind]:
+            self.positives += 1
+            return True
+        if not self.fresh:
+            # Possibly created by another worker since the filter last matched
+            self.stale_lookups += 1
+            return True
+        self.negatives += 1
+        return False
+
+    def record_false_positive(self) -> None:
+        """Record a filter positive that the database did not confirm."""
+        self.false_positives += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for metrics export."""
+        filters = self._filters or {}
+        positives = self.positives
+        return {
+            "ready": float(self.ready),
+            "fresh": float(self.fresh),
+            "rebuilds": self.rebuilds,
+            "last_rebuild_seconds": self.last_rebuild_seconds,
+            "entries": sum(f.count for f in filters.values()),
+            "negatives": self.negatives,
+            "positives": positives,
+            "false_positives": self.false_positives,
+            "false_positive_rate": (
+                self.false_positives / positives if positives else 0.0
+            ),
+            "removed_since_rebuild": self.removed_since_rebuild,
+            "stale_lookups": self.stale_lookups,
+        }
+
+
+# Global membership index (None when disabled)
+membership_index: Optional[MembershipIndex] = (
+    MembershipIndex(
+        settings.membership_filter_capacity,
+        settings.membership_filter_error_rate,
+        (
+            settings.membership_sync_interval * SYNC_GRACE_INTERVALS
+            if settings.membership_sync_interval > 0
+            else math.inf
+        ),
+    )
+    if settings.membership_filter_enabled
+    else None
+)
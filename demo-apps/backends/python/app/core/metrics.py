@@ -0,0 +1,494 @@
+"""In-process metrics in the Prometheus text exposition format.
+
+A deliberately small registry (counters, gauges, histograms and callback
+gauges) so recording a sample costs a dict lookup, a lock and a bisect. Each
+worker process keeps its own registry; scrape every worker or aggregate by
+``instance`` in Prometheus.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Starlette appends "; charset=utf-8" to text media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; tuned for request/query latencies from sub-millisecond to seconds
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for a metric family with optional labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> Any:
+        """Return the child for ``values`` (created on first use)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """Yield ``(suffix, labels, value)`` for every sample."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render the family in the text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield "_total", _format_labels(self.labelnames, values), child.value
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled gauge."""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the unlabelled gauge."""
+        self.labels().dec(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield "", _format_labels(self.labelnames, values), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile ``q`` (None if empty)."""
+        with self._lock:
+            counts = list(self.counts)
+        total = sum(counts)
+        if not total:
+            return None
+        rank, cumulative = q * total, 0
+        for bound, count in zip(self.upper_bounds + (float("inf"),), counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(Metric):
+    """Cumulative histogram of observed values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        """Observe a value on the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def time(self):
+        """Time a block on the unlabelled histogram."""
+        return self.labels().time()
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.upper_bounds + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(names, values + (_format_value(bound),))
+                yield "_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, values)
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+class CallbackGauge(Metric):
+    """Gauge whose samples are read from a callback at scrape time."""
+
+    kind = "gauge"
+    suffix = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Dict[LabelValues, float]],
+        labelnames: Iterable[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        for values, value in self.callback().items():
+            yield self.suffix, _format_labels(self.labelnames, values), value
+
+
+class CallbackCounter(CallbackGauge):
+    """Counter maintained elsewhere (e.g. cache hit counts), read at scrape."""
+
+    kind = "counter"
+    suffix = "_total"
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        """Add ``metric``; registering a name twice returns the first one."""
+        return cast(M, self._metrics.setdefault(metric.name, metric))
+
+    def unregister(self, name: str) -> None:
+        """Remove the family called ``name``."""
+        self._metrics.pop(name, None)
+
+    def render(self) -> str:
+        """Render every family in the text exposition format."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.render())
+            except Exception:  # A broken callback must not break the scrape
+                continue
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the metrics recorded across the app
+registry = Registry()
+
+http_requests = registry.register(
+    Counter(
+        "http_requests",
+        "HTTP requests by route template and status code",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template",
+        ("method", "route"),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being served")
+)
+db_queries = registry.register(
+    Counter("db_queries", "SQL statements executed by type", ("statement",))
+)
+db_query_errors = registry.register(
+    Counter("db_query_errors", "SQL statements that raised an error")
+)
+db_query_duration = registry.register(
+    Histogram(
+        "db_query_duration_seconds", "SQL statement execution time", ("statement",)
+    )
+)
+db_pool_checkout_duration = registry.register(
+    Histogram(
+        "db_pool_checkout_duration_seconds",
+        "Time spent waiting for a pooled database connection",
+    )
+)
+password_hash_duration = registry.register(
+    Histogram(
+        "password_hash_duration_seconds",
+        "bcrypt hash/verify time (thread executor only)",
+        ("operation",),
+    )
+)
+serialization_duration = registry.register(
+    Histogram(
+        "user_serialization_duration_seconds",
+        "UserResponse.model_validate time for single users and list pages",
+        ("kind",),
+    )
+)
+coalesced_lookups = registry.register(
+    Counter(
+        "user_lookup_coalescing",
+        "Lookups that ran the query (leader) or shared one in flight (follower)",
+        ("lookup", "role"),
+    )
+)
+password_rehashes = registry.register(
+    Counter(
+        "password_rehashes",
+        "Background rehashes after login (updated/stale/busy/error)",
+        ("result",),
+    )
+)
+admission_decisions = registry.register(
+    Counter(
+        "admission_decisions",
+        "Requests admitted at once, admitted after queueing or rejected (503)",
+        ("group", "result"),
+    )
+)
+users_archived = registry.register(
+    Counter("users_archived", "Soft-deleted users moved to users_archive")
+)
+
+
+def statement_type(statement: str) -> str:
+    """Leading SQL keyword, used as a low-cardinality label."""
+    keyword = statement.lstrip()[:6].upper()
+    if keyword in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+        return keyword.lower()
+    return "other"
+
+
+def instrument_engine(engine) -> None:
+    """Record query counts and timings for ``engine``.
+
+    Accepts a sync ``Engine`` (use ``AsyncEngine.sync_engine`` for async).
+    Pool checkout wait is timed separately by :func:`time_pool_checkout`.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sqlalchemy import event
+
+    if engine.__dict__.get("_metrics_instrumented"):
+        return
+    engine._metrics_instrumented = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        kind = statement_type(statement)
+        db_queries.labels(kind).inc()
+        db_query_duration.labels(kind).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        db_query_errors.inc()
+        stack = (
+            context.connection.info.get("query_started") if context.connection else None
+        )
+        if stack:
+            stack.pop()
+
+
+def time_pool_checkout(engine) -> None:
+    """Record pool checkout wait for ``engine`` in ``db_pool_checkout_duration``.
+
+    Always installed, since ``/healthz/db`` reports it even with metrics off.
+    Checkout is timed around ``raw_connection`` rather than with pool events,
+    since the pool has no "checkout requested" event and the wrapper
+    survives ``engine.dispose()`` replacing the pool.
+    """
+    if engine.__dict__.get("_checkout_timed"):
+        return
+    engine._checkout_timed = True
+
+    raw_connection = engine.raw_connection
+    checkout = db_pool_checkout_duration.labels()
+
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            checkout.observe(time.perf_counter() - started)
+
+    engine.raw_connection = timed_raw_connection
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and status counts.
+
+    The route label is the matched path template (``/api/v1/users/{user_id}``)
+    looked up from the endpoint the router stored in the scope, so URLs with
+    IDs do not explode label cardinality; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates: Optional[Dict[object, str]] = None
+
+    def _route_template(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._templates is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._templates = {
+                route.endpoint: route.path
+                for route in routes
+                if hasattr(route, "endpoint") and hasattr(route, "path")
+            }
+        return self._templates.get(endpoint, "unmatched")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = http_requests_in_flight.labels()
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            method = scope["method"]
+            route = self._route_template(scope)
+            http_request_duration.labels(method, route).observe(elapsed)
+            http_requests.labels(method, route, str(status_code)).inc()
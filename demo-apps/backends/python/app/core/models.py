@@ -3,16 +3,45 @@
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+    insert,
+)
 from sqlalchemy.orm import declarative_base
 
 Base: Any = declarative_base()
 
+# Rows of the users change counter; writes to different users bump different
+# rows so the counter is not a single hot row
+USER_CHANGE_SHARDS = 16
+
 
 class User(Base):
     """User database model."""
 
     __tablename__ = "users"
+    __table_args__ = (
+        # n-gram full-text index backing the search filter on MySQL
+        Index(
+            "ft_users_search",
+            "username",
+            "email",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ).ddl_if(dialect="mysql"),
+        # Live-row scans: every query filters deleted_at IS NULL first, lists
+        # add is_active and page by id or (created_at, id) (migration 0004)
+        Index("ix_users_live_active_id", "deleted_at", "is_active", "id"),
+        Index("ix_users_live_created_at_id", "deleted_at", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, comment="User ID")
     username = Column(
@@ -44,3 +73,67 @@ class User(Base):
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
+
+
+class UserSearchTrigram(Base):
+    """Trigram side table backing the search filter on non-MySQL databases."""
+
+    __tablename__ = "user_search_trigrams"
+
+    trigram = Column(String(3), primary_key=True, comment="Lowercase trigram")
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+        comment="User ID",
+    )
+
+
+class UserArchive(Base):
+    """Soft-deleted users moved out of ``users`` after the retention window.
+
+    Same columns as :class:`User` (keeping the original ID) but no unique
+    indexes, since archived usernames and emails may be taken again.
+    """
+
+    __tablename__ = "users_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False, comment="User ID")
+    username = Column(String(50), nullable=False, comment="Username")
+    email = Column(String(255), nullable=False, comment="Email")
+    full_name = Column(String(100), nullable=True, comment="Full name")
+    hashed_password = Column(String(255), nullable=False, comment="Hashed password")
+    is_active = Column(Boolean, comment="Is active")
+    created_at = Column(DateTime, comment="Created at")
+    updated_at = Column(DateTime, comment="Updated at")
+    created_by = Column(String(50), comment="Created by")
+    updated_by = Column(String(50), comment="Updated by")
+    version = Column(Integer, comment="Version")
+    deleted_at = Column(DateTime, nullable=True, comment="Deleted at")
+    archived_at = Column(
+        DateTime, default=datetime.utcnow, nullable=False, comment="Archived at"
+    )
+
+
+class UserChange(Base):
+    """Sharded counter of committed writes to ``users``.
+
+    Every create, update and delete bumps one shard in the same transaction,
+    so the sum changes whenever a list page may have; it backs the weak ETag
+    of list responses.
+    """
+
+    __tablename__ = "user_changes"
+
+    shard = Column(Integer, primary_key=True, autoincrement=False, comment="Shard")
+    changes = Column(BigInteger, nullable=False, default=0, comment="Writes counted")
+
+
+@event.listens_for(UserChange.__table__, "after_create")
+def _seed_user_changes(target, connection, **kw):
+    """Create the counter shards along with the table (create_all)."""
+    connection.execute(
+        insert(target),
+        [{"shard": shard, "changes": 0} for shard in range(USER_CHANGE_SHARDS)],
+    )
@@ -0,0 +1,37 @@
+"""Opaque cursor encoding for keyset pagination."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+# Supported keyset orderings; every key ends with the unique ``id`` tiebreaker
+CURSOR_SORT_KEYS = ("id", "created_at")
+
+
+def encode_cursor(sort: str, values: Tuple[Any, ...]) -> str:
+    """Encode the sort key and last-row values into an opaque cursor."""
+    payload = [
+        value.isoformat() if isinstance(value, datetime) else value for value in values
+    ]
+    raw = json.dumps({"s": sort, "v": payload}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Optional[Tuple[Any, ...]]:
+    """Decode a cursor for ``sort``; an empty cursor means the first page."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data["s"] != sort:
+            raise ValueError("sort mismatch")
+        if sort == "created_at":
+            created_at, user_id = data["v"]
+            return datetime.fromisoformat(created_at), int(user_id)
+        (user_id,) = data["v"]
+        return (int(user_id),)
+    except (ValueError, KeyError, TypeError, binascii.Error) as e:
+        raise ValueError("Invalid pagination cursor") from e
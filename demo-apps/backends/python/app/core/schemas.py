@@ -1,7 +1,7 @@
 """Pydantic data validation and serialization schemas."""
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Generic, List, Optional, TypeVar
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
@@ -59,10 +59,78 @@ class UserResponse(UserBase):
 class UserListResponse(BaseModel):
     """User list response schema."""
 
-    total: int = Field(..., description="Total count")
+    total: Optional[int] = Field(
+        ..., description="Total count (None when counting is skipped)"
+    )
+    total_strategy: str = Field(
+        "exact",
+        description="Strategy that produced total (exact/cached/estimated/none)",
+    )
+    has_more: bool = Field(False, description="Whether more rows follow this page")
     page: int = Field(..., description="Page number")
     size: int = Field(..., description="Page size")
     users: list[UserResponse] = Field(..., description="User list")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page (keyset pagination only)"
+    )
+
+
+class BulkUserResult(BaseModel):
+    """Per-row result of a bulk user import."""
+
+    index: int = Field(..., description="Row position in the request")
+    success: bool = Field(..., description="Whether the row was created")
+    id: Optional[int] = Field(default=None, description="Created user ID")
+    username: Optional[str] = Field(default=None, description="Username")
+    error: Optional[str] = Field(default=None, description="Error information")
+
+
+class BulkImportResponse(BaseModel):
+    """Bulk user import summary."""
+
+    total: int = Field(..., description="Rows received")
+    created: int = Field(..., description="Rows created")
+    failed: int = Field(..., description="Rows rejected")
+    results: list[BulkUserResult] = Field(..., description="Per-row results")
+
+
+class BatchGetRequest(BaseModel):
+    """Batch get request."""
+
+    ids: list[int] = Field(
+        ..., min_length=1, max_length=1000, description="User IDs, in result order"
+    )
+
+
+class UserBatchItem(BaseModel):
+    """One requested ID in a batch get."""
+
+    id: int = Field(..., description="Requested user ID")
+    found: bool = Field(..., description="Whether a live user has this ID")
+    user: Optional[UserResponse] = Field(None, description="User (None if missing)")
+
+
+class UserBatchResponse(BaseModel):
+    """Batch get result in request order."""
+
+    requested: int = Field(..., description="Number of IDs requested")
+    found: int = Field(..., description="Number of IDs found")
+    users: list[UserBatchItem] = Field(..., description="Results in request order")
+
+
+class TokenResponse(BaseModel):
+    """OAuth2 bearer token pair."""
+
+    access_token: str = Field(..., description="Access token (JWT)")
+    refresh_token: str = Field(..., description="Refresh token (JWT)")
+    token_type: str = Field(default="bearer", description="Token type")
+    expires_in: int = Field(..., description="Access token lifetime in seconds")
+
+
+class RefreshTokenRequest(BaseModel):
+    """Token refresh request."""
+
+    refresh_token: str = Field(..., description="Refresh token from /auth/token")
 
 
 class APIResponse(BaseModel):
@@ -77,6 +145,26 @@ class APIResponse(BaseModel):
     )
 
 
+DataT = TypeVar("DataT")
+
+
+class DataResponse(BaseModel, Generic[DataT]):
+    """``APIResponse`` with a typed payload.
+
+    Same fields in the same order as :class:`APIResponse`, so trusted data
+    built with ``model_construct`` serializes in one ``model_dump_json`` pass
+    to exactly the bytes the validated ``APIResponse`` path produces.
+    """
+
+    success: bool = Field(..., description="Success status")
+    message: str = Field(..., description="Response message")
+    data: Optional[DataT] = Field(default=None, description="Response data")
+    error: Optional[str] = Field(default=None, description="Error information")
+    timestamp: datetime = Field(
+        default_factory=datetime.utcnow, description="Response timestamp"
+    )
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
 
@@ -85,3 +173,17 @@ class HealthResponse(BaseModel):
         default_factory=datetime.utcnow, description="Check time"
     )
     version: str = Field("1.0.0", description="Service version")
+
+
+class DatabaseHealthResponse(HealthResponse):
+    """Database health check response."""
+
+    pre_ping: str = Field(..., description="Connection pre-ping strategy")
+    probe_ms: Optional[float] = Field(None, description="SELECT 1 round trip (ms)")
+    pool: Dict[str, Any] = Field(
+        ..., description="Pool occupancy, saturation and checkout latency"
+    )
+    replicas: List[Dict[str, Any]] = Field(
+        default_factory=list, description="Read replica rotation state"
+    )
+    error: Optional[str] = Field(None, description="Probe error")
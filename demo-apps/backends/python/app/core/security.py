@@ -1,25 +1,227 @@
 """Security-related tools: password encryption, JWT tokens, etc."""
 
+import asyncio
+import statistics
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from .config import settings
+from .metrics import password_hash_duration
+
+T = TypeVar("T")
+
+# Password used to time bcrypt during calibration
+CALIBRATION_PASSWORD = "calibration-password"
+
+
+def make_password_context(rounds: int) -> CryptContext:
+    """bcrypt context hashing with ``rounds`` (log2 of the work factor).
+
+    Hashes made with any other cost are reported by ``needs_update``, so
+    changing the setting is rolled out by rehashing on login.
+    """
+    return CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds, bcrypt__ident="2b"
+    )
+
+
 # Password encryption context
-pwd_context = CryptContext(
-    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12, bcrypt__ident="2b"
-)
+pwd_context = make_password_context(settings.password_hash_rounds)
 
 
 def hash_password(password: str) -> str:
     """Encrypt password."""
-    return pwd_context.hash(password)
+    with password_hash_duration.labels("hash").time():
+        return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    with password_hash_duration.labels("verify").time():
+        return pwd_context.verify(plain_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash uses another scheme or cost than the current one.
+
+    Only parses the hash, so it is cheap enough to call on every login.
+    """
+    return pwd_context.needs_update(hashed_password)
+
+
+def measure_verify_seconds(rounds: int, samples: int = 3) -> float:
+    """Median time of one bcrypt verification at ``rounds`` on this host."""
+    context = make_password_context(rounds)
+    hashed = context.hash(CALIBRATION_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify(CALIBRATION_PASSWORD, hashed)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate_rounds(
+    target_seconds: float, min_rounds: int = 4, max_rounds: int = 20, samples: int = 3
+) -> Tuple[int, Dict[int, float]]:
+    """Highest bcrypt rounds whose verification fits in ``target_seconds``.
+
+    Each round doubles the cost, so rounds are timed upward from
+    ``min_rounds`` until one goes over the target. Returns the chosen rounds
+    (``min_rounds`` if even that is too slow) and the timings by rounds.
+    """
+    chosen, timings = min_rounds, {}
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = measure_verify_seconds(rounds, samples)
+        if timings[rounds] > target_seconds:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Raised when the password hashing queue is full."""
+
+
+def _run_jobs(func: Callable[..., T], args_list: Sequence[tuple]) -> List[T]:
+    """Run ``func`` over argument tuples one after another (one pool job)."""
+    return [func(*args) for args in args_list]
+
+
+class PasswordHasher:
+    """Bounded worker pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL, so a thread pool scales with cores; a process
+    pool is available for hosts where that is not enough. Jobs beyond
+    ``max_pending`` (queued plus running) are rejected immediately with
+    :class:`PasswordHashingBusyError` instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_pending: int, executor_type: str = "thread"):
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor_type}")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor_type = executor_type
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        """Executor, created on first use (after any worker fork)."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_type == "process":
+                        self._executor = ProcessPoolExecutor(self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            self.workers, thread_name_prefix="password-hash"
+                        )
+        return self._executor
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusyError("Password hashing queue is full")
+
+    def call(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func`` on the pool and block until it finishes."""
+        self._acquire()
+        try:
+            return self.executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func`` on the pool and await the result."""
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self._slots.release()
+
+    def _submit_batch(
+        self, func: Callable[..., T], args_list: Sequence[tuple]
+    ) -> List["Future[List[T]]"]:
+        """Split a batch over as many free slots as it can use (at least one).
+
+        Each slot runs one chunk of the batch as a single pool job and is
+        released by that job's done-callback, so bulk work never holds more
+        than ``workers`` slots nor exceeds ``max_pending`` with other jobs.
+        """
+        self._acquire()
+        lanes = 1
+        while lanes < min(len(args_list), self.workers) and self._slots.acquire(
+            blocking=False
+        ):
+            lanes += 1
+        size = -(-len(args_list) // lanes)
+        chunks = [args_list[i : i + size] for i in range(0, len(args_list), size)]
+        for _ in range(lanes - len(chunks)):
+            self._slots.release()
+
+        futures: List["Future[List[T]]"] = []
+        try:
+            for chunk in chunks:
+                future: "Future[List[T]]" = self.executor.submit(_run_jobs, func, chunk)
+                future.add_done_callback(lambda _: self._slots.release())
+                futures.append(future)
+        except BaseException:
+            for _ in range(len(chunks) - len(futures)):
+                self._slots.release()
+            raise
+        return futures
+
+    def map(self, func: Callable[..., T], args_list: Sequence[tuple]) -> List[T]:
+        """Run ``func`` over many argument tuples in parallel and block."""
+        if not args_list:
+            return []
+        futures = self._submit_batch(func, args_list)
+        return [result for future in futures for result in future.result()]
+
+    async def run_batch(
+        self, func: Callable[..., T], args_list: Sequence[tuple]
+    ) -> List[T]:
+        """Run ``func`` over many argument tuples in parallel and await all."""
+        if not args_list:
+            return []
+        futures = self._submit_batch(func, args_list)
+        chunks = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        return [result for chunk in chunks for result in chunk]
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+# Global password hashing pool
+password_hasher = PasswordHasher(
+    settings.password_hash_workers,
+    settings.password_hash_max_pending,
+    settings.password_hash_executor,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Encrypt password on the hashing pool."""
+    return await password_hasher.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password on the hashing pool."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
 
 
 def create_access_token(
@@ -49,3 +251,123 @@ def verify_token(
         return payload
     except JWTError:
         return None
+
+
+class _VerifiedToken:
+    """Claims of a verified token plus the principal resolved for it."""
+
+    __slots__ = ("claims", "expires_at", "principal", "principal_expires_at")
+
+    def __init__(self, claims: dict, expires_at: float):
+        self.claims = claims
+        self.expires_at = expires_at
+        self.principal: Any = None
+        self.principal_expires_at = 0.0
+
+
+class TokenCache:
+    """Bounded LRU of verified JWTs, each kept until its ``exp`` claim.
+
+    A repeated bearer token is answered from memory without decoding or
+    checking the signature again. Entries are keyed by the whole token, not
+    just its signature segment, so a valid signature cannot be replayed with
+    a different payload. Each entry can also hold the principal (user)
+    resolved for the token, reused for ``principal_ttl`` seconds so that
+    deactivation or deletion takes effect within that bound.
+    """
+
+    def __init__(self, max_entries: int = 10000, principal_ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.principal_ttl = principal_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, _VerifiedToken]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, token: str, count: bool = False) -> Optional[_VerifiedToken]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry.expires_at <= time.time():
+                del self._entries[token]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(token)
+            if count:
+                # Counted under the lock: verify runs on many threads at once
+                if entry is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            return entry
+
+    def verify(
+        self, token: str, secret_key: str, algorithm: str = "HS256"
+    ) -> Optional[dict]:
+        """Return the claims of a valid token (from memory when seen before)."""
+        entry = self._get(token, count=True)
+        if entry is not None:
+            return entry.claims
+        claims = verify_token(token, secret_key, algorithm)
+        if claims is None or "exp" not in claims or self.max_entries <= 0:
+            return claims
+        with self._lock:
+            self._entries[token] = _VerifiedToken(claims, float(claims["exp"]))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return claims
+
+    def get_principal(self, token: str) -> Any:
+        """Return the principal cached for ``token``, or None if absent/stale."""
+        entry = self._get(token)
+        if entry is None or entry.principal_expires_at <= time.monotonic():
+            return None
+        return entry.principal
+
+    def set_principal(self, token: str, principal: Any) -> None:
+        """Attach the principal resolved for an already verified token."""
+        entry = self._get(token)
+        if entry is not None:
+            entry.principal = principal
+            entry.principal_expires_at = time.monotonic() + self.principal_ttl
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Forget every verified token."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global verified-token cache (per worker process)
+token_cache = TokenCache(settings.token_cache_max_entries, settings.token_principal_ttl)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Pick PASSWORD_HASH_ROUNDS for a target verify latency on this host"
+    )
+    parser.add_argument(
+        "--target-ms", type=float, default=100.0, help="Target verify latency"
+    )
+    parser.add_argument(
+        "--min-rounds",
+        type=int,
+        default=10,
+        help="Never recommend fewer rounds (default: %(default)s)",
+    )
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=3, help="Timings per rounds")
+    args = parser.parse_args()
+
+    rounds, timings = calibrate_rounds(
+        args.target_ms / 1000, args.min_rounds, args.max_rounds, args.samples
+    )
+    for candidate, seconds in timings.items():
+        print(f"rounds={candidate:<3} verify={seconds * 1000:8.1f} ms")
+    if timings[rounds] > args.target_ms / 1000:
+        print(f"⚠️ Even {rounds} rounds exceed {args.target_ms:g} ms on this host")
+    print(f"PASSWORD_HASH_ROUNDS={rounds}")
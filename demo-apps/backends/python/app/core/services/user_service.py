@@ -1,69 +1,436 @@
 """User business logic service layer."""
 
-from typing import Optional
+import asyncio
+import csv
+import io
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
+from sqlalchemy import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import Session
 
-from ...db.dao.user_dao import UserDAO
+from ...db.dao.user_dao import AsyncUserDAO, UserDAO
+from ..cache import UserCache, user_cache
+from ..config import settings
+from ..membership import membership_index
+from ..metrics import password_rehashes, serialization_duration
 from ..models import User
-from ..schemas import UserCreate, UserListResponse, UserResponse, UserUpdate
-from ..security import hash_password
+from ..pagination import CURSOR_SORT_KEYS, decode_cursor, encode_cursor
+from ..schemas import (
+    BulkUserResult,
+    UserBatchItem,
+    UserBatchResponse,
+    UserCreate,
+    UserListResponse,
+    UserResponse,
+    UserUpdate,
+)
+from ..security import (
+    PasswordHashingBusyError,
+    hash_password,
+    hash_password_async,
+    password_hasher,
+    password_needs_rehash,
+    verify_password,
+    verify_password_async,
+)
+from ..singleflight import SingleFlight, user_lookups
+
+T = TypeVar("T")
+
+BulkRow = Tuple[int, UserCreate]
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_COLUMNS = list(UserResponse.model_fields)
+# Rows serialized per chunk handed to the response stream
+EXPORT_CHUNK_ROWS = 500
+
+_serialize_single = serialization_duration.labels("single")
+_serialize_list = serialization_duration.labels("list")
+
+
+def to_response(db_user: User) -> UserResponse:
+    """Validate an ORM user into its response model."""
+    with _serialize_single.time():
+        return UserResponse.model_validate(db_user)
+
+
+def to_responses(db_users: Iterable[User]) -> List[UserResponse]:
+    """Validate a page of ORM users into response models."""
+    with _serialize_list.time():
+        return [UserResponse.model_validate(user) for user in db_users]
+
+
+def serialize_export_rows(rows: Iterable[Any], fmt: str, header: bool = False) -> str:
+    """Serialize export rows (column tuples) as NDJSON lines or CSV records."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow(
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in row
+            )
+        return buffer.getvalue()
+    return "".join(
+        UserResponse.model_validate(dict(row._mapping)).model_dump_json() + "\n"
+        for row in rows
+    )
+
+
+# Pending async rehash tasks, referenced so they are not garbage collected
+_rehash_tasks: Set["asyncio.Task[None]"] = set()
+
+
+def _rehash_failed(error: Exception) -> None:
+    if isinstance(error, PasswordHashingBusyError):
+        # The hash is still valid; the next login tries again
+        password_rehashes.labels("busy").inc()
+    else:
+        password_rehashes.labels("error").inc()
+        print(f"⚠️ Password rehash failed: {error}")
+
+
+def rehash_password(bind: Engine, user_id: int, old_hash: str, password: str) -> None:
+    """Store ``password`` hashed at the current cost, unless it changed since."""
+    try:
+        new_hash = password_hasher.call(hash_password, password)
+        with Session(bind) as db:
+            updated = UserDAO(db).replace_password_hash(user_id, old_hash, new_hash)
+        password_rehashes.labels("updated" if updated else "stale").inc()
+    except Exception as e:
+        _rehash_failed(e)
+
+
+async def rehash_password_async(
+    bind: AsyncEngine, user_id: int, old_hash: str, password: str
+) -> None:
+    """Async version of :func:`rehash_password`."""
+    try:
+        new_hash = await hash_password_async(password)
+        async with AsyncSession(bind) as db:
+            updated = await AsyncUserDAO(db).replace_password_hash(
+                user_id, old_hash, new_hash
+            )
+        password_rehashes.labels("updated" if updated else "stale").inc()
+    except Exception as e:
+        _rehash_failed(e)
 
 
 class UserService:
     """User business logic service."""
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        cache: Optional[UserCache] = user_cache,
+        flights: Optional[SingleFlight] = user_lookups,
+    ):
         self.db = db
         self.user_dao = UserDAO(db)
+        self.cache = cache
+        self.flights = flights
+
+    def _coalesce(self, lookup: str, key: Any, func: Callable[[], T]) -> T:
+        """Share ``func`` with concurrent identical lookups in other threads."""
+        if self.flights is None:
+            return func()
+        return self.flights.call(lookup, key, func)
 
     def create_user(
         self, user_create: UserCreate, created_by: str = "system"
     ) -> UserResponse:
         """Create user."""
-        # Check if username and email already exist
-        if self.user_dao.check_username_exists(user_create.username):
-            raise ValueError(f"Username '{user_create.username}' already exists")
+        # Encrypt password on the bounded hashing pool
+        hashed_password = password_hasher.call(hash_password, user_create.password)
+        return self.create_user_with_hash(user_create, hashed_password, created_by)
+
+    def create_user_with_hash(
+        self, user_create: UserCreate, hashed_password: str, created_by: str = "system"
+    ) -> UserResponse:
+        """Create user from an already hashed password."""
+        db_user = self.user_dao.create_user(user_create, hashed_password, created_by)
+        return to_response(db_user)
 
-        if self.user_dao.check_email_exists(user_create.email):
-            raise ValueError(f"Email '{user_create.email}' already exists")
+    def screen_bulk_rows(
+        self, rows: List[BulkRow]
+    ) -> Tuple[List[BulkRow], List[BulkUserResult]]:
+        """Split bulk rows into insertable rows and rejected ones.
 
-        # Encrypt password
-        hashed_password = hash_password(user_create.password)
+        Rejects usernames/emails repeated within the batch or already taken,
+        using one set-based query per column instead of two per row.
+        """
+        taken_usernames, taken_emails = self.user_dao.find_taken(
+            [user_create.username for _, user_create in rows],
+            [user_create.email for _, user_create in rows],
+        )
+        seen_usernames: Set[str] = set()
+        seen_emails: Set[str] = set()
+        accepted: List[BulkRow] = []
+        rejected: List[BulkUserResult] = []
+        for index, user_create in rows:
+            username = user_create.username.lower()
+            email = user_create.email.lower()
+            error = None
+            if username in taken_usernames:
+                error = f"Username '{user_create.username}' already exists"
+            elif email in taken_emails:
+                error = f"Email '{user_create.email}' already exists"
+            elif username in seen_usernames:
+                error = f"Username '{user_create.username}' is repeated in the request"
+            elif email in seen_emails:
+                error = f"Email '{user_create.email}' is repeated in the request"
 
-        # Create user object (temporary password handling)
-        user_data = user_create.model_copy()
+            if error:
+                rejected.append(
+                    BulkUserResult(
+                        index=index,
+                        success=False,
+                        username=user_create.username,
+                        error=error,
+                    )
+                )
+                continue
+            seen_usernames.add(username)
+            seen_emails.add(email)
+            accepted.append((index, user_create))
+        return accepted, rejected
 
-        # Create user record
-        db_user = self.user_dao.create_user(user_data, created_by)
+    def insert_bulk_rows(
+        self, rows: List[BulkRow], hashes: List[str], created_by: str = "system"
+    ) -> List[BulkUserResult]:
+        """Insert screened rows with one multi-row INSERT.
 
-        # Update hashed password (needs to be reset here)
-        db_user.hashed_password = hashed_password
-        self.db.commit()
+        If a concurrent writer took one of the keys in the meantime, the chunk
+        is retried row by row so only the colliding rows fail.
+        """
+        if not rows:
+            return []
+        try:
+            ids = self.user_dao.bulk_create_users(
+                [
+                    (user_create, hashed)
+                    for (_, user_create), hashed in zip(rows, hashes)
+                ],
+                created_by,
+            )
+            return [
+                BulkUserResult(
+                    index=index,
+                    success=True,
+                    id=ids[user_create.username],
+                    username=user_create.username,
+                )
+                for index, user_create in rows
+            ]
+        except IntegrityError:
+            pass
 
-        return UserResponse.model_validate(db_user)
+        results = []
+        for (index, user_create), hashed in zip(rows, hashes):
+            try:
+                ids = self.user_dao.bulk_create_users(
+                    [(user_create, hashed)], created_by
+                )
+                results.append(
+                    BulkUserResult(
+                        index=index,
+                        success=True,
+                        id=ids[user_create.username],
+                        username=user_create.username,
+                    )
+                )
+            except IntegrityError:
+                results.append(
+                    BulkUserResult(
+                        index=index,
+                        success=False,
+                        username=user_create.username,
+                        error="Username or email already exists",
+                    )
+                )
+        return results
+
+    def bulk_create_users(
+        self, rows: List[BulkRow], created_by: str = "system"
+    ) -> List[BulkUserResult]:
+        """Create a chunk of ``(index, user_create)`` rows.
+
+        Uniqueness is checked per chunk, passwords are hashed in parallel on
+        the hashing pool and the rows are written in one transaction.
+        """
+        accepted, rejected = self.screen_bulk_rows(rows)
+        hashes = password_hasher.map(
+            hash_password, [(user_create.password,) for _, user_create in accepted]
+        )
+        results = rejected + self.insert_bulk_rows(accepted, hashes, created_by)
+        return sorted(results, key=lambda result: result.index)
+
+    def export_users(
+        self,
+        fmt: str = "ndjson",
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        search: Optional[str] = None,
+        match: str = "contains",
+    ) -> Iterator[str]:
+        """Stream filtered users as NDJSON or CSV text chunks.
+
+        Rows come through a server-side cursor and are serialized in small
+        chunks, so memory stays flat regardless of the table size.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{fmt}'")
+        statement = self.user_dao.export_statement(
+            EXPORT_COLUMNS, is_active, username, email, search, match
+        )
+        if fmt == "csv":
+            yield serialize_export_rows([], fmt, header=True)
+        batch = []
+        for row in self.user_dao.iter_export_rows(statement):
+            batch.append(row)
+            if len(batch) >= EXPORT_CHUNK_ROWS:
+                yield serialize_export_rows(batch, fmt)
+                batch = []
+        if batch:
+            yield serialize_export_rows(batch, fmt)
 
     def get_user_by_id(self, user_id: int) -> Optional[UserResponse]:
         """Get user by ID."""
-        db_user = self.user_dao.get_user_by_id(user_id)
-        if not db_user:
-            return None
-        return UserResponse.model_validate(db_user)
+        if self.cache:
+            cached = self.cache.get_by_id(user_id)
+            if cached is not None:
+                return cached
+        return self._coalesce(
+            "by_id",
+            user_id,
+            lambda: self._load_user(self.user_dao.get_user_by_id, user_id),
+        )
 
     def get_user_by_username(self, username: str) -> Optional[UserResponse]:
         """Get user by username."""
-        db_user = self.user_dao.get_user_by_username(username)
+        if self.cache:
+            cached = self.cache.get_by_username(username)
+            if cached is not None:
+                return cached
+        return self._coalesce(
+            "by_username",
+            username,
+            lambda: self._load_user(self.user_dao.get_user_by_username, username),
+        )
+
+    def get_user_version(self, user_id: int) -> Optional[int]:
+        """Current version of a live user, for ETags.
+
+        Served from the cache or a version-only query; never builds the
+        user's response model.
+        """
+        if self.cache:
+            version = self.cache.get_version(user_id)
+            if version is not None:
+                return version
+        return self.user_dao.get_user_version(user_id)
+
+    def get_user_version_by_username(self, username: str) -> Optional[Tuple[int, int]]:
+        """``(id, version)`` of a live user, for ETags."""
+        if self.cache:
+            cached = self.cache.get_version_by_username(username)
+            if cached is not None:
+                return cached
+        return self.user_dao.get_user_version_by_username(username)
+
+    def count_changes(self) -> int:
+        """Committed writes to the users table (the list pages' ETag)."""
+        return self.user_dao.count_changes()
+
+    def _load_user(
+        self, lookup: Callable[[Any], Optional[User]], key: Any
+    ) -> Optional[UserResponse]:
+        """Read a user from the database and fill the cache."""
+        db_user = lookup(key)
         if not db_user:
             return None
-        return UserResponse.model_validate(db_user)
+        user = to_response(db_user)
+        if self.cache:
+            self.cache.fill(user)
+        return user
+
+    def get_users_by_ids(self, user_ids: Sequence[int]) -> UserBatchResponse:
+        """Get many users by ID, in request order with not-found markers.
+
+        Cached users are served from the cache; the rest are read with one
+        ``IN`` query per chunk and written back to the cache.
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        users: Dict[int, UserResponse] = (
+            self.cache.get_many(unique_ids) if self.cache else {}
+        )
+        missing = [user_id for user_id in unique_ids if user_id not in users]
+        if missing:
+            db_users = self.user_dao.get_users_by_ids(missing)
+            fetched = to_responses(db_users.values())
+            for user in fetched:
+                users[user.id] = user
+            if self.cache:
+                self.cache.fill_many(fetched)
+
+        items = [
+            UserBatchItem(id=user_id, found=user_id in users, user=users.get(user_id))
+            for user_id in user_ids
+        ]
+        return UserBatchResponse(
+            requested=len(items),
+            found=sum(item.found for item in items),
+            users=items,
+        )
 
     def check_username_exists(self, username: str) -> bool:
         """Check if username exists."""
-        return self.user_dao.check_username_exists(username)
+        if membership_index and not membership_index.might_contain(
+            "username", username
+        ):
+            return False
+        return self._coalesce(
+            "username_exists",
+            username,
+            lambda: self._check_taken(self.user_dao.check_username_exists, username),
+        )
 
     def check_email_exists(self, email: str) -> bool:
         """Check if email exists."""
-        return self.user_dao.check_email_exists(email)
+        if membership_index and not membership_index.might_contain("email", email):
+            return False
+        return self._coalesce(
+            "email_exists",
+            email,
+            lambda: self._check_taken(self.user_dao.check_email_exists, email),
+        )
+
+    @staticmethod
+    def _check_taken(check: Callable[[str], bool], value: str) -> bool:
+        """Run an existence query the availability filter could not rule out."""
+        taken = check(value)
+        if membership_index and membership_index.ready and not taken:
+            membership_index.record_false_positive()
+        return taken
 
     def list_users(
         self,
@@ -72,50 +439,299 @@ class UserService:
         is_active: Optional[bool] = None,
         username: Optional[str] = None,
         email: Optional[str] = None,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        search: Optional[str] = None,
+        match: str = "contains",
     ) -> UserListResponse:
-        """Paginated user list query."""
+        """Paginated user list query.
+
+        Passing ``cursor`` (empty for the first page) switches to keyset
+        pagination ordered by ``sort``; ``page`` is then ignored and the
+        response carries ``next_cursor``. ``search`` is an indexed substring
+        match on username or email; ``match="prefix"`` makes the username and
+        email filters prefix matches.
+        """
         if size > 100:  # Limit maximum number per page
             size = 100
 
-        users, total = self.user_dao.list_users(page, size, is_active, username, email)
+        if cursor is None:
+            users, count, has_more = self.user_dao.list_users(
+                page, size, is_active, username, email, search, match
+            )
+            next_cursor = None
+        else:
+            if sort not in CURSOR_SORT_KEYS:
+                raise ValueError(f"Unsupported cursor sort key '{sort}'")
+            after = decode_cursor(cursor, sort)
+            users, count, has_more = self.user_dao.list_users_by_cursor(
+                size, after, sort, is_active, username, email, search, match
+            )
+            next_cursor = None
+            if has_more:
+                last = users[-1]
+                values = (
+                    (last.created_at, last.id) if sort == "created_at" else (last.id,)
+                )
+                next_cursor = encode_cursor(sort, values)
+            page = 0
 
-        user_responses = [UserResponse.model_validate(user) for user in users]
+        user_responses = to_responses(users)
 
-        return UserListResponse(total=total, page=page, size=size, users=user_responses)
+        return UserListResponse(
+            total=count.total,
+            total_strategy=count.strategy,
+            has_more=has_more,
+            page=page,
+            size=size,
+            users=user_responses,
+            next_cursor=next_cursor,
+        )
 
     def update_user(
         self, user_id: int, user_update: UserUpdate, updated_by: str = "system"
     ) -> Optional[UserResponse]:
         """Update user."""
-        # Check email uniqueness (if email is to be updated)
-        if user_update.email:
-            existing_user = self.user_dao.get_user_by_email(user_update.email)
-            if existing_user and existing_user.id != user_id:
-                raise ValueError(
-                    f"Email '{user_update.email}' is already used by another user"
-                )
-
+        # Email uniqueness is enforced by the unique index inside the UPDATE
         db_user = self.user_dao.update_user(user_id, user_update, updated_by)
         if not db_user:
             return None
 
-        return UserResponse.model_validate(db_user)
+        user = to_response(db_user)
+        if self.cache:
+            self.cache.store(user)
+        return user
 
     def delete_user(
         self, user_id: int, version: int, deleted_by: str = "system"
     ) -> bool:
         """Delete user."""
-        return self.user_dao.delete_user(user_id, version, deleted_by)
+        deleted = self.user_dao.delete_user(user_id, version, deleted_by)
+        if deleted and self.cache:
+            # The soft delete bumped the row to version + 1
+            self.cache.store_deleted(user_id, version + 1)
+        return deleted
 
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """User authentication."""
-        from ..security import verify_password
-
         db_user = self.user_dao.get_user_by_username(username)
         if not db_user or not db_user.is_active:
             return None
 
-        if not verify_password(password, db_user.hashed_password):
+        if not password_hasher.call(verify_password, password, db_user.hashed_password):
+            return None
+
+        if settings.password_rehash_on_login and password_needs_rehash(
+            db_user.hashed_password
+        ):
+            self._rehash_in_background(db_user, password)
+        return db_user
+
+    def _rehash_in_background(self, db_user: User, password: str) -> threading.Thread:
+        """Rehash at the current bcrypt cost without delaying the login."""
+        thread = threading.Thread(
+            target=rehash_password,
+            args=(self.db.get_bind(), db_user.id, db_user.hashed_password, password),
+            name="password-rehash",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+
+class AsyncUserService:
+    """Async user business logic service.
+
+    Mirrors :class:`UserService` on top of an ``AsyncSession``. The business
+    rules run unchanged through ``run_sync`` while database I/O goes through
+    the async driver, so the event loop is never blocked on a query.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        cache: Optional[UserCache] = user_cache,
+        flights: Optional[SingleFlight] = user_lookups,
+    ):
+        self.db = db
+        self.user_dao = AsyncUserDAO(db)
+        self.cache = cache
+        self.flights = flights
+
+    async def _run(self, func: Callable[[UserService], T]) -> T:
+        return await self.db.run_sync(
+            # Coalescing happens out here: waiting on a thread Event inside
+            # the run_sync greenlet would block the event loop
+            lambda session: func(UserService(session, self.cache, flights=None))
+        )
+
+    async def _coalesce(
+        self, lookup: str, key: Any, func: Callable[[UserService], T]
+    ) -> T:
+        """Share a ``_run`` with concurrent identical lookups on the loop."""
+        if self.flights is None:
+            return await self._run(func)
+        return await self.flights.run(lookup, key, lambda: self._run(func))
+
+    async def create_user(
+        self, user_create: UserCreate, created_by: str = "system"
+    ) -> UserResponse:
+        """Create user."""
+        hashed_password = await hash_password_async(user_create.password)
+        return await self._run(
+            lambda service: service.create_user_with_hash(
+                user_create, hashed_password, created_by
+            )
+        )
+
+    async def bulk_create_users(
+        self, rows: List[BulkRow], created_by: str = "system"
+    ) -> List[BulkUserResult]:
+        """Create a chunk of ``(index, user_create)`` rows."""
+        accepted, rejected = await self._run(
+            lambda service: service.screen_bulk_rows(rows)
+        )
+        hashes = await password_hasher.run_batch(
+            hash_password, [(user_create.password,) for _, user_create in accepted]
+        )
+        inserted = await self._run(
+            lambda service: service.insert_bulk_rows(accepted, hashes, created_by)
+        )
+        return sorted(rejected + inserted, key=lambda result: result.index)
+
+    async def export_users(
+        self,
+        fmt: str = "ndjson",
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        search: Optional[str] = None,
+        match: str = "contains",
+    ) -> AsyncIterator[str]:
+        """Stream filtered users as NDJSON or CSV text chunks."""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{fmt}'")
+        statement = self.user_dao.export_statement(
+            EXPORT_COLUMNS, is_active, username, email, search, match
+        )
+        if fmt == "csv":
+            yield serialize_export_rows([], fmt, header=True)
+        batch = []
+        async for row in self.user_dao.iter_export_rows(statement):
+            batch.append(row)
+            if len(batch) >= EXPORT_CHUNK_ROWS:
+                yield serialize_export_rows(batch, fmt)
+                batch = []
+        if batch:
+            yield serialize_export_rows(batch, fmt)
+
+    async def get_user_by_id(self, user_id: int) -> Optional[UserResponse]:
+        """Get user by ID."""
+        return await self._coalesce(
+            "by_id", user_id, lambda service: service.get_user_by_id(user_id)
+        )
+
+    async def get_user_by_username(self, username: str) -> Optional[UserResponse]:
+        """Get user by username."""
+        return await self._coalesce(
+            "by_username",
+            username,
+            lambda service: service.get_user_by_username(username),
+        )
+
+    async def get_user_version(self, user_id: int) -> Optional[int]:
+        """Current version of a live user, for ETags."""
+        return await self._run(lambda service: service.get_user_version(user_id))
+
+    async def get_user_version_by_username(
+        self, username: str
+    ) -> Optional[Tuple[int, int]]:
+        """``(id, version)`` of a live user, for ETags."""
+        return await self._run(
+            lambda service: service.get_user_version_by_username(username)
+        )
+
+    async def count_changes(self) -> int:
+        """Committed writes to the users table (the list pages' ETag)."""
+        return await self._run(lambda service: service.count_changes())
+
+    async def get_users_by_ids(self, user_ids: Sequence[int]) -> UserBatchResponse:
+        """Get many users by ID, in request order with not-found markers."""
+        return await self._run(lambda service: service.get_users_by_ids(user_ids))
+
+    async def check_username_exists(self, username: str) -> bool:
+        """Check if username exists."""
+        return await self._coalesce(
+            "username_exists",
+            username,
+            lambda service: service.check_username_exists(username),
+        )
+
+    async def check_email_exists(self, email: str) -> bool:
+        """Check if email exists."""
+        return await self._coalesce(
+            "email_exists", email, lambda service: service.check_email_exists(email)
+        )
+
+    async def list_users(
+        self,
+        page: int = 0,
+        size: int = 10,
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        search: Optional[str] = None,
+        match: str = "contains",
+    ) -> UserListResponse:
+        """Paginated user list query."""
+        return await self._run(
+            lambda service: service.list_users(
+                page, size, is_active, username, email, cursor, sort, search, match
+            )
+        )
+
+    async def update_user(
+        self, user_id: int, user_update: UserUpdate, updated_by: str = "system"
+    ) -> Optional[UserResponse]:
+        """Update user."""
+        return await self._run(
+            lambda service: service.update_user(user_id, user_update, updated_by)
+        )
+
+    async def delete_user(
+        self, user_id: int, version: int, deleted_by: str = "system"
+    ) -> bool:
+        """Delete user."""
+        return await self._run(
+            lambda service: service.delete_user(user_id, version, deleted_by)
+        )
+
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        """User authentication."""
+        db_user = await self.user_dao.get_user_by_username(username)
+        if not db_user or not db_user.is_active:
+            return None
+
+        if not await verify_password_async(password, db_user.hashed_password):
             return None
 
+        if settings.password_rehash_on_login and password_needs_rehash(
+            db_user.hashed_password
+        ):
+            self._rehash_in_background(db_user, password)
         return db_user
+
+    def _rehash_in_background(
+        self, db_user: User, password: str
+    ) -> "asyncio.Task[None]":
+        """Rehash at the current bcrypt cost without delaying the login."""
+        task = asyncio.create_task(
+            rehash_password_async(
+                self.db.bind, db_user.id, db_user.hashed_password, password
+            )
+        )
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+        return task
@@ -0,0 +1,111 @@
+"""Request coalescing ("single flight") for hot lookups.
+
+Concurrent identical lookups share one in-flight call: the first caller for a
+key (the leader) runs it, callers arriving while it runs (followers) wait for
+its result instead of sending the same query. Nothing is cached once the call
+finishes, so results are never staler than the query that produced them.
+
+Threads (sync services in the threadpool) and event-loop tasks (async
+services) are coalesced separately: a thread waits on an ``Event``, a task
+awaits a future. Async callers must use :meth:`SingleFlight.run` *outside*
+``AsyncSession.run_sync``, since blocking a greenlet there blocks the loop.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from .config import settings
+from .metrics import coalesced_lookups
+
+T = TypeVar("T")
+
+
+class _Call:
+    """A sync call in flight."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls per ``(lookup, key)``."""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[str, Hashable], _Call] = {}
+        self._futures: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def call(self, lookup: str, key: Hashable, func: Callable[[], T]) -> T:
+        """Run ``func`` unless the same lookup is in flight in another thread."""
+        flight_key = (lookup, key)
+        with self._lock:
+            existing = self._calls.get(flight_key)
+            leader = existing is None
+            if existing is None:
+                existing = self._calls[flight_key] = _Call()
+        call: _Call = existing
+
+        if not leader:
+            coalesced_lookups.labels(lookup, "follower").inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        coalesced_lookups.labels(lookup, "leader").inc()
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight_key]
+            call.done.set()
+
+    async def run(
+        self, lookup: str, key: Hashable, func: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Await ``func`` unless the same lookup is in flight on the loop.
+
+        If the leader is cancelled (client went away), waiting followers run
+        the lookup themselves rather than failing with it.
+        """
+        flight_key = (lookup, key)
+        future = self._futures.get(flight_key)
+        if future is not None and future.get_loop() is asyncio.get_running_loop():
+            coalesced_lookups.labels(lookup, "follower").inc()
+            await asyncio.wait({future})
+            if not future.cancelled():
+                return future.result()
+            return await func()
+
+        coalesced_lookups.labels(lookup, "leader").inc()
+        future = asyncio.get_running_loop().create_future()
+        self._futures[flight_key] = future
+        try:
+            result = await func()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved, even if no follower was waiting
+            raise
+        finally:
+            if self._futures.get(flight_key) is future:
+                del self._futures[flight_key]
+
+
+# Global lookup coalescer (None when disabled)
+user_lookups: Optional[SingleFlight] = (
+    SingleFlight() if settings.request_coalescing else None
+)
@@ -0,0 +1,59 @@
+"""Purge job moving long soft-deleted users to ``users_archive``.
+
+Soft-deleted rows stay in ``users`` (holding their username and email) for
+``USER_ARCHIVE_RETENTION_DAYS``, then :func:`archive_deleted_users` moves
+them in batches of ``USER_ARCHIVE_BATCH_SIZE``. Each batch is its own short
+transaction followed by a pause, so the job never holds row locks for long
+and replicas keep up. It runs in the background of every worker (see
+``app.main``) or once from cron::
+
+    python -m app.db.archival
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import users_archived
+from .dao.user_dao import UserDAO
+from .database import SessionLocal
+
+
+def archive_deleted_users(
+    retention_days: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    max_batches: Optional[int] = None,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> int:
+    """Archive users soft-deleted more than ``retention_days`` ago.
+
+    Runs batches until one comes back short (or ``max_batches`` ran) and
+    returns the number of users moved. Arguments default to the settings.
+    """
+    if retention_days is None:
+        retention_days = settings.user_archive_retention_days
+    if batch_size is None:
+        batch_size = settings.user_archive_batch_size
+    if pause is None:
+        pause = settings.user_archive_batch_pause
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        with session_factory() as db:
+            moved = UserDAO(db).archive_deleted_users(cutoff, batch_size)
+        users_archived.inc(moved)
+        total += moved
+        batches += 1
+        if moved < batch_size:
+            break
+        time.sleep(pause)
+    return total
+
+
+if __name__ == "__main__":
+    print(f"🗄️ Archived {archive_deleted_users()} deleted users")
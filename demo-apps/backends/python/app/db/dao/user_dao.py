@@ -1,14 +1,133 @@
 """User Data Access Object (DAO)."""
 
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
-from sqlalchemy import and_
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import Select
 
-from ...core.models import User
+from ...core.config import settings
+from ...core.membership import membership_index
+from ...core.models import (
+    USER_CHANGE_SHARDS,
+    User,
+    UserArchive,
+    UserChange,
+    UserSearchTrigram,
+)
 from ...core.schemas import UserCreate, UserUpdate
+from ..routing import recent_writes, use_primary
+
+T = TypeVar("T")
+
+COUNT_STRATEGIES = ("exact", "cached", "estimated", "none")
+EXPORT_BATCH_SIZE = 1000
+# IDs per IN (...) list; keeps statements well below driver parameter limits
+IN_QUERY_CHUNK_SIZE = 500
+MATCH_MODES = ("contains", "prefix")
+# Unique index named in a duplicate-key error, e.g. "users.email" (SQLite,
+# MySQL 8) or "ix_users_email" (MySQL 5.7 index name)
+DUPLICATE_KEY_PATTERN = re.compile(r"\b(?:users\.|ix_users_)(username|email)\b", re.I)
+
+
+class UserCount(NamedTuple):
+    """List total and the count strategy that produced it."""
+
+    total: Optional[int]
+    strategy: str
+
+
+class CountCache:
+    """Process-local LRU cache of list totals keyed by filter signature.
+
+    Bounded to ``max_entries``: free-form ``search`` filters would otherwise
+    add an entry per distinct query that is never read again.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """Return the cached total for ``key`` if it has not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, total = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return total
+
+    def set(self, key: Hashable, total: int) -> None:
+        """Cache ``total`` for ``key``, evicting the least recently used."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, total)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop every cached total (called after writes)."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global list count cache
+count_cache = CountCache(
+    settings.user_count_cache_ttl, settings.user_count_cache_max_entries
+)
+
+
+def trigrams(value: str) -> Set[str]:
+    """Lowercase character trigrams of ``value``."""
+    value = value.lower()
+    return {value[i : i + 3] for i in range(len(value) - 2)}
 
 
 class UserDAO:
@@ -17,13 +136,22 @@ class UserDAO:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_user(self, user_create: UserCreate, created_by: str = "system") -> User:
-        """Create user."""
+    def create_user(
+        self,
+        user_create: UserCreate,
+        hashed_password: str,
+        created_by: str = "system",
+    ) -> User:
+        """Create user with one INSERT in one transaction.
+
+        Uniqueness is left to the unique indexes: a duplicate username or email
+        surfaces as ``IntegrityError`` and is reported as ``ValueError``.
+        """
         db_user = User(
             username=user_create.username,
             email=user_create.email,
             full_name=user_create.full_name,
-            hashed_password="",  # Should pass in hashed password here
+            hashed_password=hashed_password,
             is_active=user_create.is_active,
             created_by=created_by,
             updated_by=created_by,
@@ -31,64 +159,380 @@ class UserDAO:
 
         try:
             self.db.add(db_user)
+            self.db.flush()
+            self._insert_search_terms([(db_user.id, db_user.username, db_user.email)])
+            self._count_change(db_user.id)
             self.db.commit()
-            self.db.refresh(db_user)
-            return db_user
-        except IntegrityError:
+        except IntegrityError as e:
             self.db.rollback()
-            raise ValueError("Username or email already exists")
+            if self._duplicate_column(e, user_create) == "username":
+                raise ValueError(f"Username '{user_create.username}' already exists")
+            raise ValueError(f"Email '{user_create.email}' already exists")
+        count_cache.clear()
+        if membership_index:
+            membership_index.add(db_user.username, db_user.email)
+            membership_index.note_write()
+        self._note_write(db_user.id, db_user.username, db_user.email, db_user.version)
+        return db_user
+
+    def _duplicate_column(self, error: IntegrityError, user_create: UserCreate) -> str:
+        """Name the unique column (``username``/``email``) a failed INSERT hit.
+
+        Read from the violated index in the driver message (SQLite
+        ``users.username``, MySQL ``key 'users.username'``); falls back to a
+        lookup, which also sees soft-deleted rows, if the message has no name.
+        """
+        matches = DUPLICATE_KEY_PATTERN.findall(str(error.orig))
+        if matches:
+            return matches[-1].lower()
+        taken = self.db.scalar(
+            select(exists().where(User.username == user_create.username))
+        )
+        return "username" if taken else "email"
+
+    @property
+    def _routes_reads(self) -> bool:
+        """Whether this session may send reads to a replica."""
+        return getattr(self.db, "routes_reads", False)
+
+    def _primary_if_written(self, *keys: Hashable) -> ContextManager[None]:
+        """Read from the primary if any of ``keys`` was just written."""
+        if self._routes_reads and recent_writes.contains(*keys):
+            return use_primary(self.db)
+        return nullcontext()
+
+    def _note_write(
+        self,
+        user_id: int,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        version: int = 0,
+    ) -> None:
+        """Record a write so reads of it stay on the primary for a while."""
+        if not self._routes_reads:
+            return
+        keys: List[Hashable] = [("id", user_id)]
+        if username:
+            keys.append(("username", username.lower()))
+        if email:
+            keys.append(("email", email.lower()))
+        recent_writes.note(keys, version)
+
+    def _fresh(
+        self, db_user: Optional[User], reload: Callable[[], Optional[User]]
+    ) -> Optional[User]:
+        """Re-read on the primary if a replica returned an older version.
+
+        Covers lookups by a key that was not itself written, e.g. by username
+        after the user was updated or deleted through its ID.
+        """
+        if (
+            db_user is None
+            or not self._routes_reads
+            or db_user.version >= recent_writes.version(("id", db_user.id))
+        ):
+            return db_user
+        self.db.expunge(db_user)
+        with use_primary(self.db):
+            return reload()
+
+    def _count_change(self, user_id: int) -> None:
+        """Bump the users change counter in the current write transaction."""
+        self.db.execute(
+            update(UserChange)
+            .where(UserChange.shard == user_id % USER_CHANGE_SHARDS)
+            .values(changes=UserChange.changes + 1)
+        )
+
+    def count_changes(self) -> int:
+        """Committed writes to ``users`` so far (sum of the counter shards).
+
+        Read on the primary: a lagging replica would hand out a stale list
+        ETag that then keeps matching.
+        """
+        with use_primary(self.db):
+            return self.db.scalar(
+                select(func.coalesce(func.sum(UserChange.changes), 0))
+            )
+
+    def get_user_version(self, user_id: int) -> Optional[int]:
+        """Version of a live user, without loading the row."""
+        with self._primary_if_written(("id", user_id)):
+            return self.db.scalar(
+                select(User.version).where(
+                    User.id == user_id, User.deleted_at.is_(None)
+                )
+            )
+
+    def get_user_version_by_username(self, username: str) -> Optional[Tuple[int, int]]:
+        """``(id, version)`` of a live user, without loading the row."""
+
+        def lookup() -> Optional[Row]:
+            return self.db.execute(
+                select(User.id, User.version).where(
+                    User.username == username, User.deleted_at.is_(None)
+                )
+            ).first()
+
+        with self._primary_if_written(("username", username.lower())):
+            row = lookup()
+        if (
+            row is not None
+            and self._routes_reads
+            and row.version < recent_writes.version(("id", row.id))
+        ):
+            with use_primary(self.db):
+                row = lookup()
+        return (row.id, row.version) if row is not None else None
 
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        return (
-            self.db.query(User)
-            .filter(and_(User.id == user_id, User.deleted_at.is_(None)))
-            .first()
-        )
+        with self._primary_if_written(("id", user_id)):
+            return (
+                self.db.query(User)
+                .filter(and_(User.id == user_id, User.deleted_at.is_(None)))
+                .first()
+            )
+
+    def get_users_by_ids(
+        self, user_ids: Sequence[int], chunk_size: int = IN_QUERY_CHUNK_SIZE
+    ) -> Dict[int, User]:
+        """Get live users by ID with one ``IN`` query per chunk.
+
+        Returns a mapping keyed by ID; missing or deleted IDs are absent.
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        users: Dict[int, User] = {}
+        with self._primary_if_written(*(("id", user_id) for user_id in unique_ids)):
+            for start in range(0, len(unique_ids), chunk_size):
+                chunk = unique_ids[start : start + chunk_size]
+                rows = self.db.scalars(
+                    select(User).where(User.id.in_(chunk), User.deleted_at.is_(None))
+                )
+                users.update((user.id, user) for user in rows)
+        return users
 
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        return (
-            self.db.query(User)
-            .filter(and_(User.username == username, User.deleted_at.is_(None)))
-            .first()
-        )
+
+        def lookup() -> Optional[User]:
+            return (
+                self.db.query(User)
+                .filter(and_(User.username == username, User.deleted_at.is_(None)))
+                .first()
+            )
+
+        with self._primary_if_written(("username", username.lower())):
+            return self._fresh(lookup(), lookup)
 
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
-        return (
-            self.db.query(User)
-            .filter(and_(User.email == email, User.deleted_at.is_(None)))
-            .first()
-        )
+
+        def lookup() -> Optional[User]:
+            return (
+                self.db.query(User)
+                .filter(and_(User.email == email, User.deleted_at.is_(None)))
+                .first()
+            )
+
+        with self._primary_if_written(("email", email.lower())):
+            return self._fresh(lookup(), lookup)
 
     def check_username_exists(self, username: str) -> bool:
         """Check if username exists."""
-        return (
-            self.db.query(User)
-            .filter(and_(User.username == username, User.deleted_at.is_(None)))
-            .first()
-            is not None
-        )
+        with self._primary_if_written(("username", username.lower())):
+            return bool(
+                self.db.scalar(
+                    select(
+                        exists().where(
+                            and_(User.username == username, User.deleted_at.is_(None))
+                        )
+                    )
+                )
+            )
 
     def check_email_exists(self, email: str) -> bool:
         """Check if email exists."""
-        return (
-            self.db.query(User)
-            .filter(and_(User.email == email, User.deleted_at.is_(None)))
-            .first()
-            is not None
+        with self._primary_if_written(("email", email.lower())):
+            return bool(
+                self.db.scalar(
+                    select(
+                        exists().where(
+                            and_(User.email == email, User.deleted_at.is_(None))
+                        )
+                    )
+                )
+            )
+
+    def find_taken(
+        self, usernames: List[str], emails: List[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """Lowercased usernames and emails already holding a unique key.
+
+        Soft-deleted rows are included because they still occupy the unique
+        indexes, so an insert colliding with them would fail. Always read from
+        the primary, since the result decides what gets inserted.
+        """
+        taken_usernames: Set[str] = set()
+        taken_emails: Set[str] = set()
+        with use_primary(self.db):
+            if usernames:
+                taken_usernames = {
+                    value.lower()
+                    for value in self.db.scalars(
+                        select(User.username).where(User.username.in_(usernames))
+                    )
+                }
+            if emails:
+                taken_emails = {
+                    value.lower()
+                    for value in self.db.scalars(
+                        select(User.email).where(User.email.in_(emails))
+                    )
+                }
+        return taken_usernames, taken_emails
+
+    def bulk_create_users(
+        self, rows: List[Tuple[UserCreate, str]], created_by: str = "system"
+    ) -> Dict[str, int]:
+        """Insert ``(user_create, hashed_password)`` rows in one transaction.
+
+        Uses a single multi-row INSERT and returns the new IDs keyed by
+        username. Raises ``IntegrityError`` (after rolling back) if any row
+        collides with an existing unique key.
+        """
+        values = [
+            {
+                "username": user_create.username,
+                "email": user_create.email,
+                "full_name": user_create.full_name,
+                "hashed_password": hashed_password,
+                "is_active": user_create.is_active,
+                "created_by": created_by,
+                "updated_by": created_by,
+            }
+            for user_create, hashed_password in rows
+        ]
+        usernames = [value["username"] for value in values]
+        try:
+            self.db.execute(insert(User), values)
+            ids: Dict[str, int] = {
+                username: user_id
+                for username, user_id in self.db.execute(
+                    select(User.username, User.id).where(User.username.in_(usernames))
+                )
+            }
+            self._insert_search_terms(
+                [
+                    (ids[value["username"]], value["username"], value["email"])
+                    for value in values
+                ]
+            )
+            self._count_change(min(ids.values()))
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise
+
+        count_cache.clear()
+        if membership_index:
+            for value in values:
+                membership_index.add(value["username"], value["email"])
+            membership_index.note_write()
+        for value in values:
+            self._note_write(
+                ids[value["username"]], value["username"], value["email"], 1
+            )
+        return ids
+
+    @property
+    def _uses_fulltext(self) -> bool:
+        """Whether search runs on the MySQL ngram full-text index."""
+        return self.db.get_bind().dialect.name == "mysql"
+
+    def _index_search_terms(self, db_user: User, remove_only: bool = False) -> None:
+        """Refresh the trigram rows of ``db_user`` (non-MySQL databases only)."""
+        if self._uses_fulltext:
+            return
+        self.db.execute(
+            delete(UserSearchTrigram).where(UserSearchTrigram.user_id == db_user.id)
         )
+        if remove_only:
+            return
+        self._insert_search_terms([(db_user.id, db_user.username, db_user.email)])
 
-    def list_users(
+    def _insert_search_terms(self, users: List[Tuple[int, str, str]]) -> None:
+        """Insert trigram rows for ``(id, username, email)`` tuples."""
+        if self._uses_fulltext:
+            return
+        rows = [
+            {"trigram": gram, "user_id": user_id}
+            for user_id, username, email in users
+            for gram in trigrams(username) | trigrams(email)
+        ]
+        if rows:
+            self.db.execute(insert(UserSearchTrigram), rows)
+
+    def rebuild_search_index(self) -> int:
+        """Rebuild the trigram side table from live users; returns user count."""
+        if self._uses_fulltext:
+            return 0
+        self.db.execute(delete(UserSearchTrigram))
+        users = self.db.query(User).filter(User.deleted_at.is_(None)).all()
+        for db_user in users:
+            self._index_search_terms(db_user)
+        self.db.commit()
+        return len(users)
+
+    def _search_condition(self, search: str) -> ColumnElement[bool]:
+        """Substring match on username or email backed by an n-gram index."""
+        term = search.strip().lower()
+        if self._uses_fulltext:
+            phrase = '"' + term.replace('"', "") + '"'
+            return mysql_match(
+                User.username, User.email, against=phrase
+            ).in_boolean_mode()
+
+        grams = trigrams(term)
+        if not grams:
+            # Too short for trigrams: prefix match can still use the B-tree indexes
+            return or_(
+                User.username.startswith(term, autoescape=True),
+                User.email.startswith(term, autoescape=True),
+            )
+
+        # Users holding every trigram of the term, then confirm the substring
+        candidates = (
+            select(UserSearchTrigram.user_id)
+            .where(UserSearchTrigram.trigram.in_(grams))
+            .group_by(UserSearchTrigram.user_id)
+            .having(func.count(UserSearchTrigram.trigram) == len(grams))
+        )
+        return and_(
+            User.id.in_(candidates),
+            or_(
+                User.username.contains(term, autoescape=True),
+                User.email.contains(term, autoescape=True),
+            ),
+        )
+
+    def _filtered_query(
         self,
-        page: int = 0,
-        size: int = 10,
         is_active: Optional[bool] = None,
         username: Optional[str] = None,
         email: Optional[str] = None,
-    ) -> Tuple[List[User], int]:
-        """Paginated user list query."""
+        search: Optional[str] = None,
+        match: str = "contains",
+    ) -> Query:
+        """Base list query with soft-delete and filter conditions applied.
+
+        ``match="prefix"`` turns the username/email filters into ``LIKE 'x%'``
+        so they can use the unique indexes; ``search`` is an indexed substring
+        match across both columns.
+        """
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unsupported match mode '{match}'")
+
         query = self.db.query(User).filter(User.deleted_at.is_(None))
 
         # Apply filter conditions
@@ -96,72 +540,538 @@ class UserDAO:
             query = query.filter(User.is_active == is_active)
 
         if username:
-            query = query.filter(User.username.contains(username))
+            if match == "prefix":
+                query = query.filter(
+                    User.username.startswith(username, autoescape=True)
+                )
+            else:
+                query = query.filter(User.username.contains(username))
 
         if email:
-            query = query.filter(User.email.contains(email))
+            if match == "prefix":
+                query = query.filter(User.email.startswith(email, autoescape=True))
+            else:
+                query = query.filter(User.email.contains(email))
+
+        if search and search.strip():
+            query = query.filter(self._search_condition(search))
+
+        return query
+
+    def _estimate_total(self) -> int:
+        """Estimate the table size from statistics without scanning it."""
+        if self.db.get_bind().dialect.name == "mysql":
+            rows = self.db.execute(
+                text(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+                ),
+                {"table": User.__tablename__},
+            ).scalar()
+            if rows is not None:
+                return int(rows)
+        # Fall back to the primary key high-water mark (one index lookup)
+        return self.db.query(func.max(User.id)).scalar() or 0
+
+    @staticmethod
+    def _filter_key(
+        is_active: Optional[bool],
+        username: Optional[str],
+        email: Optional[str],
+        search: Optional[str],
+        match: str,
+    ) -> Tuple[Any, ...]:
+        """Hashable filter signature (match only matters with a text filter)."""
+        return (
+            is_active,
+            username or None,
+            email or None,
+            (search or "").strip().lower() or None,
+            match if (username or email) else None,
+        )
+
+    def _count(
+        self, query: Query, filters: Tuple[Any, ...], strategy: Optional[str]
+    ) -> UserCount:
+        """Count list results using the configured strategy."""
+        strategy = strategy or settings.user_count_strategy
+        if strategy not in COUNT_STRATEGIES:
+            raise ValueError(f"Unsupported count strategy '{strategy}'")
+
+        if strategy == "none":
+            return UserCount(None, "none")
+
+        if strategy == "estimated":
+            # Table statistics only describe the unfiltered table
+            if all(value is None for value in filters):
+                return UserCount(self._estimate_total(), "estimated")
+            strategy = "cached"
+
+        if strategy == "cached":
+            total = count_cache.get(filters)
+            if total is None:
+                total = query.count()
+                count_cache.set(filters, total)
+            return UserCount(total, "cached")
+
+        return UserCount(query.count(), "exact")
+
+    def list_users(
+        self,
+        page: int = 0,
+        size: int = 10,
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        search: Optional[str] = None,
+        match: str = "contains",
+        count_strategy: Optional[str] = None,
+    ) -> Tuple[List[User], UserCount, bool]:
+        """Paginated user list query.
+
+        Returns the page, the total count and whether more rows follow.
+        """
+        query = self._filtered_query(is_active, username, email, search, match)
 
         # Get total count
-        total = query.count()
+        filters = self._filter_key(is_active, username, email, search, match)
+        count = self._count(query, filters, count_strategy)
 
-        # Paginated query
-        users = query.offset(page * size).limit(size).all()
+        # Paginated query (one extra row tells whether another page exists)
+        users = query.offset(page * size).limit(size + 1).all()
+        has_more = len(users) > size
 
-        return users, total
+        return users[:size], count, has_more
 
-    def update_user(
-        self, user_id: int, user_update: UserUpdate, updated_by: str = "system"
-    ) -> Optional[User]:
-        """Update user (optimistic lock)."""
-        db_user = self.get_user_by_id(user_id)
-        if not db_user:
-            return None
+    def list_users_by_cursor(
+        self,
+        size: int = 10,
+        after: Optional[Tuple[Any, ...]] = None,
+        sort: str = "id",
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        search: Optional[str] = None,
+        match: str = "contains",
+        count_strategy: Optional[str] = None,
+    ) -> Tuple[List[User], UserCount, bool]:
+        """Keyset paginated user list query.
+
+        ``after`` holds the sort key values of the last row of the previous
+        page, so every page is an index range scan instead of an offset scan.
+        Returns the page, the total count and whether more rows follow.
+        """
+        query = self._filtered_query(is_active, username, email, search, match)
+        filters = self._filter_key(is_active, username, email, search, match)
+        count = self._count(query, filters, count_strategy)
+
+        if sort == "created_at":
+            if after is not None:
+                created_at, last_id = after
+                query = query.filter(
+                    or_(
+                        User.created_at > created_at,
+                        and_(User.created_at == created_at, User.id > last_id),
+                    )
+                )
+            query = query.order_by(User.created_at, User.id)
+        else:
+            if after is not None:
+                query = query.filter(User.id > after[0])
+            query = query.order_by(User.id)
+
+        # Fetch one extra row to know whether another page exists
+        users = query.limit(size + 1).all()
+        has_more = len(users) > size
+        return users[:size], count, has_more
+
+    def export_statement(
+        self,
+        columns: List[str],
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        search: Optional[str] = None,
+        match: str = "contains",
+    ) -> Select:
+        """Column-only SELECT of filtered users in primary key order."""
+        query = self._filtered_query(is_active, username, email, search, match)
+        return (
+            query.with_entities(*(getattr(User, column) for column in columns))
+            .order_by(User.id)
+            .statement
+        )
+
+    def iter_export_rows(
+        self, statement: Select, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[Row]:
+        """Stream rows through a server-side cursor, ``batch_size`` at a time."""
+        result = self.db.execute(statement.execution_options(yield_per=batch_size))
+        try:
+            yield from result
+        finally:
+            result.close()
+
+    @property
+    def _supports_update_returning(self) -> bool:
+        """Whether ``UPDATE ... RETURNING`` is available (not on MySQL)."""
+        return self.db.get_bind().dialect.update_returning
+
+    def _versioned_update(
+        self, user_id: int, version: int, values: Dict[str, Any], fetch: bool
+    ) -> Tuple[bool, Optional[User]]:
+        """Apply ``values`` only if the live row is still at ``version``.
+
+        One conditional ``UPDATE ... WHERE id AND version AND deleted_at IS
+        NULL`` that also bumps the version. With ``fetch`` the updated row is
+        returned, via ``RETURNING`` where the dialect supports it and a
+        primary-key read in the same transaction otherwise.
+        """
+        statement = (
+            update(User)
+            .where(
+                User.id == user_id,
+                User.version == version,
+                User.deleted_at.is_(None),
+            )
+            .values(**values, version=User.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if fetch and self._supports_update_returning:
+            db_user = self.db.scalars(
+                statement.returning(User),
+                execution_options={"populate_existing": True},
+            ).one_or_none()
+            return db_user is not None, db_user
+
+        updated = self.db.execute(statement).rowcount == 1
+        if not (updated and fetch):
+            return updated, None
+        return True, self.db.get(User, user_id, populate_existing=True)
+
+    def _raise_if_version_conflict(self, user_id: int, version: int) -> None:
+        """After a conditional write matched no row, tell conflict from missing.
 
-        # Check version number (optimistic lock)
-        if db_user.version != user_update.version:
+        Raises ``ValueError`` if the live user exists at another version;
+        returns normally if there is no live user with this ID.
+        """
+        current = self.db.scalar(
+            select(User.version).where(User.id == user_id, User.deleted_at.is_(None))
+        )
+        if current is not None:
             raise ValueError(
-                f"Version conflict: current version {db_user.version}, "
-                f"requested version {user_update.version}"
+                f"Version conflict: current version {current}, "
+                f"requested version {version}"
             )
 
-        # Update fields
+    def update_user(
+        self, user_id: int, user_update: UserUpdate, updated_by: str = "system"
+    ) -> Optional[User]:
+        """Update user (optimistic lock) with one conditional UPDATE."""
         update_data = user_update.model_dump(exclude_unset=True, exclude={"version"})
-        for field, value in update_data.items():
-            setattr(db_user, field, value)
-
-        # Update audit fields
-        db_user.updated_at = datetime.utcnow()
-        db_user.updated_by = updated_by
-        db_user.version += 1
+        values = {
+            **update_data,
+            "updated_at": datetime.utcnow(),
+            "updated_by": updated_by,
+        }
 
         try:
+            updated, db_user = self._versioned_update(
+                user_id, user_update.version, values, fetch=True
+            )
+            if not updated:
+                self._raise_if_version_conflict(user_id, user_update.version)
+                return None
+
+            if "email" in update_data:
+                self._index_search_terms(db_user)
+            self._count_change(user_id)
             self.db.commit()
-            self.db.refresh(db_user)
-            return db_user
         except IntegrityError:
             self.db.rollback()
-            raise ValueError("Email already exists")
+            raise ValueError(
+                f"Email '{user_update.email}' is already used by another user"
+            )
+        count_cache.clear()
+        if membership_index:
+            if "email" in update_data:
+                membership_index.add(db_user.username, db_user.email)
+            membership_index.note_write()
+        self._note_write(user_id, db_user.username, db_user.email, db_user.version)
+        return db_user
+
+    def replace_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Swap a stored hash for a rehashed one of the same password.
+
+        Conditional on the old hash, so a concurrent password change wins.
+        Neither version nor updated_at change: the user did not change, only
+        the hash's cost did. Returns whether the row was updated.
+        """
+        result = self.db.execute(
+            update(User)
+            .where(
+                User.id == user_id,
+                User.hashed_password == old_hash,
+                User.deleted_at.is_(None),
+            )
+            # Keep updated_at: its onupdate default would otherwise fire
+            .values(hashed_password=new_hash, updated_at=User.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount == 1
 
     def delete_user(
         self, user_id: int, version: int, deleted_by: str = "system"
     ) -> bool:
-        """Soft delete user (optimistic lock)."""
-        db_user = self.get_user_by_id(user_id)
-        if not db_user:
+        """Soft delete user (optimistic lock) with one conditional UPDATE."""
+        now = datetime.utcnow()
+        deleted, _ = self._versioned_update(
+            user_id,
+            version,
+            {"deleted_at": now, "updated_at": now, "updated_by": deleted_by},
+            fetch=False,
+        )
+        if not deleted:
+            self._raise_if_version_conflict(user_id, version)
             return False
 
-        # Check version number (optimistic lock)
-        if db_user.version != version:
-            raise ValueError(
-                f"Version conflict: current version {db_user.version}, "
-                f"requested version {version}"
+        if not self._uses_fulltext:
+            self.db.execute(
+                delete(UserSearchTrigram).where(UserSearchTrigram.user_id == user_id)
             )
+        self._count_change(user_id)
+        self.db.commit()
+        count_cache.clear()
+        if membership_index:
+            membership_index.note_removed()
+            membership_index.note_write()
+        self._note_write(user_id, version=version + 1)
+        return True
 
-        # Soft delete
-        db_user.deleted_at = datetime.utcnow()
-        db_user.updated_at = datetime.utcnow()
-        db_user.updated_by = deleted_by
-        db_user.version += 1
+    @property
+    def _supports_skip_locked(self) -> bool:
+        """Whether ``FOR UPDATE SKIP LOCKED`` is available (MySQL 8+)."""
+        dialect = self.db.get_bind().dialect
+        if dialect.name != "mysql":
+            return True  # PostgreSQL has it; SQLite drops FOR UPDATE entirely
+        return (dialect.server_version_info or (0,)) >= (8,)
 
+    def archive_deleted_users(self, deleted_before: datetime, batch_size: int) -> int:
+        """Move one batch of users soft-deleted before a cutoff to the archive.
+
+        Locks up to ``batch_size`` IDs on the primary via the
+        ``deleted_at``-leading indexes (``SKIP LOCKED`` where supported, so
+        concurrent purgers never wait on each other), copies the rows with
+        INSERT ... SELECT and deletes them, all in one short transaction.
+        Returns the number of users moved.
+        """
+        with use_primary(self.db):
+            ids = (
+                self.db.execute(
+                    select(User.id)
+                    .where(User.deleted_at < deleted_before)
+                    .order_by(User.deleted_at)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=self._supports_skip_locked)
+                )
+                .scalars()
+                .all()
+            )
+        if not ids:
+            self.db.rollback()
+            return 0
+
+        columns = [column.name for column in User.__table__.columns]
+        archived_at = datetime.utcnow()
+        self.db.execute(
+            insert(UserArchive).from_select(
+                columns + ["archived_at"],
+                select(*User.__table__.columns, literal(archived_at, DateTime)).where(
+                    User.id.in_(ids)
+                ),
+            )
+        )
+        # Search terms were dropped at soft-delete time (delete_user)
+        self.db.execute(
+            delete(User).where(User.id.in_(ids), User.deleted_at.isnot(None))
+        )
         self.db.commit()
-        return True
+        return len(ids)
+
+
+class AsyncUserDAO:
+    """Async user data access object.
+
+    Each method runs the matching :class:`UserDAO` query on the async
+    session's connection via ``run_sync``, so the SQL stays in one place
+    while database I/O goes through the async driver.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _run(self, func: Callable[[UserDAO], T]) -> T:
+        return await self.db.run_sync(lambda session: func(UserDAO(session)))
+
+    async def create_user(
+        self,
+        user_create: UserCreate,
+        hashed_password: str,
+        created_by: str = "system",
+    ) -> User:
+        """Create user."""
+        return await self._run(
+            lambda dao: dao.create_user(user_create, hashed_password, created_by)
+        )
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID."""
+        return await self._run(lambda dao: dao.get_user_by_id(user_id))
+
+    async def count_changes(self) -> int:
+        """Committed writes to ``users`` so far."""
+        return await self._run(lambda dao: dao.count_changes())
+
+    async def get_user_version(self, user_id: int) -> Optional[int]:
+        """Version of a live user, without loading the row."""
+        return await self._run(lambda dao: dao.get_user_version(user_id))
+
+    async def get_user_version_by_username(
+        self, username: str
+    ) -> Optional[Tuple[int, int]]:
+        """``(id, version)`` of a live user, without loading the row."""
+        return await self._run(lambda dao: dao.get_user_version_by_username(username))
+
+    async def get_users_by_ids(
+        self, user_ids: Sequence[int], chunk_size: int = IN_QUERY_CHUNK_SIZE
+    ) -> Dict[int, User]:
+        """Get live users by ID with one ``IN`` query per chunk."""
+        return await self._run(lambda dao: dao.get_users_by_ids(user_ids, chunk_size))
+
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        """Get user by username."""
+        return await self._run(lambda dao: dao.get_user_by_username(username))
+
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email."""
+        return await self._run(lambda dao: dao.get_user_by_email(email))
+
+    async def check_username_exists(self, username: str) -> bool:
+        """Check if username exists."""
+        return await self._run(lambda dao: dao.check_username_exists(username))
+
+    async def check_email_exists(self, email: str) -> bool:
+        """Check if email exists."""
+        return await self._run(lambda dao: dao.check_email_exists(email))
+
+    async def list_users(
+        self,
+        page: int = 0,
+        size: int = 10,
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        search: Optional[str] = None,
+        match: str = "contains",
+        count_strategy: Optional[str] = None,
+    ) -> Tuple[List[User], UserCount, bool]:
+        """Paginated user list query."""
+        return await self._run(
+            lambda dao: dao.list_users(
+                page, size, is_active, username, email, search, match, count_strategy
+            )
+        )
+
+    async def list_users_by_cursor(
+        self,
+        size: int = 10,
+        after: Optional[Tuple[Any, ...]] = None,
+        sort: str = "id",
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        search: Optional[str] = None,
+        match: str = "contains",
+        count_strategy: Optional[str] = None,
+    ) -> Tuple[List[User], UserCount, bool]:
+        """Keyset paginated user list query."""
+        return await self._run(
+            lambda dao: dao.list_users_by_cursor(
+                size,
+                after,
+                sort,
+                is_active,
+                username,
+                email,
+                search,
+                match,
+                count_strategy,
+            )
+        )
+
+    async def find_taken(
+        self, usernames: List[str], emails: List[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """Lowercased usernames and emails already holding a unique key."""
+        return await self._run(lambda dao: dao.find_taken(usernames, emails))
+
+    async def bulk_create_users(
+        self, rows: List[Tuple[UserCreate, str]], created_by: str = "system"
+    ) -> Dict[str, int]:
+        """Insert ``(user_create, hashed_password)`` rows in one transaction."""
+        return await self._run(lambda dao: dao.bulk_create_users(rows, created_by))
+
+    def export_statement(
+        self,
+        columns: List[str],
+        is_active: Optional[bool] = None,
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        search: Optional[str] = None,
+        match: str = "contains",
+    ) -> Select:
+        """Column-only SELECT of filtered users in primary key order."""
+        # Building the statement does no I/O, so the sync DAO can do it directly
+        return UserDAO(self.db.sync_session).export_statement(
+            columns, is_active, username, email, search, match
+        )
+
+    async def iter_export_rows(
+        self, statement: Select, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Row]:
+        """Stream rows through a server-side cursor, ``batch_size`` at a time."""
+        result = await self.db.stream(statement.execution_options(yield_per=batch_size))
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    async def rebuild_search_index(self) -> int:
+        """Rebuild the trigram side table from live users."""
+        return await self._run(lambda dao: dao.rebuild_search_index())
+
+    async def update_user(
+        self, user_id: int, user_update: UserUpdate, updated_by: str = "system"
+    ) -> Optional[User]:
+        """Update user (optimistic lock)."""
+        return await self._run(
+            lambda dao: dao.update_user(user_id, user_update, updated_by)
+        )
+
+    async def replace_password_hash(
+        self, user_id: int, old_hash: str, new_hash: str
+    ) -> bool:
+        """Async version of :meth:`UserDAO.replace_password_hash`."""
+        return await self._run(
+            lambda dao: dao.replace_password_hash(user_id, old_hash, new_hash)
+        )
+
+    async def delete_user(
+        self, user_id: int, version: int, deleted_by: str = "system"
+    ) -> bool:
+        """Soft delete user (optimistic lock)."""
+        return await self._run(
+            lambda dao: dao.delete_user(user_id, version, deleted_by)
+        )
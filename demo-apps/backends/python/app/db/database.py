@@ -1,22 +1,162 @@
 """Database connection and session management."""
 
-from typing import Generator
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from ..core.config import settings
+from ..core.metrics import (
+    db_pool_checkout_duration,
+    instrument_engine,
+    time_pool_checkout,
+)
+from .routing import ReplicaSet, RoutingSession
+
+# Sync driver -> async driver used when async mode is enabled
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+PRE_PING_STRATEGIES = ("always", "on-error", "interval")
+
+
+def to_async_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver."""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Engine keyword arguments built from the pool settings."""
+    if settings.db_pre_ping not in PRE_PING_STRATEGIES:
+        raise ValueError(f"Unknown DB pre-ping strategy: {settings.db_pre_ping}")
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.db_pre_ping == "always",
+        "pool_recycle": settings.db_pool_recycle,
+        "echo": settings.db_echo,
+    }
+    if url.startswith("sqlite"):
+        # SQLite connections are used from the threadpool that runs sync
+        # routes; its default pools do not take sizing arguments
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    return options
+
+
+def install_interval_pre_ping(engine: Engine, interval: float) -> None:
+    """Ping connections on checkout only if they sat idle for ``interval``.
+
+    Busy connections skip the extra round trip that ``pool_pre_ping`` adds to
+    every checkout; a failed ping raises ``DisconnectionError`` so the pool
+    retries with a fresh connection.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < interval:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+        except Exception as e:
+            raise DisconnectionError("Idle connection failed pre-ping") from e
+
+
+def configure_engine(engine: Engine) -> None:
+    """Attach pre-ping, checkout timing and metrics hooks to a (sync) engine."""
+    if settings.db_pre_ping == "interval":
+        install_interval_pre_ping(engine, settings.db_pre_ping_interval)
+    time_pool_checkout(engine)
+    if settings.metrics_enabled:
+        instrument_engine(engine)
+
+
+if settings.db_log_level:
+    logging.getLogger("sqlalchemy.engine").setLevel(settings.db_log_level.upper())
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=not settings.is_production,  # Do not print SQL in production
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+configure_engine(engine)
+
+# Read replicas (reads are routed there by RoutingSession, see .routing)
+replica_engines = [
+    create_engine(url, **engine_options(url)) for url in settings.database_replica_urls
+]
+for replica_engine in replica_engines:
+    configure_engine(replica_engine)
+replicas = (
+    ReplicaSet(replica_engines, settings.replica_eject_seconds)
+    if replica_engines
+    else None
+)
+
+# Create session factory. Committed objects stay loaded (as in the async
+# factory), so returning a just-written row needs no reload round trip.
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    expire_on_commit=False,
+    replicas=replicas,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async engine and session factory (only created in async mode, since the
+# async driver may not be installed otherwise)
+async_engine: Optional[AsyncEngine] = None
+async_replicas: Optional[ReplicaSet] = None
+AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+
+if settings.db_async:
+    async_url = settings.async_database_url or to_async_url(settings.database_url)
+    async_engine = create_async_engine(async_url, **engine_options(async_url))
+    configure_engine(async_engine.sync_engine)
+    async_replica_engines = []
+    for url in settings.database_replica_urls:
+        replica_url = to_async_url(url)
+        async_replica_engine = create_async_engine(
+            replica_url, **engine_options(replica_url)
+        )
+        configure_engine(async_replica_engine.sync_engine)
+        async_replica_engines.append(async_replica_engine.sync_engine)
+    if async_replica_engines:
+        async_replicas = ReplicaSet(
+            async_replica_engines, settings.replica_eject_seconds
+        )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=RoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+        replicas=async_replicas,
+    )
 
 # Declarative base class
 Base = declarative_base()
@@ -29,3 +169,59 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency injection function to get async database session."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled (set DB_ASYNC=true)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_status(target: Engine) -> Dict[str, Any]:
+    """Pool occupancy and checkout latency of ``target``, for health checks.
+
+    Sizing fields are None for pools without a fixed size (SQLite's).
+    """
+    pool = target.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        checked_out = pool.checkedout()
+        status.update(
+            size=pool.size(),
+            max_overflow=getattr(pool, "_max_overflow", 0),
+            capacity=capacity,
+            checked_out=checked_out,
+            checked_in=pool.checkedin(),
+            saturation=round(checked_out / capacity, 3) if capacity else None,
+            timeout=getattr(pool, "_timeout", None),
+        )
+    checkout = db_pool_checkout_duration.labels()
+    count = sum(checkout.counts)
+    p99 = checkout.quantile(0.99)
+    status.update(
+        checkout_count=count,
+        checkout_mean_ms=round(checkout.sum / count * 1000, 3) if count else None,
+        checkout_p99_ms=(
+            p99 * 1000 if p99 is not None and p99 != float("inf") else None
+        ),
+    )
+    return status
+
+
+def probe_database(target: Engine) -> float:
+    """Check out a connection and run ``SELECT 1``; returns seconds taken."""
+    started = time.perf_counter()
+    with target.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return time.perf_counter() - started
+
+
+async def probe_database_async(target: AsyncEngine) -> float:
+    """Async variant of :func:`probe_database`."""
+    started = time.perf_counter()
+    async with target.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+    return time.perf_counter() - started
@@ -0,0 +1,51 @@
+"""Create users table.
+
+Replaces 0001_create_users.sql; same columns, with the index names that
+SQLAlchemy generates for the model.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-01-01 00:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, comment="User ID"),
+        sa.Column("username", sa.String(50), nullable=False, comment="Username"),
+        sa.Column("email", sa.String(255), nullable=False, comment="Email"),
+        sa.Column("full_name", sa.String(100), nullable=True, comment="Full name"),
+        sa.Column(
+            "hashed_password",
+            sa.String(255),
+            nullable=False,
+            comment="Hashed password",
+        ),
+        sa.Column("is_active", sa.Boolean(), nullable=True, comment="Is active"),
+        sa.Column("created_at", sa.DateTime(), nullable=True, comment="Created at"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True, comment="Updated at"),
+        sa.Column("created_by", sa.String(50), nullable=True, comment="Created by"),
+        sa.Column("updated_by", sa.String(50), nullable=True, comment="Updated by"),
+        sa.Column("version", sa.Integer(), nullable=True, comment="Version"),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True, comment="Deleted at"),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("users")
@@ -0,0 +1,54 @@
+"""Add the user search index.
+
+Replaces 0002_add_user_search_index.sql: an ngram full-text index on MySQL,
+and the trigram side table used by other databases.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-01-01 00:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_search_trigrams",
+        sa.Column(
+            "trigram", sa.String(3), primary_key=True, comment="Lowercase trigram"
+        ),
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+            comment="User ID",
+        ),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+    op.create_index(
+        "ix_user_search_trigrams_user_id", "user_search_trigrams", ["user_id"]
+    )
+    if op.get_bind().dialect.name == "mysql":
+        op.create_index(
+            "ft_users_search",
+            "users",
+            ["username", "email"],
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "mysql":
+        op.drop_index("ft_users_search", table_name="users")
+    op.drop_table("user_search_trigrams")
@@ -0,0 +1,25 @@
+"""Add the (created_at, id) index for keyset pagination.
+
+Backs ``GET /users?sort=created_at&cursor=...``, which orders and seeks on
+``(created_at, id)``.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-01-01 00:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_created_at_id", table_name="users")
@@ -0,0 +1,35 @@
+"""Add soft-delete-aware composite indexes.
+
+Every user query filters ``deleted_at IS NULL``; lists add ``is_active`` and
+page by ``id`` or ``(created_at, id)``. Leading with ``deleted_at`` keeps
+those scans on live rows. ``ix_users_live_created_at_id`` supersedes the
+``(created_at, id)`` index from 0003.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-01-01 00:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_users_live_active_id", "users", ["deleted_at", "is_active", "id"]
+    )
+    op.create_index(
+        "ix_users_live_created_at_id", "users", ["deleted_at", "created_at", "id"]
+    )
+    op.drop_index("ix_users_created_at_id", table_name="users")
+
+
+def downgrade() -> None:
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+    op.drop_index("ix_users_live_created_at_id", table_name="users")
+    op.drop_index("ix_users_live_active_id", table_name="users")
@@ -0,0 +1,51 @@
+"""Create the users_archive table.
+
+Soft-deleted users older than the retention window are moved here by the
+archival job (app.db.archival), keeping ``users`` sized to live users.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-01-01 00:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users_archive",
+        sa.Column(
+            "id", sa.Integer(), primary_key=True, autoincrement=False, comment="User ID"
+        ),
+        sa.Column("username", sa.String(50), nullable=False, comment="Username"),
+        sa.Column("email", sa.String(255), nullable=False, comment="Email"),
+        sa.Column("full_name", sa.String(100), nullable=True, comment="Full name"),
+        sa.Column(
+            "hashed_password",
+            sa.String(255),
+            nullable=False,
+            comment="Hashed password",
+        ),
+        sa.Column("is_active", sa.Boolean(), nullable=True, comment="Is active"),
+        sa.Column("created_at", sa.DateTime(), nullable=True, comment="Created at"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True, comment="Updated at"),
+        sa.Column("created_by", sa.String(50), nullable=True, comment="Created by"),
+        sa.Column("updated_by", sa.String(50), nullable=True, comment="Updated by"),
+        sa.Column("version", sa.Integer(), nullable=True, comment="Version"),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True, comment="Deleted at"),
+        sa.Column("archived_at", sa.DateTime(), nullable=False, comment="Archived at"),
+        mysql_engine="InnoDB",
+        mysql_charset="utf8mb4",
+        mysql_collate="utf8mb4_unicode_ci",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("users_archive")
@@ -0,0 +1,41 @@
+"""Create the user_changes counter.
+
+A sharded count of committed writes to ``users``, bumped by the DAO in each
+write's transaction; list responses derive their weak ETag from its sum.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-01-01 00:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Must match app.core.models.USER_CHANGE_SHARDS
+SHARDS = 16
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "user_changes",
+        sa.Column(
+            "shard",
+            sa.Integer(),
+            primary_key=True,
+            autoincrement=False,
+            comment="Shard",
+        ),
+        sa.Column("changes", sa.BigInteger(), nullable=False, comment="Writes counted"),
+        mysql_engine="InnoDB",
+    )
+    op.bulk_insert(table, [{"shard": shard, "changes": 0} for shard in range(SHARDS)])
+
+
+def downgrade() -> None:
+    op.drop_table("user_changes")
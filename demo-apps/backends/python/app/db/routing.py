@@ -0,0 +1,168 @@
+"""Primary/replica routing for database sessions.
+
+:class:`RoutingSession` sends writes (flushes and INSERT/UPDATE/DELETE) to the
+primary engine and plain reads to one replica picked per session from a
+:class:`ReplicaSet`. A session that has written reads from the primary from
+then on, and :func:`use_primary` forces it for a block.
+
+Read-your-writes across requests is handled by :data:`recent_writes`: the DAO
+records the keys and row version of every write, and for a short window
+reads of those keys go to the primary, as do rows a replica returns with an
+older version than the one just written. The window is per process.
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from ..core.config import settings
+
+# Recently written keys kept before expired ones are swept
+RECENT_WRITES_SWEEP_SIZE = 10000
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, ejecting ones that fail.
+
+    A replica whose connection or query fails with a disconnect or
+    ``OperationalError`` is skipped for ``eject_seconds``, then tried again.
+    With every replica ejected, reads fall back to the primary.
+    """
+
+    def __init__(self, engines: Sequence[Engine], eject_seconds: float = 30.0):
+        self.engines = list(engines)
+        self.eject_seconds = eject_seconds
+        self._ejected_until: Dict[Engine, float] = {}
+        self._counter = itertools.count()
+        for engine in self.engines:
+            self._watch(engine)
+
+    def _watch(self, engine: Engine) -> None:
+        @event.listens_for(engine, "handle_error")
+        def _handle_error(context):
+            if context.is_disconnect or isinstance(
+                context.sqlalchemy_exception, OperationalError
+            ):
+                self.eject(engine)
+
+    def eject(self, engine: Engine) -> None:
+        """Stop routing reads to ``engine`` for ``eject_seconds``."""
+        self._ejected_until[engine] = time.monotonic() + self.eject_seconds
+
+    def is_healthy(self, engine: Engine) -> bool:
+        """Whether ``engine`` is currently receiving reads."""
+        return self._ejected_until.get(engine, 0.0) <= time.monotonic()
+
+    def choose(self) -> Optional[Engine]:
+        """Next healthy replica in round-robin order, or None if all are out."""
+        start = next(self._counter)
+        for offset in range(len(self.engines)):
+            engine = self.engines[(start + offset) % len(self.engines)]
+            if self.is_healthy(engine):
+                return engine
+        return None
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Health of each replica, for the health check."""
+        now = time.monotonic()
+        return [
+            {
+                "replica": index,
+                "healthy": self.is_healthy(engine),
+                "ejected_for_seconds": round(
+                    max(self._ejected_until.get(engine, 0.0) - now, 0.0), 3
+                ),
+            }
+            for index, engine in enumerate(self.engines)
+        ]
+
+
+class RoutingSession(Session):
+    """Session reading from a replica and writing to the primary (``bind``)."""
+
+    def __init__(self, *args: Any, replicas: Optional[ReplicaSet] = None, **kw: Any):
+        super().__init__(*args, **kw)
+        self.replicas = replicas
+
+    @property
+    def routes_reads(self) -> bool:
+        """Whether reads may go to a replica at all."""
+        return bool(self.replicas and self.replicas.engines)
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        """Pick the engine for one statement."""
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        replicas = self.replicas
+        if replicas is None or not replicas.engines:
+            return primary
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+            return primary
+        if clause is None or self.info.get("wrote") or self.info.get("primary"):
+            return primary
+        # One replica per session, so a transaction stays on one connection
+        replica = self.info.get("replica")
+        if replica is None or not replicas.is_healthy(replica):
+            replica = self.info["replica"] = replicas.choose()
+        return replica or primary
+
+
+@contextmanager
+def use_primary(session: Session) -> Iterator[None]:
+    """Send reads issued by ``session`` inside the block to the primary."""
+    previous = session.info.get("primary", False)
+    session.info["primary"] = True
+    try:
+        yield
+    finally:
+        session.info["primary"] = previous
+
+
+class RecentWrites:
+    """Keys and row versions written in the last ``window`` seconds."""
+
+    def __init__(self, window: float = 5.0):
+        self.window = window
+        self._keys: Dict[Hashable, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def note(self, keys: Sequence[Hashable], version: int = 0) -> None:
+        """Record a write of ``keys`` that left the row at ``version``."""
+        deadline = time.monotonic() + self.window
+        with self._lock:
+            if len(self._keys) >= RECENT_WRITES_SWEEP_SIZE:
+                now = time.monotonic()
+                self._keys = {k: v for k, v in self._keys.items() if v[0] > now}
+            for key in keys:
+                self._keys[key] = (deadline, version)
+
+    def _live(self, key: Hashable) -> Optional[Tuple[float, int]]:
+        entry = self._keys.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry
+
+    def contains(self, *keys: Hashable) -> bool:
+        """Whether any of ``keys`` was written within the window."""
+        return any(self._live(key) is not None for key in keys)
+
+    def version(self, key: Hashable) -> int:
+        """Row version recorded for ``key`` (0 if not recently written)."""
+        entry = self._live(key)
+        return entry[1] if entry else 0
+
+    def clear(self) -> None:
+        """Forget every recorded write."""
+        with self._lock:
+            self._keys.clear()
+
+
+# Global read-your-writes tracker (per worker process)
+recent_writes = RecentWrites(settings.replica_sticky_seconds)
@@ -0,0 +1,96 @@
+"""Schema management: Alembic migrations and the startup revision check.
+
+``DB_SCHEMA_MODE`` decides what a starting process does:
+
+* ``check`` (default): read the stored revision (one query) and refuse to
+  start if the database is behind the migrations shipped with the code
+* ``migrate``: run ``alembic upgrade head`` (single-instance deployments)
+* ``create``: ``Base.metadata.create_all`` (throwaway development databases)
+* ``off``: nothing
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, Optional, Tuple
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError
+
+from ..core.models import Base
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+SCHEMA_MODES = ("check", "migrate", "create", "off")
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """Raised when the database schema is behind the code's migrations."""
+
+
+def alembic_config() -> Config:
+    """Alembic configuration pointing at the bundled migrations."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+
+@lru_cache(maxsize=None)
+def _revisions() -> Tuple[Optional[str], FrozenSet[str]]:
+    script = ScriptDirectory.from_config(alembic_config())
+    known = frozenset(rev.revision for rev in script.walk_revisions())
+    return script.get_current_head(), known
+
+
+def head_revision() -> Optional[str]:
+    """Latest migration revision shipped with the code (None without any)."""
+    return _revisions()[0]
+
+
+def current_revision(target: Engine) -> Optional[str]:
+    """Revision stored in the database (None if it was never migrated)."""
+    with target.connect() as connection:
+        try:
+            return connection.execute(
+                text("SELECT version_num FROM alembic_version")
+            ).scalar()
+        except DBAPIError:
+            # No alembic_version table yet
+            return None
+
+
+def check_schema(target: Engine) -> str:
+    """Fail unless the database is at (or ahead of) the code's head revision.
+
+    A revision the code does not know comes from a newer release, e.g. during
+    a rolling deploy, and is accepted. Returns the stored revision.
+    """
+    head, known = _revisions()
+    current = current_revision(target)
+    if current is None or (current in known and current != head):
+        raise SchemaOutOfDateError(
+            f"Database schema is at revision {current or 'none'}, the code "
+            f"expects {head}; run 'alembic upgrade head'"
+        )
+    return current
+
+
+def upgrade_schema(target: Engine, revision: str = "head") -> None:
+    """Apply migrations up to ``revision``."""
+    config = alembic_config()
+    with target.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+
+
+def prepare_schema(target: Engine, mode: str) -> None:
+    """Bring up (or verify) the schema according to ``DB_SCHEMA_MODE``."""
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"Unknown DB schema mode: {mode}")
+    if mode == "check":
+        check_schema(target)
+    elif mode == "migrate":
+        upgrade_schema(target)
+    elif mode == "create":
+        Base.metadata.create_all(bind=target)
@@ -1,34 +1,227 @@
 """FastAPI application main entry point."""
 
+import asyncio
+import math
+import random
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI, status
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.concurrency import run_in_threadpool
 
-from .api.v1 import users
+from .api.v1 import auth, users
+from .core.admission import AdmissionControlMiddleware, build_limiters
+from .core.cache import user_cache
 from .core.config import settings
-from .core.models import Base
-from .core.schemas import APIResponse, HealthResponse
-from .db.database import engine
+from .core.membership import membership_index
+from .core.metrics import (
+    CONTENT_TYPE,
+    CallbackCounter,
+    CallbackGauge,
+    MetricsMiddleware,
+    registry,
+)
+from .core.schemas import APIResponse, DatabaseHealthResponse, HealthResponse
+from .core.security import password_hasher, token_cache
+from .db.archival import archive_deleted_users
+from .db.database import (
+    SessionLocal,
+    async_engine,
+    async_replicas,
+    engine,
+    pool_status,
+    probe_database,
+    probe_database_async,
+    replicas,
+)
+from .db.routing import use_primary
+from .db.schema import SchemaOutOfDateError, prepare_schema
+
+# Pool saturation at which /healthz/db reports "degraded"
+POOL_SATURATION_WARNING = 0.9
+# Availability filter rebuilds happen at the interval +/- this fraction
+MEMBERSHIP_REBUILD_JITTER = 0.25
+
+
+def rebuild_membership_index() -> None:
+    """Rebuild the username/email Bloom filters from the primary."""
+    if membership_index is None:
+        return
+    # A lagging replica would leave recent users out of the filter
+    with SessionLocal() as db, use_primary(db):
+        count = membership_index.rebuild(db)
+    print(
+        f"🔎 Availability filter rebuilt: {count} users "
+        f"in {membership_index.last_rebuild_seconds:.2f}s"
+    )
+
+
+def sync_membership_index() -> None:
+    """Check the availability filter against the primary's write counter."""
+    if membership_index is None:
+        return
+    with SessionLocal() as db, use_primary(db):
+        membership_index.sync(db)
+
+
+async def membership_maintenance_loop(
+    rebuild_interval: float, sync_interval: float
+) -> None:
+    """Keep the availability filter fresh.
+
+    Every ``sync_interval`` seconds the filter is checked against the write
+    counter; until a check passes again, misses fall through to the
+    database. It is rebuilt about every ``rebuild_interval`` seconds,
+    jittered per worker so that workers forked together do not all scan the
+    users table at once.
+    """
+    loop = asyncio.get_running_loop()
+
+    def next_rebuild() -> float:
+        if rebuild_interval <= 0:
+            return math.inf
+        jitter = random.uniform(-MEMBERSHIP_REBUILD_JITTER, MEMBERSHIP_REBUILD_JITTER)
+        return loop.time() + rebuild_interval * (1 + jitter)
+
+    rebuild_at = next_rebuild()
+    while True:
+        delay = rebuild_at - loop.time()
+        if sync_interval > 0:
+            delay = min(delay, sync_interval)
+        await asyncio.sleep(max(delay, 0.0))
+        try:
+            if loop.time() >= rebuild_at:
+                rebuild_at = next_rebuild()
+                await run_in_threadpool(rebuild_membership_index)
+            else:
+                await run_in_threadpool(sync_membership_index)
+        except Exception as e:
+            print(f"⚠️ Availability filter refresh failed: {e}")
+
+
+async def archive_loop(interval: float) -> None:
+    """Periodically move long soft-deleted users to the archive table.
+
+    Every worker runs it; concurrent runs skip each other's locked rows.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            archived = await run_in_threadpool(archive_deleted_users)
+            if archived:
+                print(f"🗄️ Archived {archived} deleted users")
+        except Exception as e:
+            print(f"⚠️ Deleted user archival failed: {e}")
+
+
+def register_runtime_metrics() -> None:
+    """Expose cache, availability filter, token cache and connection pool state."""
+    if user_cache is not None:
+        registry.register(
+            CallbackCounter(
+                "user_cache_lookups",
+                "User cache lookups by result",
+                lambda: {("hit",): user_cache.hits, ("miss",): user_cache.misses},
+                ("result",),
+            )
+        )
+    if membership_index is not None:
+        registry.register(
+            CallbackGauge(
+                "membership_filter",
+                "Availability filter statistics (see MembershipIndex.stats)",
+                lambda: {(k,): v for k, v in membership_index.stats().items()},
+                ("stat",),
+            )
+        )
+
+    if admission_limiters:
+        registry.register(
+            CallbackGauge(
+                "admission_limiter",
+                "Adaptive concurrency limit, in-flight and queued requests by group",
+                lambda: {
+                    (group, stat): value
+                    for group, limiter in admission_limiters.items()
+                    for stat, value in limiter.stats().items()
+                },
+                ("group", "stat"),
+            )
+        )
+
+    registry.register(
+        CallbackCounter(
+            "auth_token_cache_lookups",
+            "Verified bearer token cache lookups by result",
+            lambda: {("hit",): token_cache.hits, ("miss",): token_cache.misses},
+            ("result",),
+        )
+    )
+
+    def pool_stats():
+        pool = engine.pool
+        return {
+            (name,): getattr(pool, name)()
+            for name in ("size", "checkedin", "checkedout", "overflow")
+            if hasattr(pool, name)
+        }
+
+    registry.register(
+        CallbackGauge(
+            "db_pool_connections", "Connection pool state", pool_stats, ("state",)
+        )
+    )
+
+
+def prepare_database() -> None:
+    """Verify (or migrate) the schema and build the availability filter."""
+    prepare_schema(engine, settings.db_schema_mode)
+    rebuild_membership_index()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle management."""
-    # On startup: create database tables (will be overridden during testing)
+    # On startup: check the schema revision (will be overridden during
+    # testing). Pre-forked workers inherit it from the parent (see app.server).
     try:
-        Base.metadata.create_all(bind=engine)
+        if not getattr(app.state, "preloaded", False):
+            await run_in_threadpool(prepare_database)
         print(f"🚀 {settings.project_name} started successfully")
         print(f"📖 API Documentation: http://{settings.host}:{settings.port}/docs")
+    except SchemaOutOfDateError:
+        # Refuse to serve against a schema older than the code
+        raise
     except Exception as e:
         # Connection errors may occur during testing, which is normal
         if "test" not in settings.database_url.lower():
             print(f"⚠️ Database connection warning: {e}")
         pass
+    rebuild_task = None
+    if membership_index and (
+        settings.membership_rebuild_interval > 0
+        or settings.membership_sync_interval > 0
+    ):
+        rebuild_task = asyncio.create_task(
+            membership_maintenance_loop(
+                settings.membership_rebuild_interval,
+                settings.membership_sync_interval,
+            )
+        )
+    archive_task = None
+    if settings.user_archive_interval > 0:
+        archive_task = asyncio.create_task(archive_loop(settings.user_archive_interval))
     yield
-    # Cleanup work on shutdown
+    # Cleanup work on shutdown (runs after in-flight requests have drained)
+    for task in (rebuild_task, archive_task):
+        if task:
+            task.cancel()
+    password_hasher.shutdown()
     print(f"🛑 {settings.project_name} has stopped")
 
 
@@ -43,7 +236,18 @@ app = FastAPI(
     openapi_url="/openapi.json",
 )
 
-# Add CORS middleware
+# Sheds load before it reaches the route (and the connection pool). Added
+# before CORS so that CORS wraps it: 503s carry CORS headers and preflight
+# requests are answered without taking a slot
+admission_limiters = build_limiters() if settings.admission_control else {}
+if admission_limiters:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limiters=admission_limiters,
+        retry_after=settings.admission_retry_after,
+    )
+
+# Add CORS middleware (outside admission control)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
@@ -52,6 +256,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it is the outermost middleware and times the whole stack
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    register_runtime_metrics()
+
+
+@app.exception_handler(PoolTimeoutError)
+@app.exception_handler(OperationalError)
+async def overload_exception_handler(request, exc):
+    """503 with Retry-After for overload raised outside the routes' handling."""
+    return await http_exception_handler(
+        request, users.service_unavailable("Database unavailable, retry shortly")
+    )
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -75,6 +293,60 @@ async def health_check():
     )
 
 
+@app.get("/healthz/db", response_model=DatabaseHealthResponse, tags=["Health Check"])
+async def database_health_check():
+    """Database connectivity, pool saturation, checkout latency and replicas.
+
+    Pool figures are per worker process; multiply the capacity by the worker
+    count to size against the database connection limit.
+    """
+    target = async_engine.sync_engine if async_engine is not None else engine
+    replica_set = async_replicas if async_engine is not None else replicas
+    pool = pool_status(target)
+    saturation = pool.get("saturation")
+    probe_ms, error = None, None
+    health = "healthy"
+    if saturation is not None and saturation >= 1:
+        # Probing an exhausted pool would block for the whole pool timeout
+        health, error = "degraded", "Connection pool exhausted"
+    else:
+        try:
+            if async_engine is not None:
+                elapsed = await probe_database_async(async_engine)
+            else:
+                elapsed = await run_in_threadpool(probe_database, engine)
+            probe_ms = round(elapsed * 1000, 3)
+            if saturation is not None and saturation >= POOL_SATURATION_WARNING:
+                health = "degraded"
+        except Exception as e:
+            health = "unhealthy"
+            error = str(e) if not settings.is_production else "Database unavailable"
+
+    response = DatabaseHealthResponse(
+        status=health,
+        version=settings.version,
+        pre_ping=settings.db_pre_ping,
+        probe_ms=probe_ms,
+        pool=pool,
+        replicas=replica_set.status() if replica_set else [],
+        error=error,
+    )
+    if health == "unhealthy":
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=response.model_dump(mode="json"),
+        )
+    return response
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Metrics in the Prometheus text exposition format."""
+        return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/", response_model=APIResponse, tags=["Root Path"])
 async def root():
     """Root path welcome message."""
@@ -91,15 +363,10 @@ async def root():
 
 # Register API routes
 app.include_router(users.router, prefix="/api/v1", tags=["API v1"])
+app.include_router(auth.router, prefix="/api/v1", tags=["API v1"])
 
 
 if __name__ == "__main__":
-    import uvicorn
-
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=not settings.is_production,
-        log_level=settings.log_level.lower(),
-    )
+    from .server import run
+
+    run()
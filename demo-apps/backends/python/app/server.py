@@ -0,0 +1,249 @@
+"""Pre-forking production server.
+
+The parent process binds the listening socket, imports the app and checks
+the schema once (``preload``), then forks ``workers`` uvicorn servers that
+share the socket. Each worker drops the connection pool inherited from the
+parent right after fork, so pooled connections are never shared between
+processes. The parent only supervises:
+
+* SIGTERM/SIGINT: forward SIGTERM so every worker stops accepting and drains
+  in-flight requests (up to ``graceful_timeout``), then exit
+* SIGTTIN/SIGTTOU: add/remove one worker (gracefully)
+* a worker that dies unexpectedly is replaced
+
+Per-process state that must be shared between workers (the ``memory`` user
+cache) is refused at startup and when adding workers; see
+:func:`app.core.cache.check_worker_count`.
+"""
+
+import os
+import signal
+import socket
+import time
+from typing import Dict, List, Optional, Set
+
+import uvicorn
+
+from .core.cache import check_worker_count
+from .core.config import settings
+
+# Extra seconds granted after the graceful timeout before workers are killed
+KILL_GRACE_SECONDS = 5.0
+SUPERVISE_INTERVAL = 0.5
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload() -> None:
+    """Import the app and prepare shared state before forking workers."""
+    # pylint: disable=import-outside-toplevel
+    from .db.database import engine
+    from .db.schema import SchemaOutOfDateError
+    from .main import app, prepare_database
+
+    try:
+        prepare_database()
+    except SchemaOutOfDateError:
+        # Do not fork workers that would all refuse to start
+        raise
+    except Exception as e:
+        # Leave it to each worker's lifespan to retry
+        print(f"⚠️ Preload failed, workers will prepare the database: {e}")
+        return
+    finally:
+        # Close the connections used above; workers open their own
+        engine.dispose()
+    app.state.preloaded = True
+
+
+def reset_after_fork() -> None:
+    """Forget pooled connections inherited from the parent process.
+
+    Covers the primary and every read replica, sync and async.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .db.database import async_engine, async_replicas, engine, replica_engines
+
+    targets = [engine, *replica_engines]
+    if async_engine is not None:
+        targets.append(async_engine.sync_engine)
+    if async_replicas is not None:
+        targets.extend(async_replicas.engines)
+    for target in targets:
+        target.dispose(close=False)
+
+
+class PreforkServer:
+    """Supervisor for a fixed (signal-adjustable) number of worker processes."""
+
+    def __init__(
+        self,
+        app_path: str,
+        host: str,
+        port: int,
+        workers: int,
+        graceful_timeout: float,
+        log_level: str = "info",
+    ):
+        self.app_path = app_path
+        self.host = host
+        self.port = port
+        self.target_workers = max(1, workers)
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.retiring: Set[int] = set()
+        self.should_exit = False
+        self.sock: Optional[socket.socket] = None
+
+    def _worker_main(self) -> None:
+        reset_after_fork()
+        for sig in (signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(sig, signal.SIG_DFL)
+        config = uvicorn.Config(
+            self.app_path,
+            log_level=self.log_level,
+            timeout_graceful_shutdown=int(self.graceful_timeout),
+            lifespan="on",
+        )
+        assert self.sock is not None, "run() binds the socket before forking"
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def spawn_worker(self) -> None:
+        """Fork one worker process."""
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker_main()
+            except BaseException as e:  # pylint: disable=broad-except
+                print(f"⚠️ Worker {os.getpid()} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)  # Never run the parent's cleanup in a child
+        self.workers[pid] = time.monotonic()
+        print(f"👷 Worker {pid} started")
+
+    def stop_worker(self, pid: int) -> None:
+        """Ask one worker to drain and exit."""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+            self.retiring.discard(pid)
+
+    def reap_workers(self) -> List[int]:
+        """Collect exited workers; returns pids that exited unexpectedly."""
+        exited = []
+        while self.workers:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                break
+            if pid == 0:
+                break
+            if self.workers.pop(pid, None) is not None and pid not in self.retiring:
+                exited.append(pid)
+            self.retiring.discard(pid)
+        return exited
+
+    def _handle_exit(self, signum, frame) -> None:
+        self.should_exit = True
+
+    def _handle_ttin(self, signum, frame) -> None:
+        try:
+            check_worker_count(self.target_workers + 1)
+        except RuntimeError as e:
+            print(f"⚠️ Not adding a worker: {e}")
+            return
+        self.target_workers += 1
+
+    def _handle_ttou(self, signum, frame) -> None:
+        self.target_workers = max(1, self.target_workers - 1)
+
+    def scale(self) -> None:
+        """Start or stop workers until the target count is running."""
+        active = [pid for pid in self.workers if pid not in self.retiring]
+        for _ in range(self.target_workers - len(active)):
+            self.spawn_worker()
+        # Retire the newest workers first; older ones have warm caches
+        by_age = sorted(active, key=self.workers.__getitem__)
+        for pid in by_age[self.target_workers :]:
+            self.retiring.add(pid)
+            self.stop_worker(pid)
+
+    def shutdown(self) -> None:
+        """Drain every worker, killing stragglers after the grace period."""
+        for pid in list(self.workers):
+            self.stop_worker(pid)
+        deadline = time.monotonic() + self.graceful_timeout + KILL_GRACE_SECONDS
+        while self.workers and time.monotonic() < deadline:
+            self.reap_workers()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.reap_workers()
+
+    def run(self) -> None:
+        """Bind, preload, fork workers and supervise until told to exit."""
+        check_worker_count(self.target_workers)
+        self.sock = bind_socket(self.host, self.port)
+        preload()
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+        signal.signal(signal.SIGTTIN, self._handle_ttin)
+        signal.signal(signal.SIGTTOU, self._handle_ttou)
+        print(
+            f"🚀 Serving on http://{self.host}:{self.port} "
+            f"with {self.target_workers} workers (pid {os.getpid()})"
+        )
+        try:
+            while not self.should_exit:
+                for pid in self.reap_workers():
+                    print(f"⚠️ Worker {pid} exited unexpectedly, replacing it")
+                self.scale()
+                time.sleep(SUPERVISE_INTERVAL)
+        finally:
+            self.shutdown()
+            self.sock.close()
+            print("🛑 All workers stopped")
+
+
+def run(app_path: str = "app.main:app") -> None:
+    """Start the service.
+
+    Development runs a single auto-reloading uvicorn process; production
+    (``ENV=production``) runs the pre-forking server with ``WORKERS``
+    processes (0 = one per CPU core).
+    """
+    log_level = settings.log_level.lower() if settings.log_level else "info"
+    if not settings.is_production:
+        uvicorn.run(
+            app_path,
+            host=settings.host,
+            port=settings.port,
+            reload=True,
+            log_level=log_level,
+        )
+        return
+    PreforkServer(
+        app_path,
+        settings.host,
+        settings.port,
+        settings.workers or (os.cpu_count() or 1),
+        settings.graceful_shutdown_timeout,
+        log_level,
+    ).run()
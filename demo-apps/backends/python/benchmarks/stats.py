@@ -0,0 +1,44 @@
+"""Latency statistics and result comparison for the benchmark harness."""
+
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """Summarize one scenario run; latencies are in seconds, output in ms."""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def compare(
+    baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]]
+) -> Dict[str, Dict[str, float]]:
+    """Percent change of RPS and latency percentiles per shared scenario."""
+    changes: Dict[str, Dict[str, float]] = {}
+    for name, stats in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        changes[name] = {
+            key: round((stats[key] - before[key]) / before[key] * 100, 1)
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+            if before.get(key)
+        }
+    return changes
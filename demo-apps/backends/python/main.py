@@ -5,9 +5,8 @@ Python backend service entry point
 Runs FastAPI user management service
 """
 
-import uvicorn
-
 from app.core.config import settings
+from app.server import run
 
 
 def main() -> None:
@@ -17,13 +16,7 @@ def main() -> None:
     print(f"📖 API Documentation: http://{settings.host}:{settings.port}/docs")
     print("Welcome to Python Backend Service")
 
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=not settings.is_production,
-        log_level=settings.log_level.lower() if settings.log_level else "info",
-    )
+    run()
 
 
 if __name__ == "__main__":
@@ -3,17 +3,21 @@
 import os
 
 import pytest
+import pytest_asyncio
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from app.api.v1 import users
+from app.api.v1 import auth, users
+from app.core.cache import user_cache
 from app.core.config import settings
 from app.core.models import Base
 from app.core.schemas import APIResponse, HealthResponse
-from app.db.database import get_db
+from app.core.security import token_cache
+from app.db.database import get_async_db, get_db
 
 # Set test environment variables
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
@@ -27,7 +31,20 @@ engine = create_engine(
     poolclass=StaticPool,
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    expire_on_commit=False,
+)
+
+# Async engine on the same database file; NullPool so no connection outlives
+# the event loop it was opened on
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 
 def override_get_db():
@@ -39,6 +56,12 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    """Test async database session dependency."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 # Create test-specific FastAPI app (without lifespan)
 def create_test_app():
     """Create FastAPI app for testing."""
@@ -74,10 +97,20 @@ def create_test_app():
 
     # Register API routes
     test_app.include_router(users.router, prefix="/api/v1", tags=["API v1"])
+    test_app.include_router(auth.router, prefix="/api/v1", tags=["API v1"])
 
     return test_app
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Reset the process-wide user and token caches between tests."""
+    if user_cache:
+        user_cache.clear()
+    token_cache.clear()
+    yield
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create test database session."""
@@ -90,6 +123,13 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_db_session(db_session):
+    """Create test async database session."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create test client."""
@@ -100,3 +140,16 @@ def client(db_session):
         yield test_client
 
     test_app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def async_client(db_session):
+    """Create test client serving requests through the async service."""
+    test_app = create_test_app()
+    test_app.dependency_overrides[get_async_db] = override_get_async_db
+    test_app.dependency_overrides[users.get_user_service] = users.get_async_user_service
+
+    with TestClient(test_app) as test_client:
+        yield test_client
+
+    test_app.dependency_overrides.clear()
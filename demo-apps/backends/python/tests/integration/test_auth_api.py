@@ -0,0 +1,75 @@
+"""Authentication API integration tests."""
+
+from fastapi.testclient import TestClient
+
+from app.core.security import token_cache
+
+
+def create_and_login(client: TestClient, username: str = "alice") -> dict:
+    """Create a user and return the token response."""
+    client.post(
+        "/api/v1/users/",
+        json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "password123",
+        },
+    )
+    response = client.post(
+        "/api/v1/auth/token",
+        data={"username": username, "password": "password123"},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestAuthAPI:
+    """Authentication API integration test class."""
+
+    def test_login_and_me(self, client: TestClient):
+        """Test password login and a protected route with the bearer token."""
+        tokens = create_and_login(client)
+        assert tokens["token_type"] == "bearer"
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        response = client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["data"]["username"] == "alice"
+
+        # The second request is served from the verified-token cache
+        hits = token_cache.hits
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        assert token_cache.hits == hits + 1
+
+    def test_login_wrong_password(self, client: TestClient):
+        """Test login with a wrong password."""
+        create_and_login(client)
+        response = client.post(
+            "/api/v1/auth/token", data={"username": "alice", "password": "nope1234"}
+        )
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+
+    def test_protected_route_rejects_bad_tokens(self, client: TestClient):
+        """Test missing, malformed and refresh tokens are refused."""
+        tokens = create_and_login(client)
+        assert client.get("/api/v1/auth/me").status_code == 401
+        for token in ("garbage", tokens["refresh_token"]):
+            response = client.get(
+                "/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"}
+            )
+            assert response.status_code == 401
+
+    def test_refresh(self, client: TestClient):
+        """Test exchanging a refresh token for a new pair."""
+        tokens = create_and_login(client)
+        response = client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == 200
+        assert response.json()["access_token"]
+
+        response = client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": tokens["access_token"]}
+        )
+        assert response.status_code == 401
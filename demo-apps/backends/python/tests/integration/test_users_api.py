@@ -1,6 +1,15 @@
 """User API integration tests."""
 
+import csv
+import io
+import json
+import re
+
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.core.services.user_service import UserService
 
 
 class TestUsersAPI:
@@ -120,6 +129,137 @@ class TestUsersAPI:
         assert data["data"]["total"] == 3
         assert len(data["data"]["users"]) == 3
 
+    def test_list_users_cursor(self, client: TestClient):
+        """Test keyset pagination through the list endpoint."""
+        for i in range(3):
+            user_data = {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "password123",
+            }
+            client.post("/api/v1/users/", json=user_data)
+
+        response = client.get("/api/v1/users/?size=2&cursor=")
+        assert response.status_code == 200
+        first_page = response.json()["data"]
+        assert [u["username"] for u in first_page["users"]] == ["user0", "user1"]
+        assert first_page["next_cursor"]
+
+        response = client.get(
+            f"/api/v1/users/?size=2&cursor={first_page['next_cursor']}"
+        )
+        second_page = response.json()["data"]
+        assert [u["username"] for u in second_page["users"]] == ["user2"]
+        assert second_page["next_cursor"] is None
+
+        response = client.get("/api/v1/users/?cursor=garbage")
+        assert response.status_code == 400
+
+    def test_list_users_search(self, client: TestClient):
+        """Test search and prefix match query parameters."""
+        for name in ["alice", "malice", "bob"]:
+            user_data = {
+                "username": name,
+                "email": f"{name}@example.com",
+                "password": "password123",
+            }
+            client.post("/api/v1/users/", json=user_data)
+
+        response = client.get("/api/v1/users/?search=lice")
+        assert response.status_code == 200
+        assert response.json()["data"]["total"] == 2
+
+        response = client.get("/api/v1/users/?username=ali&match=prefix")
+        assert [u["username"] for u in response.json()["data"]["users"]] == ["alice"]
+
+        response = client.get("/api/v1/users/?username=ali&match=regex")
+        assert response.status_code == 422
+
+    def test_bulk_create_users_json(self, client: TestClient):
+        """Test bulk import with per-row results from a JSON array."""
+        client.post(
+            "/api/v1/users/",
+            json={
+                "username": "taken",
+                "email": "taken@example.com",
+                "password": "password123",
+            },
+        )
+        rows = [
+            {"username": "user0", "email": "user0@example.com", "password": "pw123456"},
+            {"username": "taken", "email": "new@example.com", "password": "pw123456"},
+            {"username": "user1", "email": "bad-email", "password": "pw123456"},
+            {"username": "user2", "email": "user0@example.com", "password": "pw123456"},
+            {"username": "user3", "email": "user3@example.com", "password": "pw123456"},
+        ]
+
+        response = client.post("/api/v1/users:bulk?chunk_size=2", json=rows)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert (data["total"], data["created"], data["failed"]) == (5, 2, 3)
+        assert [r["success"] for r in data["results"]] == [
+            True,
+            False,
+            False,
+            False,
+            True,
+        ]
+        assert "already exists" in data["results"][1]["error"]
+        assert data["results"][2]["error"].startswith("email")
+
+        response = client.get(f"/api/v1/users/{data['results'][4]['id']}")
+        assert response.json()["data"]["username"] == "user3"
+
+    def test_bulk_create_users_ndjson(self, client: TestClient):
+        """Test bulk import from an NDJSON stream."""
+        body = "\n".join(
+            [
+                '{"username": "user0", "email": "user0@example.com", "password": "pw123456"}',
+                "not json",
+                '{"username": "user1", "email": "user1@example.com", "password": "pw123456"}',
+            ]
+        )
+
+        response = client.post(
+            "/api/v1/users:bulk",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        data = response.json()["data"]
+        assert (data["created"], data["failed"]) == (2, 1)
+        assert data["results"][1]["error"] == "Invalid JSON"
+
+        response = client.get("/api/v1/users/?search=user")
+        assert response.json()["data"]["total"] == 2
+
+    def test_export_users(self, client: TestClient):
+        """Test streaming NDJSON and CSV exports with filters."""
+        for i in range(3):
+            user_data = {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "password123",
+                "is_active": i != 1,
+            }
+            client.post("/api/v1/users/", json=user_data)
+
+        response = client.get("/api/v1/users/export?is_active=true")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["username"] for row in rows] == ["user0", "user2"]
+        listed = client.get("/api/v1/users/?is_active=true").json()["data"]["users"]
+        assert rows == listed
+
+        response = client.get("/api/v1/users/export?format=csv&username=user1")
+        assert response.headers["content-type"].startswith("text/csv")
+        records = list(csv.reader(io.StringIO(response.text)))
+        assert records[0][:2] == ["username", "email"]
+        assert [record[0] for record in records[1:]] == ["user1"]
+
+        response = client.get("/api/v1/users/export?format=xml")
+        assert response.status_code == 422
+
     def test_update_user(self, client: TestClient):
         """Test updating user."""
         # Create user first
@@ -213,3 +353,182 @@ class TestUsersAPI:
         assert response.status_code == 200
         data = response.json()
         assert data["data"]["exists"] is False
+
+    def test_batch_get_users(self, client: TestClient):
+        """Test batch get by POST body and by query string."""
+        ids = [
+            client.post(
+                "/api/v1/users/",
+                json={
+                    "username": f"batch{i}",
+                    "email": f"batch{i}@example.com",
+                    "password": "password123",
+                },
+            ).json()["data"]["id"]
+            for i in range(2)
+        ]
+
+        response = client.post(
+            "/api/v1/users:batchGet", json={"ids": [ids[1], 12345, ids[0]]}
+        )
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["found"] == 2
+        assert [item["id"] for item in data["users"]] == [ids[1], 12345, ids[0]]
+        assert data["users"][1] == {"id": 12345, "found": False, "user": None}
+        assert data["users"][0]["user"]["username"] == "batch1"
+
+        response = client.get(f"/api/v1/users:batchGet?ids={ids[0]},{ids[1]}")
+        assert response.status_code == 200
+        assert response.json()["data"]["found"] == 2
+
+        assert (
+            client.post("/api/v1/users:batchGet", json={"ids": []}).status_code == 422
+        )
+        assert client.get("/api/v1/users:batchGet?ids=1,x").status_code == 422
+        too_many = ",".join(str(i) for i in range(1001))
+        response = client.get(f"/api/v1/users:batchGet?ids={too_many}")
+        assert response.status_code == 400
+
+    def test_fast_serialization_is_byte_identical(
+        self, client: TestClient, monkeypatch
+    ):
+        """Test the fast serialization path emits the same bytes."""
+        response = client.post(
+            "/api/v1/users/",
+            json={
+                "username": "fastuser",
+                "email": "fast@example.com",
+                "full_name": "Fäst Üser",
+                "password": "password123",
+            },
+        )
+        user_id = response.json()["data"]["id"]
+        timestamp = re.compile(rb'"timestamp":"[^"]*"')
+
+        for url in (
+            f"/api/v1/users/{user_id}",
+            "/api/v1/users/username/fastuser",
+            "/api/v1/users/?size=5",
+            "/api/v1/users/check-username/fastuser",
+            "/api/v1/users/check-email?email=fast@example.com",
+        ):
+            bodies = []
+            for fast in (True, False):
+                monkeypatch.setattr(settings, "fast_serialization", fast)
+                response = client.get(url)
+                assert response.status_code == 200
+                assert response.headers["content-type"] == "application/json"
+                bodies.append(timestamp.sub(b"", response.content))
+            assert bodies[0] == bodies[1], url
+
+    def test_pool_timeout_is_503(self, client: TestClient, monkeypatch):
+        """Test a connection pool timeout becomes a 503 with Retry-After."""
+
+        def exhausted(*args):
+            raise PoolTimeoutError("QueuePool limit of size 5 overflow 10 reached")
+
+        monkeypatch.setattr(UserService, "list_users", exhausted)
+        response = client.get("/api/v1/users/")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert "QueuePool limit" in response.json()["detail"]
+
+    def test_conditional_get(self, client: TestClient):
+        """Test ETags and If-None-Match on user and list reads."""
+        response = client.post(
+            "/api/v1/users/",
+            json={
+                "username": "etaguser",
+                "email": "etag@example.com",
+                "password": "password123",
+            },
+        )
+        user_id = response.json()["data"]["id"]
+
+        for url in (f"/api/v1/users/{user_id}", "/api/v1/users/username/etaguser"):
+            response = client.get(url)
+            etag = response.headers["etag"]
+            assert etag == f'"user-{user_id}-v1"'
+
+            response = client.get(url, headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.content == b""
+            assert response.headers["etag"] == etag
+            # Weak comparison, lists and "*" match too
+            for header in (f'W/{etag}, "other"', "*"):
+                assert (
+                    client.get(url, headers={"If-None-Match": header}).status_code
+                    == 304
+                )
+            assert (
+                client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+            )
+
+        list_etag = client.get("/api/v1/users/").headers["etag"]
+        assert list_etag.startswith('W/"users-')
+        response = client.get("/api/v1/users/", headers={"If-None-Match": list_etag})
+        assert response.status_code == 304
+
+        client.put(f"/api/v1/users/{user_id}", json={"full_name": "New", "version": 1})
+        response = client.get(
+            f"/api/v1/users/{user_id}", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["etag"] == f'"user-{user_id}-v2"'
+        response = client.get("/api/v1/users/", headers={"If-None-Match": list_etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != list_etag
+
+        client.delete(f"/api/v1/users/{user_id}?version=2")
+        response = client.get(
+            f"/api/v1/users/{user_id}", headers={"If-None-Match": "*"}
+        )
+        assert response.status_code == 404
+
+
+class TestUsersAPIAsync:
+    """User API tests served through the async engine."""
+
+    def test_create_get_and_list(self, async_client: TestClient):
+        """Test the main read/write paths in async mode."""
+        user_data = {
+            "username": "testuser",
+            "email": "test@example.com",
+            "password": "password123",
+        }
+        response = async_client.post("/api/v1/users/", json=user_data)
+        assert response.status_code == 201
+        user_id = response.json()["data"]["id"]
+
+        response = async_client.get(f"/api/v1/users/{user_id}")
+        assert response.status_code == 200
+        assert response.json()["data"]["username"] == "testuser"
+
+        response = async_client.get("/api/v1/users/?page=0&size=10")
+        assert response.status_code == 200
+        assert response.json()["data"]["total"] == 1
+        response = async_client.get(
+            f"/api/v1/users/{user_id}",
+            headers={"If-None-Match": f'"user-{user_id}-v1"'},
+        )
+        assert response.status_code == 304
+
+        response = async_client.post("/api/v1/users/", json=user_data)
+        assert response.status_code == 400
+
+        response = async_client.post(
+            "/api/v1/users:bulk",
+            json={
+                "users": [
+                    user_data,
+                    {**user_data, "username": "other", "email": "o@example.com"},
+                ]
+            },
+        )
+        data = response.json()["data"]
+        assert (data["created"], data["failed"]) == (1, 1)
+
+        response = async_client.get("/api/v1/users/export")
+        assert len(response.text.splitlines()) == 2
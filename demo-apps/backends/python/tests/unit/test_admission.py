@@ -0,0 +1,131 @@
+"""Admission control unit tests."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.admission import (
+    AdaptiveLimiter,
+    AdmissionControlMiddleware,
+    AdmissionRejectedError,
+    route_group,
+)
+
+
+class TestAdaptiveLimiter:
+    """Adaptive concurrency limiter test class."""
+
+    def test_route_group(self):
+        """Test requests are sorted into write/read/list budgets."""
+        assert route_group("POST", "/api/v1/users/") == "write"
+        assert route_group("POST", "/api/v1/users:bulk") == "write"
+        assert route_group("DELETE", "/api/v1/users/1") == "write"
+        assert route_group("POST", "/api/v1/auth/token") == "write"
+        assert route_group("GET", "/api/v1/users/1") == "read"
+        assert route_group("POST", "/api/v1/users:batchGet") == "read"
+        assert route_group("POST", "/api/v1/auth/refresh") == "read"
+        assert route_group("GET", "/api/v1/users/") == "list"
+        assert route_group("GET", "/api/v1/users/export") == "list"
+        assert route_group("GET", "/healthz/db") is None
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue(self):
+        """Test waiting within the queue, then rejecting when it is full."""
+        limiter = AdaptiveLimiter(max_limit=1, queue_size=1, queue_timeout=1.0)
+        assert await limiter.acquire() is False
+
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        with pytest.raises(AdmissionRejectedError, match="queued"):
+            await limiter.acquire()
+
+        limiter.release(0.01)
+        assert await waiting is True
+        assert limiter.in_flight == 1
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        """Test a request waiting past queue_timeout is rejected."""
+        limiter = AdaptiveLimiter(max_limit=1, queue_size=5, queue_timeout=0.05)
+        await limiter.acquire()
+        with pytest.raises(AdmissionRejectedError, match="timed out"):
+            await limiter.acquire()
+        assert limiter.queued == 0
+        assert limiter.in_flight == 1
+
+    def test_aimd(self):
+        """Test the limit backs off on slow or 503 responses and regrows."""
+        limiter = AdaptiveLimiter(max_limit=10, queue_size=0, queue_timeout=0)
+        limiter.in_flight = 10
+        limiter.release(0.01)
+        assert limiter.limit == 10
+        assert limiter.baseline == 0.01
+
+        # Far above the baseline: multiplicative decrease
+        limiter.in_flight = 10
+        limiter.release(0.1)
+        assert limiter.limit == pytest.approx(9.0)
+        # A second slow response within the same round trip is not another cut
+        limiter.in_flight = 10
+        limiter.release(0.1)
+        assert limiter.limit == pytest.approx(9.0)
+
+        limiter._last_decrease = 0.0
+        limiter.in_flight = 10
+        limiter.release(0.01, overloaded=True)
+        assert limiter.limit == pytest.approx(8.1)
+
+        # Fast responses under load: additive increase, capped at the budget
+        for _ in range(100):
+            limiter.in_flight = 10
+            limiter.release(0.01)
+        assert limiter.limit == 10
+
+        # Never below one slot
+        for _ in range(100):
+            limiter._last_decrease = 0.0
+            limiter.release(0.01, overloaded=True)
+        assert limiter.limit == 1.0
+
+    @pytest.mark.asyncio
+    async def test_middleware_sheds_load(self):
+        """Test requests over budget get 503 + Retry-After, other groups do not."""
+        app = FastAPI()
+        release = asyncio.Event()
+
+        @app.post("/api/v1/users/")
+        async def slow_write():
+            await release.wait()
+            return {"ok": True}
+
+        @app.get("/api/v1/users/{user_id}")
+        async def read(user_id: int):
+            return {"id": user_id}
+
+        limiters = {
+            "write": AdaptiveLimiter(1, queue_size=0, queue_timeout=1.0),
+            "read": AdaptiveLimiter(1, queue_size=0, queue_timeout=1.0),
+        }
+        app.add_middleware(AdmissionControlMiddleware, limiters=limiters)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            first = asyncio.ensure_future(client.post("/api/v1/users/"))
+            await asyncio.sleep(0.05)
+
+            shed = await client.post("/api/v1/users/")
+            assert shed.status_code == 503
+            assert shed.headers["retry-after"] == "1"
+            assert "overloaded" in shed.json()["detail"]
+            # Reads have their own budget
+            assert (await client.get("/api/v1/users/7")).status_code == 200
+
+            release.set()
+            assert (await first).status_code == 200
+        assert limiters["write"].in_flight == 0
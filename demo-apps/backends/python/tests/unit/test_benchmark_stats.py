@@ -0,0 +1,40 @@
+"""Benchmark statistics unit tests."""
+
+from benchmarks.stats import compare, percentile, summarize
+
+
+class TestBenchmarkStats:
+    """Benchmark statistics test class."""
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles."""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile([], 50) == 0.0
+
+    def test_summarize(self):
+        """Test scenario summary in milliseconds."""
+        stats = summarize([0.002, 0.001, 0.003, 0.004], errors=1, elapsed=2.0)
+        assert stats["requests"] == 4
+        assert stats["errors"] == 1
+        assert stats["rps"] == 2.0
+        assert stats["p50_ms"] == 2.0
+        assert stats["max_ms"] == 4.0
+
+    def test_summarize_empty(self):
+        """Test summary of a scenario without requests."""
+        stats = summarize([], errors=0, elapsed=0.0)
+        assert stats["requests"] == 0
+        assert stats["rps"] == 0.0
+
+    def test_compare(self):
+        """Test percent change against a baseline."""
+        baseline = {"get_by_id": {"rps": 100.0, "p50_ms": 2.0, "p95_ms": 4.0}}
+        current = {
+            "get_by_id": {"rps": 150.0, "p50_ms": 1.0, "p95_ms": 4.0, "p99_ms": 9.0},
+            "create": {"rps": 10.0},
+        }
+        changes = compare(baseline, current)
+        assert changes == {"get_by_id": {"rps": 50.0, "p50_ms": -50.0, "p95_ms": 0.0}}
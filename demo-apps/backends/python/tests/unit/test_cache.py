@@ -0,0 +1,224 @@
+"""User cache unit tests."""
+
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pytest
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.cache import (
+    AsyncRedisCache,
+    MemoryCache,
+    RedisCache,
+    UserCache,
+    check_worker_count,
+)
+from app.core.config import settings
+from app.core.schemas import UserResponse
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis-py client methods the cache uses."""
+
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+        self.round_trips = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key: str, value: str, px: int, nx: bool = False) -> Optional[bool]:
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode()
+        return True
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match: str):
+        prefix = match.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Buffers ``set`` calls until ``execute``, counting round trips."""
+
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.commands: List[tuple] = []
+
+    def set(self, key: str, value: str, px: int, nx: bool = False) -> "FakePipeline":
+        self.commands.append((key, value, px, nx))
+        return self
+
+    def execute(self) -> List[Optional[bool]]:
+        self.client.round_trips += 1
+        return [self.client.set(*command) for command in self.commands]
+
+
+class FakeAsyncRedis:
+    """``redis.asyncio`` flavoured fake: every command is a coroutine."""
+
+    def __init__(self):
+        self.sync = FakeRedis()
+        self.data = self.sync.data
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.sync.get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.sync.mget(keys)
+
+    async def set(
+        self, key: str, value: str, px: int, nx: bool = False
+    ) -> Optional[bool]:
+        return self.sync.set(key, value, px, nx)
+
+    async def delete(self, *keys: str) -> None:
+        self.sync.delete(*keys)
+
+    async def scan_iter(self, match: str):
+        for key in self.sync.scan_iter(match):
+            yield key
+
+
+def make_user(version: int, email: str = "test@example.com") -> UserResponse:
+    """Build a user response at a given version."""
+    now = datetime(2024, 1, 1)
+    return UserResponse(
+        id=1,
+        username="testuser",
+        email=email,
+        created_at=now,
+        updated_at=now,
+        version=version,
+    )
+
+
+class TestMemoryCache:
+    """In-process cache backend test class."""
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first."""
+        cache = MemoryCache(max_entries=2)
+        cache.set("a", "1", ttl=60)
+        cache.set("b", "2", ttl=60)
+        assert cache.get("a") == "1"
+        cache.set("c", "3", ttl=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+    def test_ttl_and_only_if_absent(self):
+        """Test expiry and conditional set."""
+        cache = MemoryCache()
+        assert cache.set("a", "1", ttl=0.01) is True
+        assert cache.set("a", "2", ttl=60, only_if_absent=True) is False
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.set("a", "3", ttl=60, only_if_absent=True) is True
+        assert cache.get("a") == "3"
+
+
+class TestUserCache:
+    """Version-aware user cache test class."""
+
+    def test_stale_fill_cannot_override_newer_version(self):
+        """Test a slow reader filling an old version loses to the writer."""
+        cache = UserCache(MemoryCache())
+        cache.store(make_user(2, email="new@example.com"))
+        cache.fill(make_user(1, email="old@example.com"))
+
+        cached = cache.get_by_id(1)
+        assert cached is not None
+        assert cached.version == 2
+        assert cached.email == "new@example.com"
+
+    def test_get_many(self):
+        """Test batch lookups return only live cached users."""
+        cache = UserCache(MemoryCache())
+        cache.fill(make_user(1))
+
+        assert cache.get_many([1, 2]) == {1: make_user(1)}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        cache.store_deleted(1, 2)
+        assert cache.get_many([1]) == {}
+
+    def test_deleted_user_is_a_miss(self):
+        """Test tombstoned versions are never served."""
+        cache = UserCache(MemoryCache())
+        cache.fill(make_user(1))
+        assert cache.get_by_username("testuser") is not None
+
+        cache.store_deleted(1, 2)
+        cache.fill(make_user(1))
+
+        assert cache.get_by_id(1) is None
+        assert cache.get_by_username("testuser") is None
+
+    def test_redis_backend_with_fake_client(self):
+        """Test the Redis backend against a local fake client."""
+        client = FakeRedis()
+        cache = UserCache(RedisCache(client))
+        cache.fill(make_user(1))
+
+        assert cache.get_by_username("testuser") == make_user(1)
+        assert "users:id:1" in client.data
+
+        assert cache.get_many([1, 2]) == {1: make_user(1)}
+
+        cache.clear()
+        assert client.data == {}
+
+    def test_fill_many_is_one_pipelined_round_trip(self):
+        """Test a batch fill sends every user in a single pipeline."""
+        client = FakeRedis()
+        cache = UserCache(RedisCache(client))
+        cache.store(make_user(2))
+        cache.fill_many([make_user(1), make_user(1, email="other@example.com")])
+
+        assert client.round_trips == 1
+        # The newer pointer written by store() is not moved back
+        assert cache.get_version(1) == 2
+
+        memory = UserCache(MemoryCache())
+        memory.fill_many([make_user(1)])
+        assert memory.get_by_username("testuser") == make_user(1)
+
+    @pytest.mark.asyncio
+    async def test_async_redis_backend_under_run_sync(self):
+        """Test the redis.asyncio backend awaits through the greenlet bridge."""
+        client = FakeAsyncRedis()
+        cache = UserCache(AsyncRedisCache(client))
+
+        def use_cache():
+            cache.fill(make_user(1))
+            found = cache.get_by_username("testuser"), cache.get_many([1, 2])
+            cache.clear()
+            return found
+
+        # AsyncSession.run_sync runs the sync service the same way
+        assert await greenlet_spawn(use_cache) == (make_user(1), {1: make_user(1)})
+        assert client.data == {}
+
+    def test_memory_backend_is_single_process(self, monkeypatch):
+        """Test the memory backend refuses more than one worker."""
+        monkeypatch.setattr(settings, "user_cache_backend", "memory")
+        check_worker_count(1)
+        with pytest.raises(RuntimeError):
+            check_worker_count(2)
+
+        monkeypatch.setattr(settings, "user_cache_backend", "redis")
+        check_worker_count(8)
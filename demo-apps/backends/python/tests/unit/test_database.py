@@ -0,0 +1,76 @@
+"""Engine configuration and pool health unit tests."""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.db.database import (
+    configure_engine,
+    engine_options,
+    install_interval_pre_ping,
+    pool_status,
+    probe_database,
+)
+
+
+class TestDatabase:
+    """Database configuration test class."""
+
+    def test_engine_options_mysql(self, monkeypatch):
+        """Test pool settings are applied to server databases."""
+        monkeypatch.setattr(settings, "db_pool_size", 20)
+        monkeypatch.setattr(settings, "db_pre_ping", "always")
+        options = engine_options("mysql+pymysql://u:p@localhost/db")
+        assert options["pool_size"] == 20
+        assert options["pool_pre_ping"] is True
+        assert "connect_args" not in options
+
+    def test_engine_options_sqlite(self, monkeypatch):
+        """Test SQLite gets thread-safe connections and no pool sizing."""
+        monkeypatch.setattr(settings, "db_pre_ping", "on-error")
+        options = engine_options("sqlite:///./test.db")
+        assert options["connect_args"] == {"check_same_thread": False}
+        assert options["pool_pre_ping"] is False
+        assert "pool_size" not in options
+
+    def test_engine_options_rejects_unknown_pre_ping(self, monkeypatch):
+        """Test invalid pre-ping strategy."""
+        monkeypatch.setattr(settings, "db_pre_ping", "sometimes")
+        with pytest.raises(ValueError, match="Unknown DB pre-ping strategy"):
+            engine_options("sqlite://")
+
+    def test_interval_pre_ping_replaces_dead_connection(self, tmp_path):
+        """Test an idle connection failing the ping is transparently replaced."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'ping.db'}", poolclass=QueuePool)
+        install_interval_pre_ping(engine, interval=0)
+
+        with engine.connect() as conn:
+            raw = conn.connection.dbapi_connection
+        raw.close()  # Simulate the server dropping the idle connection
+
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+            assert conn.connection.dbapi_connection is not raw
+
+    def test_pool_status(self, tmp_path, monkeypatch):
+        """Test pool occupancy reporting."""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=QueuePool,
+            pool_size=2,
+            max_overflow=2,
+        )
+        monkeypatch.setattr(settings, "metrics_enabled", False)
+        configure_engine(engine)
+        assert probe_database(engine) >= 0
+
+        with engine.connect():
+            status = pool_status(engine)
+        assert status["pool_class"] == "QueuePool"
+        assert status["capacity"] == 4
+        assert status["checked_out"] == 1
+        assert status["saturation"] == 0.25
+        # Checkout is timed even with METRICS_ENABLED off
+        assert status["checkout_count"] >= 2
+        assert status["checkout_mean_ms"] is not None
@@ -0,0 +1,120 @@
+"""Availability filter unit tests."""
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.membership import BloomFilter, MembershipIndex, normalize_key
+from app.core.models import UserChange
+from app.core.schemas import UserCreate
+from app.core.services import user_service as user_service_module
+from app.core.services.user_service import UserService
+
+
+class TestBloomFilter:
+    """Bloom filter test class."""
+
+    def test_no_false_negatives(self):
+        """Test every added value is reported as present."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        values = [f"user{i}" for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+
+        assert all(value in bloom for value in values)
+        false_positives = sum(f"other{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+    def test_normalize_key_matches_collation(self):
+        """Test case, accents and trailing spaces fold together."""
+        assert normalize_key("Élodie ") == normalize_key("elodie")
+
+
+class TestMembershipIndex:
+    """Membership index test class."""
+
+    @pytest.fixture
+    def index(self, monkeypatch) -> MembershipIndex:
+        """Install a fresh index for the service under test."""
+        index = MembershipIndex(capacity=1000, error_rate=0.01)
+        monkeypatch.setattr(user_service_module, "membership_index", index)
+        monkeypatch.setattr("app.db.dao.user_dao.membership_index", index)
+        return index
+
+    def test_fast_path_skips_database(self, db_session: Session, index):
+        """Test negatives never reach the DB and creates update the filter."""
+        service = UserService(db_session)
+        service.create_user(
+            UserCreate(
+                username="alice", email="alice@example.com", password="password123"
+            )
+        )
+        assert index.rebuild(db_session) == 1
+
+        service.create_user(
+            UserCreate(username="bob", email="bob@example.com", password="password123")
+        )
+
+        assert service.check_username_exists("carol") is False
+        assert service.check_email_exists("carol@example.com") is False
+        assert index.negatives == 2
+
+        assert service.check_username_exists("bob") is True
+        assert service.check_email_exists("alice@example.com") is True
+        stats = index.stats()
+        assert stats["rebuilds"] == 1
+        assert stats["entries"] == 4
+        assert stats["positives"] == 2
+
+    def test_deleted_user_is_confirmed_by_database(self, db_session: Session, index):
+        """Test a stale positive falls through and is counted."""
+        service = UserService(db_session)
+        user = service.create_user(
+            UserCreate(
+                username="alice", email="alice@example.com", password="password123"
+            )
+        )
+        index.rebuild(db_session)
+        service.delete_user(user.id, user.version)
+
+        assert service.check_username_exists("alice") is False
+        assert index.stats()["false_positives"] == 1
+        assert index.stats()["removed_since_rebuild"] == 1
+
+        index.rebuild(db_session)
+        assert index.might_contain("username", "alice") is False
+
+    def test_write_by_another_process_makes_misses_fall_through(
+        self, db_session: Session, index
+    ):
+        """Test the filter stops answering "available" once it missed a write."""
+        service = UserService(db_session)
+        index.rebuild(db_session)
+        service.create_user(
+            UserCreate(username="bob", email="bob@example.com", password="password123")
+        )
+        # Writes made here are reflected in the filter
+        assert index.sync(db_session) is True
+        assert index.might_contain("username", "carol") is False
+
+        # Another worker creates a user this filter never saw
+        db_session.execute(
+            update(UserChange)
+            .where(UserChange.shard == 0)
+            .values(changes=UserChange.changes + 1)
+        )
+        db_session.commit()
+        assert index.sync(db_session) is False
+        assert service.check_username_exists("carol") is False
+        assert index.stats()["stale_lookups"] == 1
+
+        index.rebuild(db_session)
+        assert index.fresh
+        assert index.might_contain("username", "carol") is False
+
+    def test_unverified_filter_expires(self, db_session: Session, index):
+        """Test misses are not trusted once the last check is too old."""
+        index.rebuild(db_session)
+        index.max_staleness = 0.0
+        assert index.fresh is False
+        assert index.might_contain("username", "carol") is True
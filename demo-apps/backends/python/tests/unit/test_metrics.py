@@ -0,0 +1,94 @@
+"""Metrics registry, engine hooks and middleware unit tests."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import (
+    CallbackCounter,
+    Counter,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+    db_pool_checkout_duration,
+    db_queries,
+    http_request_duration,
+    http_requests,
+    instrument_engine,
+    statement_type,
+    time_pool_checkout,
+)
+
+
+class TestMetrics:
+    """Metrics test class."""
+
+    def test_render_counter_and_callback(self):
+        """Test text exposition of counters."""
+        registry = Registry()
+        counter = registry.register(Counter("jobs", "Jobs run", ("kind",)))
+        counter.labels("a").inc()
+        counter.labels("a").inc(2)
+        registry.register(CallbackCounter("hits", "Cache hits", lambda: {(): 5}, ()))
+
+        output = registry.render()
+        assert "# TYPE jobs counter" in output
+        assert 'jobs_total{kind="a"} 3' in output
+        assert "hits_total 5" in output
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram bucket, sum and count samples."""
+        registry = Registry()
+        histogram = registry.register(Histogram("latency", "Latency", buckets=(1, 5)))
+        for value in (0.5, 2, 3, 10):
+            histogram.observe(value)
+
+        output = registry.render()
+        assert 'latency_bucket{le="1"} 1' in output
+        assert 'latency_bucket{le="5"} 3' in output
+        assert 'latency_bucket{le="+Inf"} 4' in output
+        assert "latency_sum 15.5" in output
+        assert "latency_count 4" in output
+
+    def test_statement_type(self):
+        """Test SQL statement label."""
+        assert statement_type("  select 1") == "select"
+        assert statement_type("INSERT INTO users") == "insert"
+        assert statement_type("PRAGMA foo") == "other"
+
+    def test_instrument_engine(self):
+        """Test query and pool checkout hooks."""
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        instrument_engine(engine)  # idempotent
+        time_pool_checkout(engine)
+        time_pool_checkout(engine)
+        queries = db_queries.labels("select")
+        checkout = db_pool_checkout_duration.labels()
+        queries_before, checkouts_before = queries.value, sum(checkout.counts)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert queries.value == queries_before + 1
+        assert sum(checkout.counts) == checkouts_before + 1
+
+    def test_middleware_uses_route_template(self):
+        """Test per-route labels use the path template."""
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"id": item_id}
+
+        app.add_middleware(MetricsMiddleware)
+        client = TestClient(app)
+
+        assert client.get("/items/1").status_code == 200
+        assert client.get("/items/2").status_code == 200
+        assert client.get("/missing").status_code == 404
+
+        assert http_requests.labels("GET", "/items/{item_id}", "200").value >= 2
+        assert http_requests.labels("GET", "unmatched", "404").value >= 1
+        histogram = http_request_duration.labels("GET", "/items/{item_id}")
+        assert sum(histogram.counts) >= 2
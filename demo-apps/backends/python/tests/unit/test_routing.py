@@ -0,0 +1,124 @@
+"""Primary/replica routing unit tests (one SQLite file per database)."""
+
+import pytest
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.models import Base, User
+from app.core.schemas import UserCreate, UserUpdate
+from app.db.dao.user_dao import UserDAO
+from app.db.routing import ReplicaSet, RoutingSession, recent_writes, use_primary
+
+
+def make_user(username: str, version: int = 1) -> dict:
+    """Row values for a user."""
+    return {
+        "username": username,
+        "email": f"{username}@example.com",
+        "hashed_password": "x",
+        "version": version,
+    }
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """A primary and two replicas; replicas start with a copy of one user."""
+    engines = [
+        create_engine(f"sqlite:///{tmp_path / name}.db")
+        for name in ("primary", "replica1", "replica2")
+    ]
+    for engine in engines:
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(User), [make_user("alice")])
+    recent_writes.clear()
+    yield engines
+    recent_writes.clear()
+    for engine in engines:
+        engine.dispose()
+
+
+def session_factory(primary, replicas):
+    """Routing session factory over the given engines."""
+    return sessionmaker(
+        class_=RoutingSession,
+        bind=primary,
+        expire_on_commit=False,
+        replicas=replicas,
+    )
+
+
+class TestRouting:
+    """Replica routing test class."""
+
+    def test_reads_balanced_over_replicas(self, databases):
+        """Test sessions take turns on the replicas and writes hit the primary."""
+        primary, replica1, replica2 = databases
+        replica_set = ReplicaSet([replica1, replica2])
+        Session = session_factory(primary, replica_set)
+
+        binds = []
+        for _ in range(4):
+            with Session() as db:
+                assert UserDAO(db).get_user_by_username("alice") is not None
+                binds.append(db.info["replica"])
+        assert binds == [replica1, replica2, replica1, replica2]
+
+        with Session() as db:
+            UserDAO(db).create_user(
+                UserCreate(username="bob", email="bob@example.com", password="pw12345"),
+                "hashed",
+            )
+        with replica1.connect() as conn:
+            assert conn.execute(User.__table__.select()).all()[-1].username == "alice"
+        with primary.connect() as conn:
+            assert conn.execute(User.__table__.select()).all()[-1].username == "bob"
+
+    def test_read_your_writes(self, databases):
+        """Test just-written users are read from the primary."""
+        primary, replica1, _ = databases
+        Session = session_factory(primary, ReplicaSet([replica1]))
+
+        with Session() as db:
+            created = UserDAO(db).create_user(
+                UserCreate(username="bob", email="bob@example.com", password="pw12345"),
+                "hashed",
+            )
+        with Session() as db:
+            dao = UserDAO(db)
+            assert dao.get_user_by_id(created.id) is not None
+            assert dao.check_username_exists("bob") is True
+            assert dao.check_email_exists("bob@example.com") is True
+
+        # Updated through the ID: the replica's older row is read again
+        with Session() as db:
+            UserDAO(db).update_user(1, UserUpdate(full_name="Alice", version=1))
+        with Session() as db:
+            alice = UserDAO(db).get_user_by_username("alice")
+            assert (alice.version, alice.full_name) == (2, "Alice")
+
+        # Outside the window the (lagging) replica answers again
+        recent_writes.clear()
+        with Session() as db:
+            assert UserDAO(db).check_username_exists("bob") is False
+            assert UserDAO(db).get_user_by_username("alice").version == 1
+            with use_primary(db):
+                assert UserDAO(db).check_username_exists("bob") is True
+
+    def test_failed_replica_is_ejected(self, databases, tmp_path):
+        """Test a failing replica leaves the rotation and reads fall back."""
+        primary, _, _ = databases
+        broken = create_engine(f"sqlite:///{tmp_path}")  # a directory
+        replica_set = ReplicaSet([broken], eject_seconds=60)
+        Session = session_factory(primary, replica_set)
+
+        with Session() as db:
+            with pytest.raises(Exception):
+                UserDAO(db).get_user_by_username("alice")
+        assert replica_set.status()[0]["healthy"] is False
+
+        with primary.begin() as conn:
+            conn.execute(update(User).values(full_name="From primary"))
+        with Session() as db:
+            alice = UserDAO(db).get_user_by_username("alice")
+            assert alice.full_name == "From primary"
@@ -0,0 +1,67 @@
+"""Schema migration and startup check unit tests."""
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+from app.core.models import Base
+from app.db.schema import (
+    SchemaOutOfDateError,
+    check_schema,
+    current_revision,
+    head_revision,
+    prepare_schema,
+    upgrade_schema,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Empty SQLite database."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+class TestSchema:
+    """Schema management test class."""
+
+    def test_check_refuses_unmigrated_and_behind(self, engine):
+        """Test the startup check fails until the database is at head."""
+        with pytest.raises(SchemaOutOfDateError, match="revision none"):
+            check_schema(engine)
+
+        upgrade_schema(engine, "0001")
+        with pytest.raises(SchemaOutOfDateError, match="revision 0001"):
+            prepare_schema(engine, "check")
+
+        prepare_schema(engine, "migrate")
+        assert check_schema(engine) == head_revision()
+
+    def test_newer_revision_is_accepted(self, engine):
+        """Test a revision from a newer release does not block startup."""
+        upgrade_schema(engine)
+        with engine.begin() as connection:
+            connection.execute(text("UPDATE alembic_version SET version_num = 'ffff'"))
+        assert current_revision(engine) == "ffff"
+        assert check_schema(engine) == "ffff"
+
+    def test_migrations_match_models(self, engine):
+        """Test the migrations build the schema the models describe."""
+        upgrade_schema(engine)
+        with engine.connect() as connection:
+            diff = compare_metadata(
+                MigrationContext.configure(connection), Base.metadata
+            )
+        # The full-text index only exists on MySQL
+        assert [
+            change
+            for change in diff
+            if not (change[0] == "add_index" and change[1].name == "ft_users_search")
+        ] == []
+
+    def test_unknown_mode(self, engine):
+        """Test invalid schema mode."""
+        with pytest.raises(ValueError, match="Unknown DB schema mode"):
+            prepare_schema(engine, "sometimes")
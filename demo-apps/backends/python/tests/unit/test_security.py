@@ -0,0 +1,146 @@
+"""Security utilities unit tests."""
+
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.core.security import (
+    PasswordHasher,
+    PasswordHashingBusyError,
+    TokenCache,
+    calibrate_rounds,
+    create_access_token,
+    hash_password,
+    hash_password_async,
+    make_password_context,
+    password_needs_rehash,
+    verify_password,
+    verify_password_async,
+)
+
+
+class TestPasswordHasher:
+    """Password hashing pool test class."""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_async(self):
+        """Test async hashing round trip on the global pool."""
+        hashed = await hash_password_async("password123")
+
+        assert verify_password("password123", hashed)
+        assert await verify_password_async("password123", hashed) is True
+        assert await verify_password_async("wrong-password", hashed) is False
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """Test fast rejection once max_pending jobs are in flight."""
+        hasher = PasswordHasher(workers=1, max_pending=1)
+        release = threading.Event()
+        try:
+            pending = asyncio.ensure_future(hasher.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+
+            with pytest.raises(PasswordHashingBusyError):
+                await hasher.run(str, "blocked")
+            with pytest.raises(PasswordHashingBusyError):
+                hasher.call(str, "blocked")
+
+            release.set()
+            assert await pending is True
+            assert hasher.call(str, "free") == "free"
+        finally:
+            release.set()
+            hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_batch_takes_one_slot_per_job(self):
+        """Test a batch holds a slot per running job and releases them all."""
+        hasher = PasswordHasher(workers=2, max_pending=3)
+        release = threading.Event()
+        try:
+            batch = asyncio.ensure_future(hasher.run_batch(release.wait, [(5,)] * 4))
+            await asyncio.sleep(0.05)
+
+            # Two chunks running on two slots, one slot left for others
+            pending = asyncio.ensure_future(hasher.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            with pytest.raises(PasswordHashingBusyError):
+                hasher.call(str, "blocked")
+
+            release.set()
+            assert await batch == [True] * 4
+            assert await pending is True
+            assert hasher.map(str, [(1,), (2,), (3,)]) == ["1", "2", "3"]
+            assert hasher.map(str, []) == []
+            # Every slot is back
+            assert await hasher.run_batch(release.wait, [(1,)] * 3) == [True] * 3
+            assert [hasher._slots.acquire(blocking=False) for _ in range(4)] == [
+                True,
+                True,
+                True,
+                False,
+            ]
+        finally:
+            release.set()
+            hasher.shutdown()
+
+    def test_unknown_executor_type(self):
+        """Test invalid executor type is rejected."""
+        with pytest.raises(ValueError, match="Unknown password hash executor"):
+            PasswordHasher(workers=1, max_pending=1, executor_type="fiber")
+
+    def test_calibrate_rounds(self):
+        """Test calibration picks the highest rounds within the target."""
+        rounds, timings = calibrate_rounds(10.0, min_rounds=4, max_rounds=5, samples=1)
+        assert rounds == 5
+        assert list(timings) == [4, 5]
+
+        # Nothing fits a zero budget: fall back to the minimum
+        rounds, timings = calibrate_rounds(0.0, min_rounds=4, max_rounds=6, samples=1)
+        assert rounds == 4
+        assert list(timings) == [4]
+
+    def test_needs_rehash_on_cost_change(self):
+        """Test hashes made with another cost are flagged for rehashing."""
+        assert password_needs_rehash(make_password_context(4).hash("password123"))
+        assert not password_needs_rehash(hash_password("password123"))
+
+
+class TestTokenCache:
+    """Verified-token cache test class."""
+
+    def test_verify_once_until_expiry(self, monkeypatch):
+        """Test repeated tokens skip decoding and expire with the token."""
+        cache = TokenCache(max_entries=2)
+        token = create_access_token(
+            {"sub": "1"}, "secret", expires_delta=timedelta(minutes=5)
+        )
+        assert cache.verify(token, "secret")["sub"] == "1"
+        assert cache.verify(token, "secret")["sub"] == "1"
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.verify(token, "other-secret") is not None  # cached
+
+        assert cache.verify("not-a-token", "secret") is None
+        assert len(cache) == 1
+
+        monkeypatch.setattr(time, "time", lambda: 10**12)
+        assert cache._get(token) is None
+
+    def test_lru_bound_and_principal(self):
+        """Test eviction of least recently used tokens and principal caching."""
+        cache = TokenCache(max_entries=2, principal_ttl=60)
+        tokens = [
+            create_access_token({"sub": str(i)}, "secret", expires_delta=timedelta(1))
+            for i in range(3)
+        ]
+        for token in tokens:
+            cache.verify(token, "secret")
+        assert len(cache) == 2
+        assert cache._get(tokens[0]) is None
+
+        assert cache.get_principal(tokens[1]) is None
+        cache.set_principal(tokens[1], "alice")
+        assert cache.get_principal(tokens[1]) == "alice"
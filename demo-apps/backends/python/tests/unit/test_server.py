@@ -0,0 +1,87 @@
+"""Pre-forking server supervisor unit tests."""
+
+import pytest
+
+from app import server
+from app.core.config import settings
+from app.db import database
+from app.server import PreforkServer
+
+
+class TestPreforkServer:
+    """Pre-forking server test class."""
+
+    def make_server(self, monkeypatch, workers=2):
+        prefork = PreforkServer("app.main:app", "127.0.0.1", 0, workers, 1.0)
+        pids = iter(range(1000, 2000))
+
+        def fake_spawn():
+            prefork.workers[next(pids)] = float(len(prefork.workers))
+
+        killed = []
+        monkeypatch.setattr(prefork, "spawn_worker", fake_spawn)
+        monkeypatch.setattr(server.os, "kill", lambda pid, sig: killed.append(pid))
+        return prefork, killed
+
+    def test_scale_up_to_target(self, monkeypatch):
+        """Test missing workers are spawned."""
+        prefork, killed = self.make_server(monkeypatch, workers=3)
+        prefork.scale()
+        assert len(prefork.workers) == 3
+        assert killed == []
+
+    def test_scale_down_retires_newest(self, monkeypatch):
+        """Test excess workers are asked to drain, newest first."""
+        prefork, killed = self.make_server(monkeypatch, workers=3)
+        prefork.scale()
+        prefork.target_workers = 1
+        prefork.scale()
+        assert killed == [1001, 1002]
+        assert prefork.retiring == {1001, 1002}
+        # Draining workers are not replaced
+        prefork.scale()
+        assert len(prefork.workers) == 3
+
+    def test_memory_cache_limits_workers(self, monkeypatch):
+        """Test the per-process memory cache keeps the server at one worker."""
+        monkeypatch.setattr(settings, "user_cache_backend", "memory")
+        prefork, _ = self.make_server(monkeypatch, workers=2)
+        with pytest.raises(RuntimeError):
+            prefork.run()
+
+        prefork, _ = self.make_server(monkeypatch, workers=1)
+        prefork._handle_ttin(None, None)
+        assert prefork.target_workers == 1
+
+
+class TestResetAfterFork:
+    """Post-fork pool reset test class."""
+
+    def test_disposes_every_engine(self, monkeypatch):
+        """Test the primary and all replica pools are dropped without closing."""
+        disposed = []
+
+        class FakeEngine:
+            def __init__(self, name):
+                self.name = name
+                self.sync_engine = self
+
+            def dispose(self, close=True):
+                disposed.append((self.name, close))
+
+        class FakeReplicas:
+            engines = [FakeEngine("async-replica")]
+
+        monkeypatch.setattr(database, "engine", FakeEngine("primary"))
+        monkeypatch.setattr(database, "replica_engines", [FakeEngine("replica")])
+        monkeypatch.setattr(database, "async_engine", FakeEngine("async-primary"))
+        monkeypatch.setattr(database, "async_replicas", FakeReplicas())
+
+        server.reset_after_fork()
+
+        assert disposed == [
+            ("primary", False),
+            ("replica", False),
+            ("async-primary", False),
+            ("async-replica", False),
+        ]
@@ -0,0 +1,90 @@
+"""Request coalescing unit tests."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.metrics import coalesced_lookups
+from app.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Single-flight test class."""
+
+    def test_threads_share_one_call(self):
+        """Test concurrent identical calls in threads run the function once."""
+        flights = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def lookup():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "alice"
+
+        followers = coalesced_lookups.labels("test_sync", "follower")
+        before = followers.value
+        with ThreadPoolExecutor(4) as pool:
+            leader = pool.submit(flights.call, "test_sync", "alice", lookup)
+            started.wait(5)
+            others = [
+                pool.submit(flights.call, "test_sync", "alice", lookup)
+                for _ in range(3)
+            ]
+            while followers.value < before + 3:
+                time.sleep(0.001)
+            release.set()
+            results = [leader.result()] + [f.result() for f in others]
+
+        assert results == ["alice"] * 4
+        assert len(calls) == 1
+        # Finished calls are not cached
+        assert flights.call("test_sync", "alice", lambda: "fresh") == "fresh"
+
+    def test_threads_share_errors(self):
+        """Test followers see the leader's exception."""
+        flights = SingleFlight()
+        with pytest.raises(ZeroDivisionError):
+            flights.call("test_sync", 1, lambda: 1 / 0)
+        assert flights.call("test_sync", 1, lambda: 1) == 1
+
+    @pytest.mark.asyncio
+    async def test_tasks_share_one_call(self):
+        """Test concurrent identical awaits run the coroutine once."""
+        flights = SingleFlight()
+        calls = []
+
+        async def lookup():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        results = await asyncio.gather(
+            *(flights.run("test_async", 7, lookup) for _ in range(5)),
+            flights.run("test_async", 8, lookup),
+        )
+        assert results == [42] * 6
+        assert len(calls) == 2  # one per key
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_fail_followers(self):
+        """Test followers fall back to their own call when the leader is cancelled."""
+        flights = SingleFlight()
+
+        async def lookup():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        leader = asyncio.ensure_future(flights.run("test_async", "k", lookup))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.run("test_async", "k", lookup))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "ok"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
@@ -1,10 +1,25 @@
 """User service unit tests."""
 
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.models import User, UserArchive
 from app.core.schemas import UserCreate, UserUpdate
-from app.core.services.user_service import UserService
+from app.core.security import (
+    make_password_context,
+    password_needs_rehash,
+    verify_password,
+)
+from app.core.services.user_service import AsyncUserService, UserService, _rehash_tasks
+from app.db.archival import archive_deleted_users
+from app.db.dao.user_dao import CountCache, UserDAO
 
 
 class TestUserService:
@@ -68,6 +83,45 @@ class TestUserService:
         with pytest.raises(ValueError, match="Email 'test@example.com' already exists"):
             service.create_user(user_create2)
 
+    def test_create_user_single_insert(self, db_session: Session):
+        """Test the row is written once, with its hash, and duplicates are named."""
+        service = UserService(db_session)
+        user = service.create_user(
+            UserCreate(username="alice", email="alice@example.com", password="pw12345")
+        )
+        db_user = db_session.get(User, user.id)
+        assert db_user.hashed_password.startswith("$2")
+
+        # Soft-deleted rows still hold their unique username/email
+        assert service.delete_user(user.id, user.version) is True
+        with pytest.raises(ValueError, match="Username 'alice' already exists"):
+            service.create_user(
+                UserCreate(
+                    username="alice", email="new@example.com", password="pw12345"
+                )
+            )
+        with pytest.raises(ValueError, match="Email 'alice@example.com' already"):
+            service.create_user(
+                UserCreate(
+                    username="bob", email="alice@example.com", password="pw12345"
+                )
+            )
+
+    def test_duplicate_column_from_driver_message(self, db_session: Session):
+        """Test the violated unique index is read from MySQL-style messages."""
+        dao = UserDAO(db_session)
+        user_create = UserCreate(
+            username="users.email", email="a@example.com", password="pw12345"
+        )
+        error = IntegrityError(
+            "INSERT",
+            {},
+            Exception(
+                "(1062, \"Duplicate entry 'users.email' for key 'users.username'\")"
+            ),
+        )
+        assert dao._duplicate_column(error, user_create) == "username"
+
     def test_get_user_by_id(self, db_session: Session):
         """Test getting user by ID."""
         service = UserService(db_session)
@@ -149,6 +203,35 @@ class TestUserService:
         deleted_user = service.get_user_by_id(created_user.id)
         assert deleted_user is None
 
+    def test_conditional_write_not_found_vs_conflict(self, db_session: Session):
+        """Test a missed conditional write tells a missing user from a stale one."""
+        service = UserService(db_session)
+        first = service.create_user(
+            UserCreate(username="first", email="first@example.com", password="pw12345")
+        )
+        second = service.create_user(
+            UserCreate(
+                username="second", email="second@example.com", password="pw12345"
+            )
+        )
+
+        assert service.update_user(999, UserUpdate(full_name="X", version=1)) is None
+        assert service.delete_user(999, 1) is False
+
+        with pytest.raises(ValueError, match="already used by another user"):
+            service.update_user(
+                second.id, UserUpdate(email="first@example.com", version=1)
+            )
+        # The failed write left the row untouched
+        assert service.get_user_by_id(second.id).version == 1
+
+        with pytest.raises(ValueError, match="current version 1, requested version 5"):
+            service.delete_user(first.id, 5)
+        assert service.delete_user(first.id, 1) is True
+        # Once deleted the user is gone, whatever version is sent
+        assert service.update_user(first.id, UserUpdate(version=2)) is None
+        assert service.list_users(search="first").users == []
+
     def test_list_users(self, db_session: Session):
         """Test user list query."""
         service = UserService(db_session)
@@ -169,3 +252,379 @@ class TestUserService:
         assert result.page == 0
         assert result.size == 3
         assert len(result.users) == 3
+
+    @pytest.mark.parametrize("sort", ["id", "created_at"])
+    def test_list_users_by_cursor(self, db_session: Session, sort: str):
+        """Test keyset pagination walks every matching row exactly once."""
+        service = UserService(db_session)
+        for i in range(7):
+            service.create_user(
+                UserCreate(
+                    username=f"user{i}",
+                    email=f"user{i}@example.com",
+                    password="password123",
+                    is_active=i != 3,
+                )
+            )
+
+        seen = []
+        cursor = ""
+        while True:
+            result = service.list_users(
+                size=2, is_active=True, cursor=cursor, sort=sort
+            )
+            seen.extend(user.username for user in result.users)
+            assert result.total == 6
+            if result.next_cursor is None:
+                break
+            cursor = result.next_cursor
+
+        assert seen == [f"user{i}" for i in range(7) if i != 3]
+
+    def test_list_users_invalid_cursor(self, db_session: Session):
+        """Test malformed or mismatched cursors are rejected."""
+        service = UserService(db_session)
+        for i in range(3):
+            service.create_user(
+                UserCreate(
+                    username=f"user{i}",
+                    email=f"user{i}@example.com",
+                    password="password123",
+                )
+            )
+        next_cursor = service.list_users(size=1, cursor="").next_cursor
+
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            service.list_users(cursor="not-a-cursor")
+        with pytest.raises(ValueError, match="Invalid pagination cursor"):
+            service.list_users(cursor=next_cursor, sort="created_at")
+
+    def test_list_users_count_strategies(self, db_session: Session):
+        """Test exact, cached, estimated and skipped list totals."""
+        service = UserService(db_session)
+        for i in range(3):
+            service.create_user(
+                UserCreate(
+                    username=f"user{i}",
+                    email=f"user{i}@example.com",
+                    password="password123",
+                )
+            )
+        dao = UserDAO(db_session)
+
+        _, count, has_more = dao.list_users(0, 2, count_strategy="exact")
+        assert (count.total, count.strategy, has_more) == (3, "exact", True)
+
+        _, count, _ = dao.list_users(0, 2, count_strategy="cached")
+        assert (count.total, count.strategy) == (3, "cached")
+        # Rows written behind the DAO's back stay invisible until the TTL
+        db_session.execute(
+            User.__table__.insert().values(
+                username="ghost", email="ghost@example.com", hashed_password="x"
+            )
+        )
+        db_session.commit()
+        _, count, _ = dao.list_users(0, 2, count_strategy="cached")
+        assert count.total == 3
+
+        _, count, _ = dao.list_users(0, 2, count_strategy="estimated")
+        assert (count.total, count.strategy) == (4, "estimated")
+        _, count, _ = dao.list_users(0, 2, username="user", count_strategy="estimated")
+        assert count.strategy == "cached"
+
+        users, count, has_more = dao.list_users(1, 2, count_strategy="none")
+        assert (count.total, count.strategy, has_more) == (None, "none", False)
+        assert len(users) == 2
+
+        with pytest.raises(ValueError, match="Unsupported count strategy"):
+            dao.list_users(count_strategy="bogus")
+
+    def test_list_users_search_and_prefix(self, db_session: Session):
+        """Test indexed search and prefix-mode filters."""
+        service = UserService(db_session)
+        for name in ["alice", "malice", "bob"]:
+            service.create_user(
+                UserCreate(
+                    username=name, email=f"{name}@example.com", password="password123"
+                )
+            )
+
+        result = service.list_users(search="LICE")
+        assert sorted(u.username for u in result.users) == ["alice", "malice"]
+
+        result = service.list_users(search="al")
+        assert [u.username for u in result.users] == ["alice"]
+
+        result = service.list_users(username="ali", match="prefix")
+        assert [u.username for u in result.users] == ["alice"]
+
+        # Email changes are re-indexed; deleted users drop out of search
+        bob = service.get_user_by_username("bob")
+        service.update_user(bob.id, UserUpdate(email="bobalice@corp.io", version=1))
+        result = service.list_users(search="alice@")
+        assert sorted(u.username for u in result.users) == ["alice", "bob", "malice"]
+
+        alice = service.get_user_by_username("alice")
+        service.delete_user(alice.id, alice.version)
+        result = service.list_users(search="lice")
+        assert sorted(u.username for u in result.users) == ["bob", "malice"]
+        assert UserDAO(db_session).rebuild_search_index() == 2
+
+    def test_cached_lookups_follow_writes(self, db_session: Session):
+        """Test cached reads skip the DB and never go stale after writes."""
+        service = UserService(db_session)
+        created_user = service.create_user(
+            UserCreate(
+                username="testuser", email="test@example.com", password="password123"
+            )
+        )
+        assert service.get_user_by_id(created_user.id) is not None
+
+        # A cache hit is served without touching the database
+        db_session.execute(
+            User.__table__.update().values(full_name="Changed behind the cache")
+        )
+        db_session.commit()
+        assert service.get_user_by_username("testuser").full_name is None
+
+        updated_user = service.update_user(
+            created_user.id, UserUpdate(full_name="Updated", version=1)
+        )
+        assert service.get_user_by_id(created_user.id) == updated_user
+
+        service.delete_user(created_user.id, updated_user.version)
+        assert service.get_user_by_id(created_user.id) is None
+        assert service.get_user_by_username("testuser") is None
+
+    def test_get_users_by_ids(self, db_session: Session):
+        """Test batch get keeps request order and marks missing IDs."""
+        service = UserService(db_session)
+        ids = [
+            service.create_user(
+                UserCreate(
+                    username=f"user{i}",
+                    email=f"user{i}@example.com",
+                    password="pw12345",
+                )
+            ).id
+            for i in range(3)
+        ]
+        service.delete_user(ids[1], 1)
+        # Warm the cache for one user so the batch mixes cache hits and DB reads
+        service.get_user_by_id(ids[2])
+
+        result = service.get_users_by_ids([ids[2], 999, ids[0], ids[1], ids[2]])
+
+        assert result.requested == 5
+        assert result.found == 3
+        assert [item.id for item in result.users] == [
+            ids[2],
+            999,
+            ids[0],
+            ids[1],
+            ids[2],
+        ]
+        assert [item.found for item in result.users] == [True, False, True, False, True]
+        assert result.users[0].user.username == "user2"
+        assert result.users[1].user is None
+
+        # Chunked IN queries return the same rows
+        dao = UserDAO(db_session)
+        assert set(dao.get_users_by_ids(ids, chunk_size=1)) == {ids[0], ids[2]}
+
+    def test_versions_and_change_counter(self, db_session: Session):
+        """Test version-only lookups and the users change counter."""
+        service = UserService(db_session, cache=None)
+        assert service.count_changes() == 0
+        user = service.create_user(
+            UserCreate(username="first", email="first@example.com", password="pw12345")
+        )
+        service.bulk_create_users(
+            [
+                (
+                    0,
+                    UserCreate(
+                        username="aaa", email="a@example.com", password="pw12345"
+                    ),
+                ),
+                (
+                    1,
+                    UserCreate(
+                        username="bbb", email="b@example.com", password="pw12345"
+                    ),
+                ),
+            ]
+        )
+        assert service.count_changes() == 2
+
+        assert service.get_user_version(user.id) == 1
+        assert service.get_user_version_by_username("first") == (user.id, 1)
+        service.update_user(user.id, UserUpdate(full_name="First", version=1))
+        assert service.get_user_version(user.id) == 2
+        assert service.count_changes() == 3
+
+        # Failed writes do not count
+        with pytest.raises(ValueError):
+            service.update_user(user.id, UserUpdate(full_name="X", version=1))
+        service.delete_user(user.id, 2)
+        assert service.count_changes() == 4
+        assert service.get_user_version(user.id) is None
+        assert service.get_user_version_by_username("first") is None
+
+    def test_archive_deleted_users(self, db_session: Session):
+        """Test old soft-deleted users move to the archive in batches."""
+        service = UserService(db_session)
+        ids = [
+            service.create_user(
+                UserCreate(
+                    username=f"user{i}",
+                    email=f"user{i}@example.com",
+                    password="pw12345",
+                )
+            ).id
+            for i in range(4)
+        ]
+        for user_id in ids[:3]:
+            service.delete_user(user_id, 1)
+        # Two deletions are past the retention window, one is recent
+        db_session.execute(
+            update(User)
+            .where(User.id.in_(ids[:2]))
+            .values(deleted_at=datetime.utcnow() - timedelta(days=31))
+        )
+        db_session.commit()
+
+        archived = archive_deleted_users(
+            retention_days=30,
+            batch_size=1,
+            pause=0,
+            session_factory=lambda: Session(db_session.get_bind()),
+        )
+
+        assert archived == 2
+        db_session.expire_all()
+        assert set(db_session.scalars(select(User.id))) == set(ids[2:])
+        rows = db_session.scalars(select(UserArchive).order_by(UserArchive.id)).all()
+        assert [row.username for row in rows] == ["user0", "user1"]
+        assert all(row.deleted_at and row.archived_at for row in rows)
+        # The archived username can be registered again
+        assert service.check_username_exists("user0") is False
+        service.create_user(
+            UserCreate(username="user0", email="user0@example.com", password="pw12345")
+        )
+
+    def test_authenticate_rehashes_outdated_cost(self, db_session: Session):
+        """Test a login with an outdated bcrypt cost rehashes in the background."""
+        service = UserService(db_session)
+        created = service.create_user(
+            UserCreate(
+                username="testuser", email="test@example.com", password="password123"
+            )
+        )
+        cheap = make_password_context(4).hash("password123")
+        db_session.execute(
+            update(User).where(User.id == created.id).values(hashed_password=cheap)
+        )
+        db_session.commit()
+        updated_at = db_session.get(User, created.id).updated_at
+
+        assert service.authenticate_user("testuser", "password123") is not None
+        for thread in threading.enumerate():
+            if thread.name == "password-rehash":
+                thread.join(10)
+
+        db_session.expire_all()
+        stored = db_session.get(User, created.id)
+        assert stored.hashed_password != cheap
+        assert not password_needs_rehash(stored.hashed_password)
+        assert verify_password("password123", stored.hashed_password)
+        # Not a user change: version and updated_at stay put
+        assert stored.version == 1
+        assert stored.updated_at == updated_at
+
+
+class TestAsyncUserService:
+    """Async user service test class."""
+
+    @pytest.mark.asyncio
+    async def test_create_and_get_user(self, async_db_session: AsyncSession):
+        """Test creating and fetching a user through the async service."""
+        service = AsyncUserService(async_db_session)
+        user_create = UserCreate(
+            username="testuser", email="test@example.com", password="password123"
+        )
+
+        created_user = await service.create_user(user_create)
+        found_user = await service.get_user_by_id(created_user.id)
+
+        assert found_user is not None
+        assert found_user.username == "testuser"
+        assert await service.check_username_exists("testuser") is True
+        assert await service.check_email_exists("missing@example.com") is False
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_user(self, async_db_session: AsyncSession):
+        """Test optimistic-lock update and delete through the async service."""
+        service = AsyncUserService(async_db_session)
+        created_user = await service.create_user(
+            UserCreate(
+                username="testuser", email="test@example.com", password="password123"
+            )
+        )
+
+        with pytest.raises(ValueError, match="Version conflict"):
+            await service.update_user(
+                created_user.id, UserUpdate(full_name="Nope", version=99)
+            )
+
+        updated_user = await service.update_user(
+            created_user.id, UserUpdate(full_name="Updated", version=1)
+        )
+        assert updated_user is not None
+        assert updated_user.version == 2
+
+        assert await service.delete_user(created_user.id, 2) is True
+        assert await service.get_user_by_id(created_user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_authenticate_rehashes_outdated_cost(
+        self, async_db_session: AsyncSession
+    ):
+        """Test the async login rehash task stores the current-cost hash."""
+        service = AsyncUserService(async_db_session)
+        created = await service.create_user(
+            UserCreate(
+                username="testuser", email="test@example.com", password="password123"
+            )
+        )
+        cheap = make_password_context(4).hash("password123")
+        await async_db_session.execute(
+            update(User).where(User.id == created.id).values(hashed_password=cheap)
+        )
+        await async_db_session.commit()
+
+        assert await service.authenticate_user("testuser", "password123") is not None
+        # End the request's transaction so the rehash can write (SQLite)
+        await async_db_session.commit()
+        await asyncio.gather(*_rehash_tasks)
+
+        stored = await async_db_session.get(User, created.id, populate_existing=True)
+        assert not password_needs_rehash(stored.hashed_password)
+        assert stored.version == 1
+
+
+class TestCountCache:
+    """List count cache test class."""
+
+    def test_lru_bound(self):
+        """Test distinct filters beyond max_entries evict the least recent."""
+        cache = CountCache(ttl=60, max_entries=2)
+        cache.set(("search", "a"), 1)
+        cache.set(("search", "b"), 2)
+        assert cache.get(("search", "a")) == 1
+        cache.set(("search", "c"), 3)
+
+        assert len(cache) == 2
+        assert cache.get(("search", "b")) is None
+        assert cache.get(("search", "a")) == 1
+        assert cache.get(("search", "c")) == 3
@@ -168,4 +168,25 @@ clean-python: ## 🧹 Clean Python build artifacts
 		echo "$(GREEN)Python build artifacts cleaned$(RESET)"; \
 	else \
 		echo "$(BLUE)Skipping Python clean (no Python projects configured)$(RESET)"; \
-	fi
\ No newline at end of file
+	fi
+migrate-python: ## 🗄️ Apply Python database migrations (alembic upgrade head)
+	@if [ -d "$(PYTHON_DIR)" ]; then \
+		echo "$(YELLOW)Applying Python migrations in: $(PYTHON_DIR)$(RESET)"; \
+		cd $(PYTHON_DIR) && $(PYTHON) -m alembic upgrade head; \
+		cd - > /dev/null; \
+		echo "$(GREEN)Python migrations applied$(RESET)"; \
+	else \
+		echo "$(BLUE)Skipping Python migrations (no Python project detected)$(RESET)"; \
+	fi
+
+BENCH_ARGS ?=
+
+bench-python: ## 🏎️ Run Python load-testing benchmark (BENCH_ARGS="--users 10000 --concurrency 32")
+	@if [ -d "$(PYTHON_DIR)" ]; then \
+		echo "$(YELLOW)Running Python benchmark in: $(PYTHON_DIR)$(RESET)"; \
+		cd $(PYTHON_DIR) && $(PYTHON) -m benchmarks.run $(BENCH_ARGS); \
+		cd - > /dev/null; \
+		echo "$(GREEN)Python benchmark completed (results in $(PYTHON_DIR)/benchmarks/results)$(RESET)"; \
+	else \
+		echo "$(BLUE)Skipping Python benchmark (no Python project detected)$(RESET)"; \
+	fi